@@ -3,11 +3,17 @@ from __future__ import absolute_import, unicode_literals
 import os
 
 from celery import Celery
+from celery.signals import task_postrun, task_prerun
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AcheiUnb.settings")
+from .db_router import enter_read_only_task, exit_read_only_task
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AcheiUnB.settings")
 
 app = Celery("AcheiUnb")
 
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
+
+task_prerun.connect(enter_read_only_task)
+task_postrun.connect(exit_read_only_task)
@@ -0,0 +1,141 @@
+import secrets
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # Sem o pacote brotli, só gzip.
+    brotli = None
+
+# Tipos comprimidos: JSON da API e as exportações (CSV/NDJSON, em streaming).
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv")
+# Qualidade 11 comprime um pouco mais, mas é lenta demais para respostas dinâmicas.
+BROTLI_QUALITY = 5
+# Mitigação do BREACH, como no GZipMiddleware: até 100 bytes aleatórios tornam o
+# tamanho comprimido imprevisível (as respostas levam token CSRF e dados do usuário).
+MAX_RANDOM_BYTES = GZipMiddleware.max_random_bytes
+
+
+def available_encodings():
+    """Codificações suportadas, na ordem de preferência do servidor."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding):
+    """
+    Codificação de maior ``q`` no ``Accept-Encoding`` entre as suportadas; empates
+    ficam com a preferência do servidor (brotli). None se nenhuma for aceita.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        param, _, value = params.strip().partition("=")
+        if param.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def brotli_padding():
+    """
+    Meta-bloco de metadados do brotli (RFC 7932, 9.2) com 1 a ``MAX_RANDOM_BYTES`` bytes,
+    ignorados pelo decodificador: o equivalente ao nome de arquivo aleatório que o
+    Django insere no cabeçalho do gzip.
+    """
+    length = secrets.randbelow(MAX_RANDOM_BYTES) + 1
+    # ISLAST=0, MNIBBLES=0 (bits 11), reservado=0, MSKIPBYTES=1, MSKIPLEN-1 em 8 bits.
+    header = 0b0110 | (1 << 4) | ((length - 1) << 6)
+    return header.to_bytes(2, "little") + secrets.token_bytes(length)
+
+
+def brotli_compressor():
+    """
+    Compressor e o início do stream já com o padding. O flush logo após o cabeçalho
+    alinha o stream em bytes, onde o meta-bloco de metadados pode ser inserido.
+    """
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    return compressor, compressor.flush() + brotli_padding()
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        compressor, start = brotli_compressor()
+        return start + compressor.process(content) + compressor.finish()
+    return compress_string(content, max_random_bytes=MAX_RANDOM_BYTES)
+
+
+def compress_stream(chunks, encoding):
+    if encoding == "gzip":
+        yield from compress_sequence(chunks, max_random_bytes=MAX_RANDOM_BYTES)
+        return
+    compressor, start = brotli_compressor()
+    yield start
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Comprime com brotli ou gzip, conforme o ``Accept-Encoding``, respostas JSON a partir
+    de ``RESPONSE_COMPRESSION_MIN_SIZE`` bytes e as exportações em streaming.
+
+    Como no GZipMiddleware do Django, o ETag de uma resposta comprimida vira fraco
+    (``W/"..."``); as views comparam ``If-None-Match`` de forma fraca.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = f"W/{etag}"
+        response["Content-Encoding"] = encoding
+        return response
+
+    def is_compressible(self, response):
+        if response.has_header("Content-Encoding") or response.status_code in (204, 206, 304):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return False
+        if response.streaming:
+            # Respostas assíncronas (ASGI) seguem sem compressão.
+            return not getattr(response, "is_async", False)
+        return len(response.content) >= settings.RESPONSE_COMPRESSION_MIN_SIZE
@@ -0,0 +1,73 @@
+import importlib.util
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+def env_flag(name, default=False):
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def postgres_database(host=None, port=None):
+    """
+    Configuração do banco PostgreSQL, com conexões persistentes por padrão.
+
+    Variáveis de ambiente:
+    - ``DB_CONN_MAX_AGE``: segundos que uma conexão é reaproveitada entre requisições
+      (padrão 60; 0 abre uma conexão por requisição).
+    - ``DB_POOL``: usa o pool do psycopg 3 (``pip install "psycopg[binary,pool]"``) em
+      vez de conexões persistentes; tamanho em ``DB_POOL_MIN_SIZE``/``DB_POOL_MAX_SIZE``.
+    - ``DB_PGBOUNCER``: o banco está atrás do PgBouncer em modo transaction, que não
+      suporta cursores no servidor entre transações.
+    """
+    database = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.getenv("DB_NAME"),
+        "USER": os.getenv("DB_USER"),
+        "PASSWORD": os.getenv("DB_PASSWORD"),
+        "HOST": os.getenv("DB_HOST", host),
+        "PORT": os.getenv("DB_PORT", port),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        # Conexões reaproveitadas são testadas antes do uso, então uma conexão derrubada
+        # pelo servidor (restart, timeout do PgBouncer) não gera erro na requisição.
+        "CONN_HEALTH_CHECKS": True,
+        "DISABLE_SERVER_SIDE_CURSORS": env_flag("DB_PGBOUNCER"),
+        "OPTIONS": {},
+    }
+
+    if env_flag("DB_POOL"):
+        if importlib.util.find_spec("psycopg_pool") is None:
+            raise ImproperlyConfigured(
+                'DB_POOL requer o psycopg 3 com pool: pip install "psycopg[binary,pool]".'
+            )
+        # O pool substitui as conexões persistentes (o Django exige CONN_MAX_AGE = 0).
+        database["CONN_MAX_AGE"] = 0
+        database["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        }
+    return database
+
+
+def replica_databases(port=None):
+    """
+    Réplicas de leitura listadas em ``DB_REPLICA_HOSTS`` (``host`` ou ``host:porta``,
+    separados por vírgula), com as mesmas credenciais do primário. Viram os aliases
+    ``replica_1``, ``replica_2``... usados pelo ``AcheiUnB.db_router.ReplicaRouter``.
+    """
+    addresses = [
+        address.strip()
+        for address in os.getenv("DB_REPLICA_HOSTS", "").split(",")
+        if address.strip()
+    ]
+    replicas = {}
+    for index, address in enumerate(addresses, start=1):
+        host, _, replica_port = address.partition(":")
+        database = postgres_database()
+        database["HOST"] = host
+        database["PORT"] = replica_port or os.getenv("DB_PORT", port)
+        # Nos testes a réplica aponta para o banco de teste do primário.
+        database["TEST"] = {"MIRROR": "default"}
+        replicas[f"replica_{index}"] = database
+    return replicas
@@ -0,0 +1,131 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Cookie que mantém o cliente lendo do primário logo depois de uma escrita, enquanto
+# as réplicas ainda podem estar atrasadas.
+PRIMARY_PIN_COOKIE = "db_primary"
+
+_routing_state = ContextVar("db_routing_state", default=None)
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+@contextmanager
+def routing_context(read_from_replica):
+    """
+    Define se as leituras do bloco podem ir para as réplicas. Qualquer escrita no bloco
+    volta as leituras seguintes para o primário; ``state["wrote"]`` informa se houve.
+    """
+    state = {"read_from_replica": read_from_replica, "wrote": False}
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Leituras do bloco vão para o primário mesmo dentro de ``routing_context(True)``, p. ex.
+    ao preencher um cache depois de uma invalidação: uma réplica atrasada gravaria os
+    dados anteriores à escrita na nova geração. Escritas no bloco valem para o contexto
+    externo.
+    """
+    outer = _routing_state.get()
+    with routing_context(read_from_replica=False) as state:
+        try:
+            yield state
+        finally:
+            if outer is not None and state["wrote"]:
+                outer["read_from_replica"] = False
+                outer["wrote"] = True
+
+
+class ReplicaRouter:
+    """
+    Escritas e migrações vão sempre para o primário (``default``). Leituras vão para
+    uma réplica sorteada apenas dentro de ``routing_context(True)`` (requisições GET
+    sem escrita recente e tasks marcadas como ``read_only``) e fora de transações.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        state = _routing_state.get()
+        if not replicas or state is None or not state["read_from_replica"]:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db in replicas:
+            return instance._state.db
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state["read_from_replica"] = False
+            state["wrote"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Leituras de requisições GET/HEAD/OPTIONS vão para as réplicas. Depois de uma
+    requisição que escreveu no banco, o cliente recebe um cookie que o mantém no
+    primário por ``DATABASE_REPLICA_STICKY_SECONDS`` segundos (lê as próprias escritas).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        read_from_replica = (
+            request.method in SAFE_METHODS and PRIMARY_PIN_COOKIE not in request.COOKIES
+        )
+        with routing_context(read_from_replica) as state:
+            response = self.get_response(request)
+
+        if state["wrote"] and replica_aliases():
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                "1",
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+_task_contexts = {}
+
+
+def enter_read_only_task(task_id, task, **kwargs):
+    """``task_prerun``: tasks com ``read_only = True`` leem das réplicas."""
+    if getattr(task, "read_only", False):
+        context = routing_context(read_from_replica=True)
+        context.__enter__()
+        _task_contexts[task_id] = context
+
+
+def exit_read_only_task(task_id, **kwargs):
+    """``task_postrun``: encerra o contexto aberto em ``enter_read_only_task``."""
+    context = _task_contexts.pop(task_id, None)
+    if context is not None:
+        context.__exit__(None, None, None)
@@ -0,0 +1,93 @@
+import codecs
+import math
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError as exc:
+    raise ImproperlyConfigured("API_FAST_JSON requer o orjson: pip install orjson.") from exc
+
+# Datas passam pelo encoder do DRF (e não pelo do orjson) para a saída ser idêntica
+# à do JSONRenderer; os serializers já entregam datas como texto, então quase não
+# há custo. Decimal, timedelta e textos lazy também caem no encoder do DRF.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+default_encoder = encoders.JSONEncoder().default
+
+# Como o JSONRenderer do DRF: separadores de linha do JavaScript escapados, para o JSON
+# poder ser embutido em <script>.
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def has_non_finite_float(data):
+    """Se há NaN ou Infinity em ``data``: o orjson os grava como null, o DRF recusa."""
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+    return False
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    JSONRenderer com o orjson: mesma saída compacta em UTF-8, várias vezes mais rápido.
+    Pedidos com ``indent`` ou configurações não compactas usam o renderer do DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if (
+            indent is not None
+            or not api_settings.COMPACT_JSON
+            or not api_settings.UNICODE_JSON
+            or not api_settings.STRICT_JSON
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=default_encoder, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Inteiros acima de 64 bits, p. ex.: o encoder do DRF sabe lidar.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # NaN e Infinity só podem ter virado null: sem null na saída, não há o que checar.
+        # Havendo, o DRF levanta o mesmo ValueError do modo estrito.
+        if b"null" in ret and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        for separator, escaped in LINE_SEPARATORS:
+            ret = ret.replace(separator, escaped)
+        return ret
+
+
+class OrjsonParser(JSONParser):
+    """JSONParser com o orjson. Como o DRF em modo estrito, rejeita NaN e Infinity."""
+
+    renderer_class = OrjsonRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            content = stream.read()
+            if codecs.lookup(encoding).name != "utf-8":
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, LookupError) as exc:
+            raise ParseError(f"JSON parse error - {exc}") from exc
@@ -0,0 +1,117 @@
+import functools
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import URLResolver, get_resolver
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+API_INFO = openapi.Info(
+    title="AcheiUnB API",
+    default_version="v1",
+    description="Documentação interativa das APIs do AcheiUnB",
+    terms_of_service="https://www.unb.br",
+    contact=openapi.Contact(email="acheiunb2024@gmail.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+BaseSchemaView = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+# Gravado pelo comando generate_schema dentro do STATIC_ROOT; o nginx serve direto.
+SCHEMA_STATIC_NAME = "openapi/swagger.json"
+SCHEMA_CACHE_KEY = "openapi:schema:{}"
+SCHEMA_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+_schemas = {}
+
+
+def url_signature(patterns, prefix=""):
+    """Rotas e views da URLconf, na ordem, para derivar a chave do schema."""
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from url_signature(pattern.url_patterns, route)
+        else:
+            callback = pattern.callback
+            view = getattr(callback, "cls", None) or getattr(callback, "view_class", callback)
+            yield f"{route} {view.__module__}.{view.__qualname__}"
+
+
+@functools.cache
+def schema_key():
+    """
+    Hash da URLconf e de ``APP_VERSION``: muda a cada deploy que altera rotas ou versão.
+    Mudanças só em serializers dependem do ``APP_VERSION`` para invalidar o schema.
+    """
+    signature = "\n".join([settings.APP_VERSION, *url_signature(get_resolver().url_patterns)])
+    return hashlib.md5(signature.encode()).hexdigest()
+
+
+def generate_schema():
+    """Gera o schema OpenAPI completo com uma requisição fictícia, como o generate_swagger."""
+    request = APIView().initialize_request(RequestFactory().get("/swagger.json"))
+    generator = BaseSchemaView.generator_class(API_INFO)
+    schema = generator.get_schema(request=request, public=True)
+    # Sem host e schemes, o Swagger UI usa os da página: o mesmo arquivo serve qualquer
+    # domínio (localhost, produção).
+    schema.pop("host", None)
+    schema.pop("schemes", None)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def get_schema():
+    """
+    Schema em JSON, gerado uma vez por chave: fica na memória do processo e, com um
+    ``APP_VERSION`` definido, no cache compartilhado para os demais processos. Sem
+    versão (desenvolvimento), o autoreload do runserver descarta o da memória.
+    """
+    key = schema_key()
+    content = _schemas.get(key)
+    if content is not None:
+        return content
+
+    shared = settings.APP_VERSION != "dev"
+    if shared:
+        content = cache.get(SCHEMA_CACHE_KEY.format(key))
+    if content is None:
+        content = generate_schema()
+        if shared:
+            cache.set(SCHEMA_CACHE_KEY.format(key), content, SCHEMA_CACHE_TIMEOUT)
+    _schemas[key] = content
+    return content
+
+
+def schema_static_path():
+    return os.path.join(settings.STATIC_ROOT, SCHEMA_STATIC_NAME)
+
+
+@condition(etag_func=lambda request: f'"{schema_key()}"')
+def schema_json(request):
+    response = HttpResponse(get_schema(), content_type="application/json")
+    patch_cache_control(response, public=True, max_age=0)
+    return response
+
+
+class SchemaView(BaseSchemaView):
+    """
+    Páginas do Swagger UI e do ReDoc. O HTML é gerado pelo drf_yasg sem as rotas (barato)
+    e busca o schema em swagger.json (SPEC_URL); ``?format=openapi`` também usa o cache.
+    """
+
+    def get(self, request, version="", format=None):
+        if request.accepted_renderer.format in ("swagger", "redoc"):
+            return super().get(request, version, format)
+        return schema_json(request._request)
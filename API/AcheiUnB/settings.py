@@ -6,6 +6,9 @@ import cloudinary
 import cloudinary.uploader
 from celery.schedules import crontab
 from decouple import config
+from kombu import Exchange, Queue
+
+from .database import env_flag, postgres_database, replica_databases
 
 if os.getenv("DJANGO_SETTINGS_MODULE") == "AcheiUnB.settings_production":
     from .settings_production import *
@@ -47,6 +50,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "AcheiUnB.compression.CompressionMiddleware",
+    "AcheiUnB.db_router.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -61,15 +66,70 @@ AUTHENTICATION_BACKENDS = ["django.contrib.auth.backends.ModelBackend"]
 
 ROOT_URLCONF = "AcheiUnB.urls"
 
+# Versão do deploy (hash do commit, tag...), parte da chave do schema OpenAPI em cache.
+APP_VERSION = os.getenv("APP_VERSION") or "dev"
+
+# As páginas de documentação buscam o schema gerado uma vez por deploy (AcheiUnB.schema).
+SWAGGER_SETTINGS = {"SPEC_URL": "schema-json"}
+REDOC_SETTINGS = {"SPEC_URL": "schema-json"}
+
+# API_FAST_JSON troca o JSON do DRF pelo orjson (AcheiUnB.renderers), com a mesma saída.
+API_FAST_JSON = env_flag("API_FAST_JSON")
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": ("users.authentication.CookieJWTAuthentication",),
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        (
+            "AcheiUnB.renderers.OrjsonRenderer"
+            if API_FAST_JSON
+            else "rest_framework.renderers.JSONRenderer"
+        ),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        (
+            "AcheiUnB.renderers.OrjsonParser"
+            if API_FAST_JSON
+            else "rest_framework.parsers.JSONParser"
+        ),
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 27,
 }
 
+# Cache compartilhado entre web e workers (users.cache). Sem REDIS_URL, cada processo
+# usa a própria memória e as invalidações não chegam aos demais; a coalescência do
+# matching (users.tasks.schedule_item_matching) fica desligada.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+            "KEY_PREFIX": "acheiunb",
+            "TIMEOUT": 60 * 10,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "TIMEOUT": 60 * 10,
+        }
+    }
+
+# Respostas JSON menores que isso não são comprimidas (AcheiUnB.compression): o ganho
+# não compensa o custo de CPU.
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
+# Rate limiting das rotas caras (users.throttling.TokenBucketThrottle).
+# Sem REDIS_URL os baldes ficam na memória de cada processo.
+TOKEN_BUCKET_THROTTLE = {
+    "REDIS_URL": os.getenv("REDIS_URL"),
+    "CAPACITY": 30,
+    "REFILL_RATE": 0.5,  # fichas por segundo
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=365),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=365 * 10),
@@ -77,6 +137,10 @@ SIMPLE_JWT = {
     "ALGORITHM": "HS256",
 }
 
+# Cache local dos usuários autenticados via JWT (users.authentication.UserCache)
+AUTH_USER_CACHE_TTL = 60
+AUTH_USER_CACHE_MAXSIZE = 1024
+
 ASGI_APPLICATION = "AcheiUnB.asgi.application"
 
 CHANNEL_LAYERS = {
@@ -131,16 +195,13 @@ SOCIALACCOUNT_ADAPTER = "allauth.socialaccount.adapter.DefaultSocialAccountAdapt
 SOCIALACCOUNT_ADAPTER = "users.adapters.CustomSocialAccountAdapter"
 
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": os.getenv("DB_NAME"),
-        "USER": os.getenv("DB_USER"),
-        "PASSWORD": os.getenv("DB_PASSWORD"),
-        "HOST": os.getenv("DB_HOST"),
-        "PORT": os.getenv("DB_PORT"),
-    }
-}
+DATABASES = {"default": postgres_database(), **replica_databases()}
+
+# Leituras de requisições GET e de tasks read_only vão para as réplicas (se houver
+# DB_REPLICA_HOSTS); quem acabou de escrever lê do primário por alguns segundos.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["AcheiUnB.db_router.ReplicaRouter"]
+DATABASE_REPLICA_STICKY_SECONDS = 5
 
 
 cloudinary.config(
@@ -190,6 +251,11 @@ CORS_ALLOW_CREDENTIALS = True
 STATIC_URL = "/static/"
 
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+# O collectstatic grava versões .gz/.br dos arquivos para o nginx (gzip_static).
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "AcheiUnB.storage.PrecompressedStaticFilesStorage"},
+}
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "AcheiUnB/static/dist"),
 ]
@@ -209,6 +275,69 @@ CELERY_TASK_SERIALIZER = "json"
 
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
 
+# Filas separadas por tipo de trabalho, cada uma com seu worker (ver docker-compose):
+# uma rajada de uploads ou uma importação grande não atrasa os e-mails.
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_QUEUES = [
+    Queue(name, Exchange(name), routing_key=name)
+    for name in ("default", "notifications", "matching", "bulk", "media", "maintenance")
+]
+# No Redis, 0 é a maior prioridade: dentro de uma fila, mensagens mais prioritárias
+# são entregues primeiro. Um worker que consome várias filas (-Q a,b,c) as esvazia
+# na ordem em que foram passadas.
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+CELERY_TASK_ROUTES = {
+    "users.tasks.send_match_notification": {"queue": "notifications", "priority": 0},
+    "users.tasks.send_welcome_email": {"queue": "notifications", "priority": 3},
+    "users.tasks.find_and_notify_matches_task": {"queue": "matching", "priority": 2},
+    "users.tasks.find_and_notify_matches_bulk_task": {"queue": "bulk", "priority": 7},
+    "users.tasks.upload_images_to_cloudinary": {"queue": "media", "priority": 4},
+    "users.tasks.remove_images_from_item": {"queue": "media", "priority": 6},
+    "users.tasks.delete_old_items_and_chats": {"queue": "maintenance", "priority": 9},
+}
+# Limites de tempo por task (soft levanta SoftTimeLimitExceeded, o outro mata o
+# processo). acks_late só nas tasks idempotentes: se o worker cair no meio, a task é
+# reentregue; uploads e e-mails não são reexecutados para não duplicar.
+# Tasks que só leem do banco podem receber "read_only": True para ler das réplicas
+# (AcheiUnB.db_router); as atuais escrevem no banco e ficam no primário.
+CELERY_TASK_ANNOTATIONS = {
+    "users.tasks.send_match_notification": {"soft_time_limit": 30, "time_limit": 60},
+    "users.tasks.send_welcome_email": {"soft_time_limit": 30, "time_limit": 60},
+    "users.tasks.find_and_notify_matches_task": {
+        "soft_time_limit": 60,
+        "time_limit": 90,
+        "acks_late": True,
+    },
+    "users.tasks.find_and_notify_matches_bulk_task": {
+        "soft_time_limit": 60 * 15,
+        "time_limit": 60 * 20,
+        "acks_late": True,
+    },
+    "users.tasks.upload_images_to_cloudinary": {"soft_time_limit": 120, "time_limit": 180},
+    "users.tasks.remove_images_from_item": {
+        "soft_time_limit": 60,
+        "time_limit": 90,
+        "acks_late": True,
+    },
+    "users.tasks.delete_old_items_and_chats": {
+        "soft_time_limit": 60 * 10,
+        "time_limit": 60 * 15,
+        "acks_late": True,
+    },
+}
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+# Tasks sintéticas do comando celery_load_test: só registradas nos workers de um
+# ambiente de benchmark (LOAD_TEST_TASKS=true), nunca nas filas de produção.
+LOAD_TEST_TASKS = os.getenv("LOAD_TEST_TASKS", "false").lower() == "true"
+CELERY_IMPORTS = ["users.load_test_tasks"] if LOAD_TEST_TASKS else []
+# Cada processo reserva uma task por vez: tasks longas não seguram outras na fila local.
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
 CELERY_BEAT_SCHEDULE = {
     "delete_old_items_and_chats": {
         "task": "users.tasks.delete_old_items_and_chats",
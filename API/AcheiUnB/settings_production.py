@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+from .database import env_flag, postgres_database, replica_databases
 from .settings import *
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -30,6 +31,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "AcheiUnB.compression.CompressionMiddleware",
+    "AcheiUnB.db_router.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",  # Necessário para o admin
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -37,10 +40,34 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",  # Necessário para o admin
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+
+# Versão do deploy (hash do commit, tag...), parte da chave do schema OpenAPI em cache.
+APP_VERSION = os.getenv("APP_VERSION") or "dev"
+
+# As páginas de documentação buscam o schema gerado uma vez por deploy (AcheiUnB.schema).
+SWAGGER_SETTINGS = {"SPEC_URL": "schema-json"}
+REDOC_SETTINGS = {"SPEC_URL": "schema-json"}
+
+# API_FAST_JSON troca o JSON do DRF pelo orjson (AcheiUnB.renderers), com a mesma saída.
+API_FAST_JSON = env_flag("API_FAST_JSON")
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": ("users.authentication.CookieJWTAuthentication",),
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        (
+            "AcheiUnB.renderers.OrjsonRenderer"
+            if API_FAST_JSON
+            else "rest_framework.renderers.JSONRenderer"
+        ),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        (
+            "AcheiUnB.renderers.OrjsonParser"
+            if API_FAST_JSON
+            else "rest_framework.parsers.JSONParser"
+        ),
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 27,
@@ -68,17 +95,17 @@ TEMPLATES = [
 ]
 
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": os.getenv("DB_NAME"),
-        "USER": os.getenv("DB_USER"),
-        "PASSWORD": os.getenv("DB_PASSWORD"),
-        "HOST": os.getenv("DB_HOST", "db"),
-        "PORT": os.getenv("DB_PORT", "5432"),
-    }
+    "default": postgres_database(host="db", port="5432"),
+    **replica_databases(port="5432"),
 }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+# O collectstatic grava versões .gz/.br dos arquivos para o nginx (gzip_static).
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "AcheiUnB.storage.PrecompressedStaticFilesStorage"},
+}
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "AcheiUnB/static/dist"),
 ]
@@ -0,0 +1,20 @@
+from .settings import *  # noqa: F403
+from .settings import BASE_DIR
+
+# Primário e réplica em dois bancos SQLite separados, para conferir o roteamento do
+# AcheiUnB.db_router com bancos de verdade (AcheiUnB/tests/test_replica_routing.py):
+#   pytest API/AcheiUnB/tests/test_replica_routing.py --ds=AcheiUnB.settings_replica_test
+# A réplica não recebe migrações (ReplicaRouter.allow_migrate); os testes copiam o
+# primário para ela com a API de backup do SQLite, simulando a replicação, e podem
+# deixá-la atrasada de propósito.
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "replica_test_primary.sqlite3",
+    },
+    "replica_1": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "replica_test_replica.sqlite3",
+    },
+}
+DATABASE_REPLICAS = ["replica_1"]
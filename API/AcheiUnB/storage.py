@@ -0,0 +1,67 @@
+import gzip
+import os
+import re
+
+from django.contrib.staticfiles.storage import StaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # Sem o pacote brotli, só os .gz são gerados.
+    brotli = None
+
+PRECOMPRESSED_EXTENSIONS = (".js", ".mjs", ".css", ".html", ".json", ".svg", ".map", ".txt")
+PRECOMPRESS_MIN_SIZE = 1024
+# O brotli 11 é ~25x mais lento que o 9 para ~10% a menos; só vale nos arquivos do
+# Vite, baixados por todos os visitantes (o collectstatic roda a cada deploy).
+BROTLI_QUALITY = 9
+BROTLI_QUALITY_IMMUTABLE = 11
+
+# Arquivos gerados pelo Vite (``file``, ``css`` e ``assets`` do manifest) têm o hash do
+# conteúdo no nome e podem ser cacheados para sempre. O nginx.conf usa esta mesma
+# expressão para o ``Cache-Control: immutable``.
+IMMUTABLE_ASSET_PATTERN = re.compile(r"^(dist/)?(assets|js)/.+-[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+
+
+def precompressed_versions(content, brotli_quality=BROTLI_QUALITY):
+    """Versões ``(.gz, .br)`` de ``content``, só as que ficam menores que o original."""
+    versions = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        versions[".br"] = brotli.compress(content, quality=brotli_quality)
+    return {
+        suffix: compressed
+        for suffix, compressed in versions.items()
+        if len(compressed) < len(content)
+    }
+
+
+class PrecompressedStaticFilesStorage(StaticFilesStorage):
+    """
+    Storage do ``collectstatic`` que grava, ao lado de cada JS/CSS/HTML/SVG, as versões
+    ``.gz`` e ``.br`` (uma vez por deploy) para o nginx servir direto com
+    ``gzip_static``/``brotli_static``.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+
+        for name in paths:
+            if not name.endswith(PRECOMPRESSED_EXTENSIONS):
+                continue
+            path = self.path(name)
+            with open(path, "rb") as file:
+                content = file.read()
+            if len(content) < PRECOMPRESS_MIN_SIZE:
+                continue
+
+            if IMMUTABLE_ASSET_PATTERN.match(name):
+                quality = BROTLI_QUALITY_IMMUTABLE
+            else:
+                quality = BROTLI_QUALITY
+            stat = os.stat(path)
+            for suffix, compressed in precompressed_versions(content, quality).items():
+                with open(path + suffix, "wb") as file:
+                    file.write(compressed)
+                # Mesma data do original: o nginx usa a do arquivo servido no Last-Modified.
+                os.utime(path + suffix, (stat.st_atime, stat.st_mtime))
+            yield name, name, True
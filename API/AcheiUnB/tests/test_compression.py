@@ -0,0 +1,117 @@
+import gzip
+import json
+from unittest.mock import patch
+
+import brotli
+import pytest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from rest_framework.test import APITestCase
+
+from AcheiUnB.compression import CompressionMiddleware, choose_encoding
+from users.models import Item
+
+BIG_PAYLOAD = {"results": [{"id": index, "name": "Garrafa térmica"} for index in range(200)]}
+factory = RequestFactory()
+
+
+def compressed(response_factory, accept_encoding):
+    middleware = CompressionMiddleware(lambda request: response_factory())
+    return middleware(factory.get("/api/items/", HTTP_ACCEPT_ENCODING=accept_encoding))
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_gzip_without_brotli_package():
+    with patch("AcheiUnB.compression.brotli", None):
+        assert choose_encoding("br, gzip") == "gzip"
+
+
+def test_json_response_compressed_with_brotli():
+    response = compressed(lambda: JsonResponse(BIG_PAYLOAD), "gzip, br")
+    assert response["Content-Encoding"] == "br"
+    assert response["Vary"] == "Accept-Encoding"
+    assert int(response["Content-Length"]) == len(response.content)
+    assert json.loads(brotli.decompress(response.content)) == BIG_PAYLOAD
+
+
+def test_json_response_compressed_with_gzip_and_etag_weakened():
+    def view():
+        response = JsonResponse(BIG_PAYLOAD)
+        response["ETag"] = '"abc"'
+        return response
+
+    response = compressed(view, "gzip")
+    assert response["Content-Encoding"] == "gzip"
+    assert response["ETag"] == 'W/"abc"'
+    assert json.loads(gzip.decompress(response.content)) == BIG_PAYLOAD
+
+
+@pytest.mark.parametrize(
+    ("encoding", "decompress"), [("gzip", gzip.decompress), ("br", brotli.decompress)]
+)
+def test_random_padding_against_breach(encoding, decompress):
+    sizes = set()
+    for _ in range(10):
+        response = compressed(lambda: JsonResponse(BIG_PAYLOAD), encoding)
+        assert json.loads(decompress(response.content)) == BIG_PAYLOAD
+        sizes.add(len(response.content))
+    # Mesmo conteúdo, tamanhos diferentes: o tamanho não revela o que foi comprimido.
+    assert len(sizes) > 1
+
+
+@override_settings(RESPONSE_COMPRESSION_MIN_SIZE=1024)
+def test_small_and_non_json_responses_untouched():
+    small = compressed(lambda: JsonResponse({"ok": True}), "gzip, br")
+    html = compressed(lambda: HttpResponse("<p>x</p>" * 500), "gzip, br")
+    for response in (small, html):
+        assert not response.has_header("Content-Encoding")
+        assert not response.has_header("Vary")
+
+
+def test_client_without_compression_gets_vary():
+    response = compressed(lambda: JsonResponse(BIG_PAYLOAD), "")
+    assert not response.has_header("Content-Encoding")
+    assert response["Vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize(
+    ("encoding", "decompress"), [("gzip", gzip.decompress), ("br", brotli.decompress)]
+)
+def test_streaming_export_compressed(encoding, decompress):
+    rows = [f"{index},Item {index}\n".encode() for index in range(1000)]
+    response = compressed(
+        lambda: StreamingHttpResponse(iter(rows), content_type="text/csv"), encoding
+    )
+    assert response["Content-Encoding"] == encoding
+    assert decompress(b"".join(response.streaming_content)) == b"".join(rows)
+
+
+class CompressedApiTests(APITestCase):
+    def test_item_list_compressed_and_304_with_weak_etag(self):
+        Item.objects.bulk_create(
+            Item(name=f"Item {index}", description="descrição " * 10, status="found")
+            for index in range(27)
+        )
+        response = self.client.get("/api/items/", HTTP_ACCEPT_ENCODING="gzip")
+        assert response["Content-Encoding"] == "gzip"
+        assert len(json.loads(gzip.decompress(response.content))["results"]) == 27
+
+        again = self.client.get(
+            "/api/items/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        assert again.status_code == 304
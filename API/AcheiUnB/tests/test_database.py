@@ -0,0 +1,54 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from AcheiUnB.database import postgres_database, replica_databases
+
+
+@patch.dict(os.environ, {"DB_HOST": "db.internal"}, clear=True)
+def test_persistent_connections_by_default():
+    database = postgres_database(port="5432")
+    assert database["HOST"] == "db.internal"
+    assert database["PORT"] == "5432"
+    assert database["CONN_MAX_AGE"] == 60
+    assert database["CONN_HEALTH_CHECKS"] is True
+    assert database["DISABLE_SERVER_SIDE_CURSORS"] is False
+    assert "pool" not in database["OPTIONS"]
+
+
+@patch.dict(os.environ, {"DB_CONN_MAX_AGE": "0", "DB_PGBOUNCER": "true"}, clear=True)
+def test_pgbouncer_disables_server_side_cursors():
+    database = postgres_database()
+    assert database["CONN_MAX_AGE"] == 0
+    assert database["DISABLE_SERVER_SIDE_CURSORS"] is True
+
+
+@patch.dict(os.environ, {"DB_POOL": "1", "DB_POOL_MAX_SIZE": "20"}, clear=True)
+def test_pool_replaces_persistent_connections():
+    with patch("importlib.util.find_spec", return_value=object()):
+        database = postgres_database()
+    assert database["CONN_MAX_AGE"] == 0
+    assert database["OPTIONS"]["pool"]["max_size"] == 20
+
+
+@patch.dict(os.environ, {"DB_POOL": "1"}, clear=True)
+def test_pool_requires_psycopg_pool():
+    with patch("importlib.util.find_spec", return_value=None):
+        with pytest.raises(ImproperlyConfigured):
+            postgres_database()
+
+
+REPLICA_ENV = {"DB_HOST": "primary", "DB_REPLICA_HOSTS": "replica-a, replica-b:6432"}
+
+
+@patch.dict(os.environ, REPLICA_ENV, clear=True)
+def test_replicas_from_environment():
+    replicas = replica_databases(port="5432")
+    assert list(replicas) == ["replica_1", "replica_2"]
+    assert replicas["replica_1"]["HOST"] == "replica-a"
+    assert replicas["replica_1"]["PORT"] == "5432"
+    assert replicas["replica_2"]["HOST"] == "replica-b"
+    assert replicas["replica_2"]["PORT"] == "6432"
+    assert replicas["replica_1"]["TEST"] == {"MIRROR": "default"}
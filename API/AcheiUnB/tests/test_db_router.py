@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from AcheiUnB.db_router import (
+    PRIMARY_PIN_COOKIE,
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    enter_read_only_task,
+    exit_read_only_task,
+    routing_context,
+    use_primary,
+)
+from users.models import Item
+
+REPLICAS = ["replica_1", "replica_2"]
+router = ReplicaRouter()
+
+
+def routing_view(request):
+    """View de teste: responde o banco escolhido para leitura e escreve em POSTs."""
+    alias = router.db_for_read(Item)
+    if request.method == "POST":
+        router.db_for_write(Item)
+    return HttpResponse(alias)
+
+
+middleware = ReplicaRoutingMiddleware(routing_view)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+def test_without_replicas_everything_uses_primary():
+    with routing_context(read_from_replica=True):
+        assert router.db_for_read(Item) == "default"
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+def test_reads_outside_routing_context_use_primary():
+    assert router.db_for_read(Item) == "default"
+    assert router.db_for_write(Item) == "default"
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+def test_write_sends_following_reads_to_primary():
+    with routing_context(read_from_replica=True) as state:
+        assert router.db_for_read(Item) in REPLICAS
+        router.db_for_write(Item)
+        assert router.db_for_read(Item) == "default"
+    assert state["wrote"]
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+def test_reads_inside_transaction_use_primary():
+    with routing_context(read_from_replica=True):
+        with patch.object(connections["default"], "in_atomic_block", True):
+            assert router.db_for_read(Item) == "default"
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+def test_related_reads_follow_instance_database():
+    instance = Item(id=1)
+    instance._state.db = "replica_2"
+    with routing_context(read_from_replica=True):
+        assert router.db_for_read(Item, instance=instance) == "replica_2"
+
+
+def test_migrations_only_on_primary():
+    assert router.allow_migrate("default", "users")
+    assert not router.allow_migrate("replica_1", "users")
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS, DATABASE_REPLICA_STICKY_SECONDS=5)
+def test_middleware_routes_safe_requests_and_pins_writers():
+    factory = RequestFactory()
+
+    response = middleware(factory.get("/api/items/"))
+    assert response.content.decode() in REPLICAS
+    assert PRIMARY_PIN_COOKIE not in response.cookies
+
+    response = middleware(factory.post("/api/items/"))
+    assert response.content.decode() == "default"
+    assert response.cookies[PRIMARY_PIN_COOKIE]["max-age"] == 5
+
+    request = factory.get("/api/items/")
+    request.COOKIES[PRIMARY_PIN_COOKIE] = "1"
+    assert middleware(request).content.decode() == "default"
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+def test_read_only_tasks_use_replicas():
+    read_only_task = SimpleNamespace(read_only=True)
+    enter_read_only_task("task-1", read_only_task)
+    assert router.db_for_read(Item) in REPLICAS
+    exit_read_only_task("task-1")
+    assert router.db_for_read(Item) == "default"
+
+    enter_read_only_task("task-2", SimpleNamespace())
+    assert router.db_for_read(Item) == "default"
+    exit_read_only_task("task-2")
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+def test_use_primary_inside_replica_context():
+    with routing_context(read_from_replica=True) as state:
+        with use_primary():
+            assert router.db_for_read(Item) == "default"
+        assert router.db_for_read(Item) in REPLICAS
+
+        with use_primary():
+            router.db_for_write(Item)
+        assert router.db_for_read(Item) == "default"
+    assert state["wrote"]
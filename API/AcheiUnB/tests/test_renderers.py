@@ -0,0 +1,74 @@
+import io
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from AcheiUnB.renderers import OrjsonParser, OrjsonRenderer
+
+PAYLOAD = {
+    "utc": datetime(2024, 11, 5, 13, 30, 15, 123456, tzinfo=timezone.utc),
+    "offset": datetime(2024, 11, 5, 10, 30, tzinfo=timezone(timedelta(hours=-3))),
+    "naive": datetime(2024, 11, 5, 13, 30),
+    "date": date(2024, 11, 5),
+    "decimal": Decimal("10.50"),
+    "duration": timedelta(minutes=3),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "lazy": gettext_lazy("Carteira"),
+    "nested": [{"nome": "Óculos", "id": 1, "ativo": True, "nota": None}],
+    1: "chave numérica",
+}
+
+
+def test_same_output_as_drf_renderer():
+    assert OrjsonRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+def test_indent_falls_back_to_drf_renderer():
+    media_type = "application/json; indent=2"
+    assert OrjsonRenderer().render(PAYLOAD, media_type) == JSONRenderer().render(
+        PAYLOAD, media_type
+    )
+
+
+def test_huge_integers_fall_back_to_drf_renderer():
+    assert OrjsonRenderer().render({"n": 2**70}) == JSONRenderer().render({"n": 2**70})
+
+
+def test_line_separators_are_escaped_like_drf():
+    data = {"texto": "linha\u2028outra\u2029fim"}
+    content = OrjsonRenderer().render(data)
+    assert content == JSONRenderer().render(data)
+    assert b"\\u2028" in content
+    assert b"\\u2029" in content
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_non_finite_floats_raise_like_drf(value):
+    data = {"itens": [{"nota": value, "id": None}]}
+    with pytest.raises(ValueError, match="Out of range float values"):
+        JSONRenderer().render(data)
+    with pytest.raises(ValueError, match="Out of range float values"):
+        OrjsonRenderer().render(data)
+
+
+def test_parser_matches_drf_parser():
+    content = JSONRenderer().render({"name": "Guarda-chuva", "ids": [1, 2], "lat": 1.5})
+    assert OrjsonParser().parse(io.BytesIO(content)) == JSONParser().parse(io.BytesIO(content))
+
+
+def test_parser_decodes_other_charsets():
+    content = '{"nome": "Calção"}'.encode("latin-1")
+    parsed = OrjsonParser().parse(io.BytesIO(content), parser_context={"encoding": "latin-1"})
+    assert parsed == {"nome": "Calção"}
+
+
+@pytest.mark.parametrize("content", [b"{", b'{"valor": NaN}', b""])
+def test_parser_rejects_invalid_json(content):
+    with pytest.raises(ParseError):
+        OrjsonParser().parse(io.BytesIO(content))
@@ -0,0 +1,115 @@
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from AcheiUnB.db_router import PRIMARY_PIN_COOKIE
+from users.models import Color, Item
+from users.taxonomy import taxonomy_registry
+
+# Só roda com dois bancos de verdade: --ds=AcheiUnB.settings_replica_test.
+pytestmark = pytest.mark.skipif(
+    "replica_1" not in settings.DATABASES,
+    reason="requer a configuração com réplica (AcheiUnB.settings_replica_test)",
+)
+
+ALIASES = ("default", "replica_1")
+
+
+def replicate():
+    """Copia o primário para a réplica, como a replicação faria."""
+    for alias in ALIASES:
+        connections[alias].ensure_connection()
+    connections["default"].connection.backup(connections["replica_1"].connection)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = set(ALIASES)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("leitor", "leitor@example.com", "pwd")
+        self.item = Item.objects.create(name="Garrafa azul", status="found")
+        replicate()
+        self.client = APIClient()
+
+    def item_queries(self, method, *args, table="users_item", **kwargs):
+        """Resposta e, por alias, as consultas a ``table`` feitas na requisição."""
+        with ExitStack() as stack:
+            captured = {
+                alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in ALIASES
+            }
+            response = method(*args, **kwargs)
+        queries = {
+            alias: [q["sql"] for q in context.captured_queries if table in q["sql"]]
+            for alias, context in captured.items()
+        }
+        return response, queries
+
+    def names(self, response):
+        return [item["name"] for item in response.data["results"]]
+
+    def test_reads_go_to_replica(self):
+        self.client.force_authenticate(user=self.user)
+        response, queries = self.item_queries(self.client.get, "/api/items/found/")
+        assert self.names(response) == ["Garrafa azul"]
+        assert queries["replica_1"]
+        assert not queries["default"]
+
+    def test_replica_lag_is_visible_without_pin(self):
+        Item.objects.create(name="Garrafa verde", status="found")
+        self.client.force_authenticate(user=self.user)
+        response, queries = self.item_queries(self.client.get, "/api/items/found/")
+        # A réplica ainda não recebeu a escrita.
+        assert self.names(response) == ["Garrafa azul"]
+        assert queries["replica_1"]
+
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
+    def test_writer_is_pinned_to_primary(self, mock_task):
+        self.client.force_authenticate(user=self.user)
+        response, queries = self.item_queries(
+            self.client.post,
+            "/api/items/",
+            {"name": "Garrafa verde", "status": "found"},
+            format="json",
+        )
+        assert response.status_code == 201
+        assert queries["default"]
+        assert not queries["replica_1"]
+        assert response.cookies[PRIMARY_PIN_COOKIE].value == "1"
+
+        # O cliente guarda o cookie: a próxima leitura vê a própria escrita.
+        response, queries = self.item_queries(self.client.get, "/api/items/found/")
+        assert sorted(self.names(response)) == ["Garrafa azul", "Garrafa verde"]
+        assert queries["default"]
+        assert not queries["replica_1"]
+
+    def test_cache_refill_reads_primary(self):
+        self.client.get("/api/items/found/")
+        # Escrita de outro cliente: invalida o cache, mas a réplica está atrasada.
+        Item.objects.create(name="Garrafa verde", status="found")
+
+        response, queries = self.item_queries(self.client.get, "/api/items/found/")
+        assert sorted(self.names(response)) == ["Garrafa azul", "Garrafa verde"]
+        assert queries["default"]
+        assert not queries["replica_1"]
+
+    def test_taxonomy_reload_reads_primary(self):
+        taxonomy_registry.reset()
+        self.client.get("/api/taxonomy/")
+        Color.objects.create(name="Vinho", color_id="93")
+
+        response, queries = self.item_queries(
+            self.client.get, "/api/taxonomy/", table="users_color"
+        )
+        assert "Vinho" in [color["name"] for color in response.data["colors"]]
+        assert queries["default"]
+        assert not queries["replica_1"]
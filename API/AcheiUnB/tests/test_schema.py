@@ -0,0 +1,84 @@
+import gzip
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from AcheiUnB import schema
+
+
+@pytest.fixture(autouse=True)
+def _fresh_schema():
+    schema._schemas.clear()
+    schema.schema_key.cache_clear()
+    cache.clear()
+    yield
+    schema._schemas.clear()
+    schema.schema_key.cache_clear()
+
+
+@pytest.fixture()
+def generate():
+    with patch("AcheiUnB.schema.generate_schema", wraps=schema.generate_schema) as mock:
+        yield mock
+
+
+def test_schema_is_generated_once(client, generate):
+    first = client.get("/swagger.json")
+    second = client.get("/swagger.json")
+    assert first.status_code == 200
+    assert second.content == first.content
+    assert "/items/{id}/" in json.loads(first.content)["paths"]
+    assert generate.call_count == 1
+
+
+def test_schema_has_no_request_host():
+    content = json.loads(schema.generate_schema())
+    assert "host" not in content
+    assert "schemes" not in content
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get("/swagger.json")["ETag"]
+    assert etag == f'"{schema.schema_key()}"'
+    assert client.get("/swagger.json", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+def test_docs_pages_use_cached_schema(client, generate):
+    response = client.get("/swagger/")
+    assert response.status_code == 200
+    assert b"/swagger.json" in response.content
+    assert client.get("/redoc/").status_code == 200
+    client.get("/swagger/?format=openapi")
+    client.get("/swagger.json")
+    assert generate.call_count == 1
+
+
+def test_key_changes_with_app_version(settings):
+    key = schema.schema_key()
+    settings.APP_VERSION = "abc123"
+    schema.schema_key.cache_clear()
+    assert schema.schema_key() != key
+
+
+def test_shared_cache_only_with_app_version(settings, generate):
+    cache.set(schema.SCHEMA_CACHE_KEY.format(schema.schema_key()), b"{}")
+    assert schema.get_schema() != b"{}"
+
+    settings.APP_VERSION = "abc123"
+    schema._schemas.clear()
+    schema.schema_key.cache_clear()
+    cache.set(schema.SCHEMA_CACHE_KEY.format(schema.schema_key()), b"{}")
+    assert schema.get_schema() == b"{}"
+    assert generate.call_count == 1
+
+
+def test_generate_schema_command_writes_static_file(settings, tmp_path):
+    settings.STATIC_ROOT = str(tmp_path)
+    call_command("generate_schema", stdout=io.StringIO())
+    content = (tmp_path / "openapi" / "swagger.json").read_bytes()
+    assert json.loads(content)["info"]["title"] == "AcheiUnB API"
+    assert gzip.decompress((tmp_path / "openapi" / "swagger.json.gz").read_bytes()) == content
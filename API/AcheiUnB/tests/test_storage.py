@@ -0,0 +1,60 @@
+import gzip
+import json
+import os
+
+import brotli
+from django.conf import settings
+
+from AcheiUnB.storage import IMMUTABLE_ASSET_PATTERN, PrecompressedStaticFilesStorage
+
+MANIFEST_PATH = os.path.join(
+    settings.BASE_DIR, "AcheiUnB", "static", "dist", ".vite", "manifest.json"
+)
+
+
+def test_manifest_assets_are_immutable():
+    with open(MANIFEST_PATH) as file:
+        manifest = json.load(file)
+    files = set()
+    for chunk in manifest.values():
+        files.add(chunk["file"])
+        files.update(chunk.get("css", []))
+        files.update(chunk.get("assets", []))
+    assert files
+    for name in files:
+        assert IMMUTABLE_ASSET_PATTERN.match(name), name
+
+
+def test_unhashed_files_are_not_immutable():
+    assert not IMMUTABLE_ASSET_PATTERN.match("admin/js/core.js")
+    assert not IMMUTABLE_ASSET_PATTERN.match("js/main.js")
+
+
+def test_post_process_writes_precompressed_siblings(tmp_path):
+    (tmp_path / "app-AbCdEf12.js").write_text("console.log('achei');\n" * 200)
+    (tmp_path / "tiny.css").write_text("body{}")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" * 1000)
+    storage = PrecompressedStaticFilesStorage(location=str(tmp_path))
+    names = ["app-AbCdEf12.js", "tiny.css", "logo.png"]
+
+    processed = list(storage.post_process({name: (storage, name) for name in names}))
+
+    assert processed == [("app-AbCdEf12.js", "app-AbCdEf12.js", True)]
+    script = tmp_path / "app-AbCdEf12.js"
+    assert (
+        gzip.decompress((tmp_path / "app-AbCdEf12.js.gz").read_bytes()) == script.read_bytes()
+    )
+    assert (
+        brotli.decompress((tmp_path / "app-AbCdEf12.js.br").read_bytes())
+        == script.read_bytes()
+    )
+    assert (tmp_path / "app-AbCdEf12.js.gz").stat().st_mtime == script.stat().st_mtime
+    assert not (tmp_path / "tiny.css.gz").exists()
+    assert not (tmp_path / "logo.png.gz").exists()
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    (tmp_path / "app.js").write_text("x" * 5000)
+    storage = PrecompressedStaticFilesStorage(location=str(tmp_path))
+    assert list(storage.post_process({"app.js": (storage, "app.js")}, dry_run=True)) == []
+    assert not (tmp_path / "app.js.gz").exists()
@@ -3,9 +3,6 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.shortcuts import render
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -14,18 +11,7 @@ from rest_framework_simplejwt.views import (
 from users import views
 from users.views import DeleteUserView, microsoft_callback
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="AcheiUnB API",
-        default_version="v1",
-        description="Documentação interativa das APIs do AcheiUnB",
-        terms_of_service="https://www.unb.br",
-        contact=openapi.Contact(email="acheiunb2024@gmail.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from .schema import SchemaView, schema_json
 
 
 def vue_app(request):
@@ -47,11 +33,11 @@ urlpatterns = [
     path("api/chat/", include("chat.urls")),
     path("api/", include("users.urls")),
     path("delete-user/<int:user_id>/", DeleteUserView.as_view(), name="delete_user"),
-    path(
-        "swagger/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"
-    ),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
-    path("swagger.json", schema_view.without_ui(cache_timeout=0), name="schema-json"),
+    # As páginas de documentação só trazem o HTML; o schema vem de swagger.json, gerado
+    # uma vez por deploy (AcheiUnB.schema e o comando generate_schema).
+    path("swagger/", SchemaView.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
+    path("redoc/", SchemaView.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    path("swagger.json", schema_json, name="schema-json"),
 ]
 
 if settings.DEBUG:
@@ -11,6 +11,9 @@ ruff . --fix
 echo "Coletando arquivos estáticos..."
 python manage.py collectstatic --noinput --clear
 
+echo "Gerando o schema OpenAPI..."
+python manage.py generate_schema || echo "Schema não gerado; o Django gera na primeira requisição."
+
 if [ "$RUN_MIGRATIONS" = "true" ]; then
     echo "Gerando novas migrações..."
     python manage.py makemigrations --noinput  
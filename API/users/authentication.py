@@ -1,5 +1,82 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from .cache import bump_generation, get_generation
+
+# Versão de cada usuário no cache compartilhado: alterar ou remover o usuário em um
+# processo invalida as cópias locais de todos os outros.
+USER_VERSION_KEY = "auth:user:{}:version"
+
+
+class UserCache:
+    """
+    Cache local (por processo) dos usuários resolvidos a partir de tokens JWT.
+
+    As entradas são indexadas pelo token bruto, que já carrega o ID do usuário,
+    expiram após ``ttl`` segundos e o total é limitado a ``maxsize`` (LRU). Cada acerto
+    confere a versão do usuário no cache compartilhado, incrementada por
+    ``invalidate_user``: um usuário desativado ou removido deixa de ser aceito em todos
+    os processos, não só no que fez a escrita.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self._lock:
+            entry = self._entries.get(raw_token)
+            if entry is None:
+                return None
+            expires_at, version, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[raw_token]
+                return None
+            self._entries.move_to_end(raw_token)
+        if version != self.version(user.pk):
+            with self._lock:
+                self._entries.pop(raw_token, None)
+            return None
+        # Cada requisição recebe sua própria cópia para não compartilhar estado mutável.
+        return copy.copy(user)
+
+    def version(self, user_id):
+        return get_generation(USER_VERSION_KEY.format(user_id))
+
+    def set(self, raw_token, user):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        version = self.version(user.pk)
+        with self._lock:
+            self._entries[raw_token] = (time.monotonic() + self.ttl, version, copy.copy(user))
+            self._entries.move_to_end(raw_token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        bump_generation(USER_VERSION_KEY.format(user_id))
+        with self._lock:
+            stale = [key for key, (*_, user) in self._entries.items() if user.pk == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, "AUTH_USER_CACHE_MAXSIZE", 1024),
+    ttl=getattr(settings, "AUTH_USER_CACHE_TTL", 60),
+)
+
 
 class CookieJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
@@ -16,6 +93,10 @@ class CookieJWTAuthentication(JWTAuthentication):
             return None
 
         validated_token = self.get_validated_token(raw_token)
-        user = self.get_user(validated_token)
+
+        user = user_cache.get(raw_token)
+        if user is None:
+            user = self.get_user(validated_token)
+            user_cache.set(raw_token, user)
 
         return user, validated_token
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from .models import Item, ItemImage
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+# conjunto -> (queryset, [(coluna no arquivo, campo no banco)])
+EXPORT_DATASETS = {
+    "items": (
+        lambda: Item.objects.order_by("id"),
+        [
+            ("id", "id"),
+            ("name", "name"),
+            ("description", "description"),
+            ("status", "status"),
+            ("barcode", "barcode"),
+            ("category_id", "category_id"),
+            ("location_id", "location_id"),
+            ("color_id", "color_id"),
+            ("brand_id", "brand_id"),
+            ("user_id", "user_id"),
+            ("found_lost_date", "found_lost_date"),
+            ("created_at", "created_at"),
+        ],
+    ),
+    "images": (
+        lambda: ItemImage.objects.order_by("id"),
+        [("id", "id"), ("item_id", "item_id"), ("image_url", "image_url")],
+    ),
+    # Item.matches é gravado no item perdido apontando para o achado.
+    "matches": (
+        lambda: Item.matches.through.objects.order_by("id"),
+        [("lost_item_id", "from_item_id"), ("found_item_id", "to_item_id")],
+    ),
+}
+
+
+def export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_export(dataset, file_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Gera o conteúdo da exportação em pedaços de até ``chunk_size`` linhas.
+
+    Usa ``values_list().iterator()`` (cursor no servidor no PostgreSQL), então a memória
+    fica constante independentemente do tamanho da tabela e o primeiro pedaço sai logo.
+    """
+    queryset_factory, columns = EXPORT_DATASETS[dataset]
+    headers = [header for header, _ in columns]
+    rows = (
+        queryset_factory()
+        .values_list(*[field for _, field in columns])
+        .iterator(chunk_size=chunk_size)
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if file_format == "csv" else None
+    if writer:
+        writer.writerow(headers)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    for count, row in enumerate(rows, start=1):
+        values = [export_value(value) for value in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(headers, values)), ensure_ascii=False))
+            buffer.write("\n")
+
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
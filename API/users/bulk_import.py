@@ -0,0 +1,221 @@
+import csv
+import io
+import json
+import resource
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from datetime import time as dt_time
+
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import get_current_timezone, is_naive, make_aware
+
+from .cache import item_list_cache
+from .models import Item
+from .scoring import item_tokens
+from .tasks import find_and_notify_matches_bulk_task
+from .taxonomy import TAXONOMY_MODELS, taxonomy_registry
+from .text_index import index_items
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+IMPORT_FORMATS = ("csv", "json", "jsonl")
+
+NAME_MAX_LENGTH = Item._meta.get_field("name").max_length
+DESCRIPTION_MAX_LENGTH = Item._meta.get_field("description").max_length
+STATUSES = {value for value, _ in Item.STATUS_CHOICES}
+
+
+@dataclass
+class ImportReport:
+    """Resultado de uma importação em lote, com vazão e pico de memória do processo."""
+
+    rows: int = 0
+    created: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+    item_ids: list = field(default_factory=list)
+    elapsed: float = 0.0
+    peak_memory_mb: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "peak_memory_mb": round(self.peak_memory_mb, 1),
+        }
+
+
+def detect_format(filename):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension == "ndjson":
+        return "jsonl"
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def iter_rows(binary_stream, file_format):
+    """Lê as linhas do arquivo sob demanda; CSV e JSON Lines nunca são carregados inteiros."""
+    if file_format == "json":
+        # Um array JSON precisa ser lido por completo; para arquivos grandes prefira jsonl.
+        rows = json.load(binary_stream)
+        if not isinstance(rows, list):
+            raise ValueError("O arquivo JSON deve conter uma lista de itens.")
+        yield from rows
+        return
+
+    text_stream = io.TextIOWrapper(binary_stream, encoding="utf-8-sig", newline="")
+    if file_format == "csv":
+        yield from csv.DictReader(text_stream)
+    elif file_format == "jsonl":
+        for line in text_stream:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    # Uma linha malformada vira erro só daquela linha.
+                    yield ValueError(f"JSON inválido: {e}")
+    else:
+        raise ValueError(f"Formato não suportado: {file_format}")
+
+
+def taxonomy_name_maps():
+    """Nome (sem diferenciar maiúsculas) -> ID, para cada taxonomia."""
+    return {
+        kind: {entry["name"].casefold(): entry["id"] for entry in taxonomy_registry.all(kind)}
+        for kind in TAXONOMY_MODELS
+    }
+
+
+def parse_found_lost_date(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            raise ValueError(f"Data inválida: '{value}'.")
+        parsed = datetime.combine(parsed_date, dt_time.min)
+    if is_naive(parsed):
+        parsed = make_aware(parsed, get_current_timezone())
+    return parsed
+
+
+def build_item(row, name_maps, user=None, default_status="found"):
+    """Valida uma linha e monta o Item (sem salvar), já com o barcode calculado."""
+    if not isinstance(row, dict):
+        raise ValueError("Cada linha deve ser um objeto.")
+
+    name = (row.get("name") or "").strip()
+    if not name:
+        raise ValueError("O campo 'name' é obrigatório.")
+    if len(name) > NAME_MAX_LENGTH:
+        raise ValueError(f"'name' deve ter no máximo {NAME_MAX_LENGTH} caracteres.")
+
+    description = (row.get("description") or "").strip()
+    if len(description) > DESCRIPTION_MAX_LENGTH:
+        raise ValueError(
+            f"'description' deve ter no máximo {DESCRIPTION_MAX_LENGTH} caracteres."
+        )
+
+    status = (row.get("status") or default_status).strip().lower()
+    if status not in STATUSES:
+        raise ValueError(f"Status inválido: '{status}'.")
+
+    taxonomy_ids = {}
+    for kind in TAXONOMY_MODELS:
+        value = (row.get(kind) or "").strip()
+        if not value:
+            taxonomy_ids[kind] = None
+            continue
+        taxonomy_ids[kind] = name_maps[kind].get(value.casefold())
+        if taxonomy_ids[kind] is None:
+            raise ValueError(f"Valor desconhecido para '{kind}': '{value}'.")
+
+    found_lost_date = row.get("found_lost_date")
+    found_lost_date = parse_found_lost_date(found_lost_date) if found_lost_date else None
+
+    return Item(
+        user=user,
+        name=name,
+        description=description,
+        status=status,
+        found_lost_date=found_lost_date,
+        category_id=taxonomy_ids["category"],
+        location_id=taxonomy_ids["location"],
+        color_id=taxonomy_ids["color"],
+        brand_id=taxonomy_ids["brand"],
+        # bulk_create não chama Item.save, então barcode e palavras são calculados aqui.
+        barcode=taxonomy_registry.barcode(
+            taxonomy_ids["category"],
+            taxonomy_ids["location"],
+            taxonomy_ids["color"],
+            taxonomy_ids["brand"],
+        ),
+        text_tokens=item_tokens(name, description),
+    )
+
+
+def import_items(rows, user=None, batch_size=IMPORT_BATCH_SIZE, schedule_matching=True):
+    """
+    Importa itens em lote: valida linha a linha, grava com ``bulk_create`` a cada
+    ``batch_size`` itens válidos e agenda um único passe de matching no final.
+    """
+    report = ImportReport()
+    started_at = time.perf_counter()
+    name_maps = taxonomy_name_maps()
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            created = Item.objects.bulk_create(batch)
+            # bulk_create não dispara post_save; o índice textual é gravado aqui.
+            index_items(created)
+        report.created += len(created)
+        report.item_ids.extend(item.id for item in created)
+        batch.clear()
+
+    try:
+        for row_number, row in enumerate(rows, start=1):
+            report.rows += 1
+            try:
+                if isinstance(row, ValueError):
+                    raise row
+                batch.append(build_item(row, name_maps, user=user))
+            except ValueError as e:
+                report.add_error(row_number, str(e))
+                continue
+            if len(batch) >= batch_size:
+                flush()
+    except (ValueError, csv.Error, UnicodeDecodeError) as e:
+        report.add_error(report.rows + 1, f"Arquivo inválido: {e}")
+
+    if batch:
+        flush()
+
+    if report.created:
+        item_list_cache.invalidate()
+        if schedule_matching:
+            find_and_notify_matches_bulk_task.delay(report.item_ids)
+
+    report.elapsed = time.perf_counter() - started_at
+    report.peak_memory_mb = peak_memory_mb()
+    return report
+
+
+def peak_memory_mb():
+    """Pico de memória residente do processo (ru_maxrss é KiB no Linux e bytes no macOS)."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
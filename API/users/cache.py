@@ -0,0 +1,277 @@
+import functools
+import hashlib
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from AcheiUnB.db_router import use_primary
+
+from .metrics import increment
+
+# Quanto tempo um processo pode segurar o recálculo de uma chave e quanto os demais
+# esperam por ele antes de calcular por conta própria.
+RECOMPUTE_LOCK_TIMEOUT = 30
+RECOMPUTE_WAIT = 2.0
+RECOMPUTE_POLL_INTERVAL = 0.05
+
+# Backends em que cada processo tem o próprio cache (sem REDIS_URL): o que a web grava
+# não é visto pelos workers, e vice-versa.
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+CACHE_STATS_KEY = "metrics:cache:{}:{}"
+# stale: entrada vencida servida; refreshes: entrada vencida recalculada por este processo.
+CACHE_STATS_KINDS = ("hits", "misses", "stale", "refreshes")
+
+
+def is_shared_cache():
+    return settings.CACHES["default"]["BACKEND"] not in LOCAL_CACHE_BACKENDS
+
+
+def get_generation(key):
+    generation = cache.get(key)
+    if generation is None:
+        # Semente baseada no relógio: se a chave for despejada do cache, a nova geração
+        # nunca coincide com uma anterior e respostas antigas não voltam a ser servidas.
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def request_digest(request):
+    """Hash da rota e dos parâmetros normalizados (ordenados, sem valores vazios)."""
+    params = sorted(
+        (key, value)
+        for key in request.GET
+        for value in request.GET.getlist(key)
+        if value != ""
+    )
+    raw = f"{request.get_host()}{request.path}?{urlencode(params)}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def etag_matches(request, etag):
+    """
+    Comparação fraca com o ``If-None-Match``: ``W/"x"`` vale como ``"x"``, pois o ETag
+    de respostas comprimidas é enfraquecido pelo CompressionMiddleware.
+    """
+    tags = parse_etags(request.headers.get("If-None-Match", ""))
+    return "*" in tags or etag in {tag.removeprefix("W/") for tag in tags}
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """
+    True se a cópia do cliente ainda vale: ``If-None-Match`` bate com ``etag`` ou, sem
+    ele (que tem precedência), ``If-Modified-Since`` não é anterior a ``last_modified``.
+    """
+    if "If-None-Match" in request.headers:
+        return etag_matches(request, etag)
+    if last_modified is None:
+        return False
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+
+
+def is_anonymous(request):
+    return not request.user.is_authenticated
+
+
+class CacheNamespace:
+    """
+    Grupo de chaves do cache compartilhado com prefixo e geração próprios.
+
+    ``invalidate()`` incrementa a geração, que faz parte de todas as chaves: as
+    entradas antigas deixam de ser lidas e expiram sozinhas. ``depends_on`` inclui
+    a geração de outros namespaces na chave (os matches dependem dos itens, p. ex.).
+    A hora da última invalidação é o ``Last-Modified`` das respostas do namespace.
+
+    ``get_or_set`` evita o efeito manada: só um processo recalcula uma chave ausente
+    enquanto os outros aguardam, e uma entrada vencida continua sendo servida por
+    ``stale_timeout`` segundos enquanto um único processo a recalcula.
+    """
+
+    def __init__(self, name, timeout=60 * 10, stale_timeout=60, depends_on=()):
+        self.name = name
+        self.timeout = timeout
+        self.stale_timeout = stale_timeout
+        self.depends_on = tuple(depends_on)
+        self.generation_key = f"{name}:generation"
+        self.modified_at_key = f"{name}:modified_at"
+
+    def generation(self):
+        return get_generation(self.generation_key)
+
+    def invalidate(self):
+        """Invalida de uma vez todas as entradas do namespace."""
+        bump_generation(self.generation_key)
+        cache.set(self.modified_at_key, time.time(), timeout=None)
+
+    def version(self):
+        """Gerações deste namespace e das dependências, usadas nas chaves e nos ETags."""
+        namespaces = (self, *self.depends_on)
+        return "-".join(str(namespace.generation()) for namespace in namespaces)
+
+    def last_modified(self):
+        """Última invalidação deste namespace ou das dependências."""
+        timestamps = []
+        for namespace in (self, *self.depends_on):
+            modified_at = cache.get(namespace.modified_at_key)
+            if modified_at is None:
+                # Sem registro (cache vazio ou despejado), a hora atual é a opção segura:
+                # nenhum cliente recebe 304 com dados que podem ter mudado.
+                cache.add(namespace.modified_at_key, time.time(), timeout=None)
+                modified_at = cache.get(namespace.modified_at_key)
+            timestamps.append(modified_at)
+        return datetime.fromtimestamp(max(timestamps), tz=timezone.utc)
+
+    def key(self, *parts):
+        return ":".join([self.name, self.version(), *map(str, parts)])
+
+    def get_or_set(self, key, compute, timeout=None):
+        """
+        Valor em cache de ``key`` ou o resultado de ``compute()``, que é gravado.
+        ``compute`` pode retornar None para não gravar nada (p. ex. respostas de erro).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        entry = cache.get(key)
+        if entry is not None:
+            fresh_until, value = entry
+            if time.time() < fresh_until or not self._acquire(key):
+                self._count("hits" if time.time() < fresh_until else "stale")
+                return value
+            self._count("refreshes")
+            return self._compute(key, compute, timeout)
+
+        self._count("misses")
+        if not self._acquire(key):
+            entry = self._wait_for(key)
+            if entry is not None:
+                return entry[1]
+        return self._compute(key, compute, timeout)
+
+    def stats(self):
+        keys = [CACHE_STATS_KEY.format(self.name, kind) for kind in CACHE_STATS_KINDS]
+        values = cache.get_many(keys)
+        return {kind: values.get(key, 0) for kind, key in zip(CACHE_STATS_KINDS, keys)}
+
+    def _count(self, kind):
+        increment(CACHE_STATS_KEY.format(self.name, kind))
+
+    def _acquire(self, key):
+        return cache.add(f"{key}:lock", 1, RECOMPUTE_LOCK_TIMEOUT)
+
+    def _wait_for(self, key):
+        deadline = time.monotonic() + RECOMPUTE_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(RECOMPUTE_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def _compute(self, key, compute, timeout):
+        try:
+            # O valor vale para toda a geração: lê do primário, não de uma réplica atrasada.
+            with use_primary():
+                value = compute()
+            if value is not None:
+                cache.set(key, (time.time() + timeout, value), timeout + self.stale_timeout)
+            return value
+        finally:
+            cache.delete(f"{key}:lock")
+
+
+item_list_cache = CacheNamespace("items:list")
+item_matches_cache = CacheNamespace("items:matches", depends_on=(item_list_cache,))
+taxonomy_cache = CacheNamespace("taxonomy")
+public_user_cache = CacheNamespace("users:public", timeout=60 * 5)
+
+CACHE_NAMESPACES = (item_list_cache, item_matches_cache, taxonomy_cache, public_user_cache)
+
+
+def cached_response(namespace, private=False, condition=None, vary_on=None):
+    """
+    Decorator de métodos de views do DRF: guarda ``response.data`` das respostas 200 em
+    ``namespace``, por rota, parâmetros, argumentos da URL e (se ``private``) usuário.
+
+    Responde com ETag da geração atual e Last-Modified da última invalidação, e com 304
+    quando o cliente já tem a versão atual. Requisições para as quais
+    ``condition(request)`` é falso não usam o cache, mas recebem os mesmos validadores.
+    ``vary_on(request)`` lista namespaces extras dos quais a resposta depende só em algumas
+    requisições (p. ex. ``?expand=user``): suas gerações entram na chave e no ETag.
+    """
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            parts = [value for _, value in sorted(kwargs.items())]
+            if private:
+                parts.append(f"user-{request.user.pk}")
+            extra = list(vary_on(request)) if vary_on is not None else []
+            parts.extend(
+                f"{extra_namespace.name}-{extra_namespace.version()}"
+                for extra_namespace in extra
+            )
+            digest = request_digest(request)
+            key = namespace.key(*parts, digest)
+            etag = f'"{hashlib.md5(key.encode()).hexdigest()}"'
+            last_modified = max(
+                [
+                    namespace.last_modified(),
+                    *(extra_namespace.last_modified() for extra_namespace in extra),
+                ]
+            )
+
+            if is_not_modified(request, etag, last_modified):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            elif condition is not None and not condition(request):
+                response = view_method(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+            else:
+                uncached = {}
+
+                def compute():
+                    response = view_method(view, request, *args, **kwargs)
+                    if response.status_code != status.HTTP_200_OK:
+                        uncached["response"] = response
+                        return None
+                    return response.data
+
+                data = namespace.get_or_set(key, compute)
+                if data is None:
+                    return uncached["response"]
+                response = Response(data)
+
+            set_validators(response, etag, last_modified)
+            if private:
+                patch_cache_control(response, private=True, max_age=0)
+            else:
+                patch_cache_control(response, max_age=0)
+            return response
+
+        return wrapper
+
+    return decorator
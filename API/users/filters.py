@@ -1,18 +1,42 @@
 import django_filters
+from django_filters.constants import EMPTY_VALUES
 
 from users.models import Item
+from users.taxonomy import taxonomy_registry
+
+
+class TaxonomyNameFilter(django_filters.CharFilter):
+    """Filtra por nome (``icontains``) resolvendo os IDs no registro em memória, sem JOIN."""
+
+    def __init__(self, kind, *args, **kwargs):
+        self.kind = kind
+        super().__init__(*args, field_name=f"{kind}_id", **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        ids = taxonomy_registry.ids_matching_name(self.kind, value)
+        return self.get_method(qs)(**{f"{self.field_name}__in": ids})
 
 
 class ItemFilter(django_filters.FilterSet):
-    category_name = django_filters.CharFilter(
-        field_name="category__name", lookup_expr="icontains"
-    )
-    location_name = django_filters.CharFilter(
-        field_name="location__name", lookup_expr="icontains"
+    category_name = TaxonomyNameFilter("category")
+    location_name = TaxonomyNameFilter("location")
+    color_name = TaxonomyNameFilter("color")
+    brand_name = TaxonomyNameFilter("brand")
+    # Sincronização incremental: itens criados ou alterados a partir da data (ISO 8601).
+    # Itens removidos não aparecem; o cliente ainda precisa recarregar a lista completa.
+    modified_since = django_filters.IsoDateTimeFilter(
+        field_name="updated_at", lookup_expr="gte"
     )
-    color_name = django_filters.CharFilter(field_name="color__name", lookup_expr="icontains")
-    brand_name = django_filters.CharFilter(field_name="brand__name", lookup_expr="icontains")
 
     class Meta:
         model = Item
-        fields = ["category_name", "location_name", "color_name", "brand_name", "status"]
+        fields = [
+            "category_name",
+            "location_name",
+            "color_name",
+            "brand_name",
+            "status",
+            "modified_since",
+        ]
@@ -0,0 +1,18 @@
+import time
+
+from celery import shared_task
+
+# Tasks do comando celery_load_test. Ficam fora de users.tasks para não serem
+# registradas nos workers de produção: só entram com LOAD_TEST_TASKS (CELERY_IMPORTS).
+
+
+@shared_task
+def latency_probe(enqueued_at):
+    """Task vazia do teste de carga das filas: segundos entre o envio e a execução."""
+    return time.time() - enqueued_at
+
+
+@shared_task
+def synthetic_upload(duration):
+    """Simula um upload lento no teste de carga das filas."""
+    time.sleep(duration)
@@ -0,0 +1,59 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.test import Client
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede p50/p99 de GET /api/items/ com e sem conexões persistentes. Entre as "
+        "requisições as conexões são fechadas como no fim de uma requisição real "
+        "(respeitando CONN_MAX_AGE), então sem reaproveitamento cada uma paga o connect."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300)
+        parser.add_argument("--path", default="/api/items/")
+        parser.add_argument(
+            "--conn-max-age",
+            type=int,
+            action="append",
+            help="Valores de CONN_MAX_AGE a comparar (padrão: 0 e 60).",
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST="localhost")
+        settings_dict = connections["default"].settings_dict
+        original = settings_dict["CONN_MAX_AGE"]
+
+        try:
+            for conn_max_age in options["conn_max_age"] or [0, 60]:
+                connections["default"].close()
+                settings_dict["CONN_MAX_AGE"] = conn_max_age
+                timings = []
+                for index in range(options["requests"]):
+                    started_at = time.perf_counter()
+                    close_old_connections()
+                    # Parâmetro único para não cair no cache da listagem anônima.
+                    response = client.get(
+                        options["path"], {"bench": f"{conn_max_age}-{index}"}
+                    )
+                    close_old_connections()
+                    timings.append((time.perf_counter() - started_at) * 1000)
+                    if response.status_code != 200:
+                        self.stderr.write(f"Status inesperado: {response.status_code}")
+                        return
+
+                self.stdout.write(
+                    f"CONN_MAX_AGE={conn_max_age}: p50 {statistics.median(timings):.2f} ms, "
+                    f"p99 {percentile(timings, 0.99):.2f} ms ({len(timings)} requisições)."
+                )
+        finally:
+            settings_dict["CONN_MAX_AGE"] = original
@@ -0,0 +1,101 @@
+import io
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from AcheiUnB.renderers import OrjsonParser, OrjsonRenderer
+from users.models import Item, ItemImage
+from users.serializers import ItemSerializer
+
+WORDS = (
+    "carteira mochila garrafa caderno fone celular chave guarda-chuva casaco óculos "
+    "preta azul vermelha couro tecido pequena grande adesivo capa zíper bolso"
+).split()
+
+
+class Rollback(Exception):
+    pass
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara JSONRenderer/JSONParser do DRF com as versões em orjson sobre páginas de "
+        "ItemSerializer (27 e 1.000 itens, por padrão). Os itens são criados numa "
+        "transação desfeita ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[27, 1000])
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        rng = random.Random(options["seed"])
+        base_date = now()
+        items = Item.objects.bulk_create(
+            Item(
+                name=" ".join(rng.sample(WORDS, 2)),
+                description=" ".join(rng.sample(WORDS, 8)),
+                status=rng.choice(["lost", "found"]),
+                barcode="00000000",
+                found_lost_date=base_date - timedelta(days=rng.randint(0, 30)),
+            )
+            for _ in range(max(options["sizes"]))
+        )
+        ItemImage.objects.bulk_create(
+            ItemImage(item=item, image_url=f"https://res.cloudinary.com/demo/{item.id}.jpg")
+            for item in items
+        )
+
+        renderers = {"DRF": JSONRenderer(), "orjson": OrjsonRenderer()}
+        parsers = {"DRF": JSONParser(), "orjson": OrjsonParser()}
+        for size in options["sizes"]:
+            queryset = Item.objects.prefetch_related("images").order_by("id")[:size]
+            started_at = time.perf_counter()
+            results = ItemSerializer(queryset, many=True).data
+            serializer_ms = (time.perf_counter() - started_at) * 1000
+            payload = {"count": size, "next": None, "previous": None, "results": results}
+
+            rendered = {name: renderer.render(payload) for name, renderer in renderers.items()}
+            if rendered["DRF"] != rendered["orjson"]:
+                self.stderr.write("As saídas dos renderers são diferentes!")
+                return
+
+            self.stdout.write(
+                f"{size} itens ({len(rendered['DRF']) / 1024:.0f} KiB), ItemSerializer "
+                f"{serializer_ms:.1f} ms:"
+            )
+            for name in renderers:
+                render_ms = best_of(
+                    options["repeat"], lambda name=name: renderers[name].render(payload)
+                )
+                parse_ms = best_of(
+                    options["repeat"],
+                    lambda name=name: parsers[name].parse(io.BytesIO(rendered["DRF"])),
+                )
+                self.stdout.write(
+                    f"  {name:<6} render {render_ms:8.3f} ms   parse {parse_ms:8.3f} ms"
+                )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from users.cache import CACHE_NAMESPACES
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra acertos, faltas, respostas vencidas servidas e recálculos de entradas "
+        "vencidas de cada namespace do cache."
+    )
+
+    def handle(self, *args, **options):
+        for namespace in CACHE_NAMESPACES:
+            stats = namespace.stats()
+            total = sum(stats.values())
+            hit_rate = (stats["hits"] + stats["stale"]) / total * 100 if total else 0
+            self.stdout.write(
+                f"{namespace.name:<15} acertos {stats['hits']:>8}  faltas {stats['misses']:>8}"
+                f"  vencidas {stats['stale']:>6}  recalculadas {stats['refreshes']:>6}"
+                f"  ({hit_rate:.1f}% servidas do cache)"
+            )
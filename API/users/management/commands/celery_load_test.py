@@ -0,0 +1,55 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.load_test_tasks import latency_probe, synthetic_upload
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga das filas do Celery: enfileira uma rajada de uploads sintéticos "
+        "na fila media e mede quanto tempo tasks da fila notifications esperam para "
+        "começar. Com --shared-queue as sondas vão para a mesma fila dos uploads, "
+        "mostrando a latência sem isolamento. Requer broker, result backend e workers "
+        "rodando (ver docker-compose.yml) com LOAD_TEST_TASKS=true."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--uploads", type=int, default=200)
+        parser.add_argument("--upload-duration", type=float, default=0.5)
+        parser.add_argument("--probes", type=int, default=20)
+        parser.add_argument("--probe-interval", type=float, default=0.25)
+        parser.add_argument("--shared-queue", action="store_true")
+        parser.add_argument("--timeout", type=float, default=300)
+
+    def handle(self, *args, **options):
+        if not settings.LOAD_TEST_TASKS:
+            raise CommandError(
+                "Defina LOAD_TEST_TASKS=true no comando e nos workers para registrar as "
+                "tasks do teste de carga."
+            )
+        probe_queue = "media" if options["shared_queue"] else "notifications"
+
+        started_at = time.perf_counter()
+        for _ in range(options["uploads"]):
+            synthetic_upload.apply_async((options["upload_duration"],), queue="media")
+        self.stdout.write(
+            f"{options['uploads']} uploads sintéticos enfileirados em "
+            f"{time.perf_counter() - started_at:.2f}s; sondas na fila {probe_queue}."
+        )
+
+        results = []
+        for _ in range(options["probes"]):
+            results.append(
+                latency_probe.apply_async((time.time(),), queue=probe_queue, priority=0)
+            )
+            time.sleep(options["probe_interval"])
+
+        latencies = sorted(result.get(timeout=options["timeout"]) for result in results)
+        p95 = latencies[max(0, round(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f"Latência até o início (s): p50 {statistics.median(latencies):.3f}, "
+            f"p95 {p95:.3f}, máx {latencies[-1]:.3f}."
+        )
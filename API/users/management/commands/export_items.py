@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from users.bulk_export import EXPORT_DATASETS, EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = "Exporta itens, imagens ou matches em CSV ou NDJSON com memória constante."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=list(EXPORT_DATASETS))
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--output", help="Arquivo de saída. Padrão: stdout.")
+
+    def handle(self, *args, **options):
+        chunks = iter_export(options["dataset"], options["format"])
+
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        self.stderr.write(f"Exportação gravada em {options['output']}")
@@ -0,0 +1,33 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from AcheiUnB.schema import get_schema, schema_key, schema_static_path
+from AcheiUnB.storage import precompressed_versions
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera o schema OpenAPI uma vez por deploy: grava em STATIC_ROOT/openapi/swagger.json "
+        "(com .gz/.br, servidos pelo nginx) e no cache compartilhado. Rode depois do "
+        "collectstatic, que limpa o STATIC_ROOT."
+    )
+
+    def handle(self, *args, **options):
+        started_at = time.perf_counter()
+        content = get_schema()
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+        path = schema_static_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(content)
+        for suffix, compressed in precompressed_versions(content).items():
+            with open(path + suffix, "wb") as file:
+                file.write(compressed)
+
+        self.stdout.write(
+            f"Schema {schema_key()} ({len(content) / 1024:.0f} KiB) gravado em {path} "
+            f"em {elapsed_ms:.0f} ms."
+        )
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from users.bulk_import import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    detect_format,
+    import_items,
+    iter_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa itens em lote a partir de um arquivo CSV, JSON ou JSON Lines "
+        "(colunas: name, description, status, category, location, color, brand, "
+        "found_lost_date) e informa vazão e pico de memória."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Arquivo a importar.")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, help="Padrão: pela extensão.")
+        parser.add_argument("--user", help="username do responsável pelos itens.")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument(
+            "--no-match", action="store_true", help="Não agenda o matching após importar."
+        )
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or detect_format(options["path"])
+        if file_format is None:
+            raise CommandError("Não foi possível detectar o formato; use --format.")
+
+        user = None
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(username=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Usuário '{options['user']}' não encontrado.")
+
+        with open(options["path"], "rb") as f:
+            report = import_items(
+                iter_rows(f, file_format),
+                user=user,
+                batch_size=options["batch_size"],
+                schedule_matching=not options["no_match"],
+            )
+
+        for error in report.errors:
+            self.stderr.write(f"Linha {error['row']}: {error['error']}")
+        if report.error_count > len(report.errors):
+            self.stderr.write(f"... e mais {report.error_count - len(report.errors)} erros.")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report.created} de {report.rows} linhas importadas em "
+                f"{report.elapsed:.2f}s ({report.rows_per_second:.0f} linhas/s), "
+                f"pico de memória {report.peak_memory_mb:.1f} MiB."
+            )
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from users.metrics import match_latency_summary
+
+
+class Command(BaseCommand):
+    help = "Mostra o histograma de latência entre o cadastro de um item e o e-mail de match."
+
+    def handle(self, *args, **options):
+        summary = match_latency_summary()
+        if not summary["count"]:
+            self.stdout.write("Nenhuma notificação de match registrada.")
+            return
+
+        self.stdout.write(
+            f"{summary['count']} notificações, média {summary['mean_seconds']:.1f}s."
+        )
+        for bucket, count in summary["buckets"].items():
+            share = count / summary["count"] * 100
+            self.stdout.write(f"  <= {bucket:>5}s: {count:>6} ({share:.1f}%)")
@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.match_batch import (
+    compute_all_edges,
+    compute_all_edges_python,
+    item_blocks,
+    score_edges,
+    sync_match_edges,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula os matches de todos os pares perdido x achado com o kernel vetorizado "
+        "(NumPy) para o barcode e a mesma pontuação e janela de datas do matching online, "
+        "e sincroniza Item.matches dentro de cada bloco. Não envia notificações."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-distance", type=int, default=2)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Apenas calcula, sem gravar no banco."
+        )
+        parser.add_argument(
+            "--benchmark",
+            action="store_true",
+            help="Compara o tempo com hamming_distance em Python puro (implica --dry-run).",
+        )
+
+    def handle(self, *args, **options):
+        max_distance = options["max_distance"]
+        blocks = item_blocks()
+        pairs = sum(len(block["lost"]) * len(block["found"]) for block in blocks.values())
+
+        started_at = time.perf_counter()
+        edges = compute_all_edges(max_distance, blocks=blocks)
+        vectorized_time = time.perf_counter() - started_at
+        self.stdout.write(
+            f"{len(blocks)} blocos, {pairs} pares avaliados, {len(edges)} pares com barcode "
+            f"próximo em {vectorized_time:.3f}s (NumPy)."
+        )
+
+        if options["benchmark"]:
+            started_at = time.perf_counter()
+            python_edges = compute_all_edges_python(max_distance, blocks=blocks)
+            python_time = time.perf_counter() - started_at
+            speedup = python_time / vectorized_time if vectorized_time else float("inf")
+            self.stdout.write(
+                f"hamming_distance (Python): {python_time:.3f}s; "
+                f"speedup {speedup:.1f}x; resultados idênticos: {python_edges == edges}."
+            )
+            return
+
+        if options["dry_run"]:
+            return
+
+        edges = score_edges(edges)
+        self.stdout.write(f"{len(edges)} matches após pontuação e janela de datas.")
+        added, removed = sync_match_edges(edges, blocks)
+        self.stdout.write(
+            self.style.SUCCESS(f"{added} matches adicionados, {removed} removidos.")
+        )
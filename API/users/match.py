@@ -1,5 +1,16 @@
-from .models import Item
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils.timezone import now
+
+from .cache import item_matches_cache
+from .metrics import observe_match_latency
+from .models import Item, MatchNotification
+from .scoring import DATE_SLACK, DATE_WINDOW, rank_candidates
 from .tasks import send_match_notification
+from .text_index import text_neighbours
+
+TEXT_NEIGHBOUR_MIN_SIMILARITY = 0.5
 
 
 def hamming_distance(barcode1: str, barcode2: str) -> int:
@@ -7,21 +18,70 @@ def hamming_distance(barcode1: str, barcode2: str) -> int:
     return sum(c1 != c2 for c1, c2 in zip(barcode1, barcode2))
 
 
+def match_fields(item: Item):
+    """Campos que influenciam o matching; se não mudarem, não é preciso refazê-lo."""
+    return (
+        item.barcode,
+        item.status,
+        item.category_id,
+        item.location_id,
+        item.found_lost_date,
+        tuple(item.text_tokens),
+    )
+
+
+def date_window_filter(status, found_lost_date):
+    """Itens sem data ou dentro da janela de match em relação a ``found_lost_date``."""
+    if found_lost_date is None:
+        return Q()
+    if status == "lost":
+        date_range = (found_lost_date - DATE_SLACK, found_lost_date + DATE_WINDOW)
+    else:
+        date_range = (found_lost_date - DATE_WINDOW, found_lost_date + DATE_SLACK)
+    return Q(found_lost_date__isnull=True) | Q(found_lost_date__range=date_range)
+
+
+def candidate_filter(status, category_id, location_id, found_lost_date):
+    """
+    Filtro indexado (``item_match_candidates_idx``) aplicado antes da pontuação:
+    status oposto, mesma categoria e local e data dentro da janela de match.
+    """
+    opposite_status = "found" if status == "lost" else "lost"
+    return Q(
+        status=opposite_status, category_id=category_id, location_id=location_id
+    ) & date_window_filter(status, found_lost_date)
+
+
 def get_potential_matches(target_item: Item, opposite_status: str, max_distance: int):
-    """Obtém itens com o status oposto ao do item alvo e calcula os matches."""
+    """
+    Obtém itens com o status oposto ao do item alvo, descarta os que estão a mais de
+    ``max_distance`` do barcode e ordena os restantes pela pontuação de match.
+    """
     potential_items = Item.objects.filter(
+        candidate_filter(
+            target_item.status,
+            target_item.category_id,
+            target_item.location_id,
+            target_item.found_lost_date,
+        ),
         status=opposite_status,
-        category=target_item.category,
-        location=target_item.location,
     ).prefetch_related("images")
+    # Descrições muito parecidas entram mesmo cadastradas em outro local.
+    text_items = text_neighbours(
+        target_item,
+        date_window_filter(target_item.status, target_item.found_lost_date),
+        min_similarity=TEXT_NEIGHBOUR_MIN_SIMILARITY,
+        status=opposite_status,
+        category_id=target_item.category_id,
+    )
 
-    matches = [
-        item
-        for item in potential_items
+    candidates = {
+        item.id: item
+        for item in [*potential_items, *text_items]
         if hamming_distance(target_item.barcode, item.barcode) <= max_distance
-    ]
+    }
 
-    return matches
+    return rank_candidates(target_item, candidates.values())
 
 
 def generate_match_data(matches):
@@ -43,6 +103,36 @@ def generate_match_data(matches):
     ]
 
 
+def notify_new_matches(lost_item: Item, matches):
+    """
+    Envia ao dono do item perdido apenas os matches que ainda não foram enviados.
+
+    O registro em MatchNotification é criado antes do envio e tem restrição de
+    unicidade, então dois workers processando o mesmo par nunca enviam os dois.
+    """
+    if lost_item.user is None:
+        return []
+
+    new_matches = []
+    for match in matches:
+        _, created = MatchNotification.objects.get_or_create(
+            lost_item=lost_item, found_item=match
+        )
+        if created:
+            new_matches.append(match)
+
+    if new_matches:
+        send_match_notification.delay(
+            to_email=lost_item.user.email,
+            item_name=lost_item.name,
+            matches=generate_match_data(new_matches),
+        )
+        # O match só passou a existir quando o mais recente dos itens foi cadastrado.
+        created_at = max(item.created_at for item in [lost_item, *new_matches])
+        observe_match_latency((now() - created_at).total_seconds())
+    return new_matches
+
+
 def find_and_notify_matches(target_item: Item, max_distance=2):
     """Encontra possíveis matches para o item fornecido e notifica o usuário."""
     if target_item.status == "lost":
@@ -50,15 +140,11 @@ def find_and_notify_matches(target_item: Item, max_distance=2):
             target_item, opposite_status="found", max_distance=max_distance
         )
         if matches:
+            # O add grava as arestas; salvar o item mudaria o updated_at (ETag,
+            # modified_since) e invalidaria a listagem sem o conteúdo ter mudado.
             target_item.matches.add(*matches)
-            target_item.save()
 
-            match_data = generate_match_data(matches)
-            send_match_notification.delay(
-                to_email=target_item.user.email,
-                item_name=target_item.name,
-                matches=match_data,
-            )
+            notify_new_matches(target_item, matches)
 
     elif target_item.status == "found":
         potential_items = get_potential_matches(
@@ -66,12 +152,61 @@ def find_and_notify_matches(target_item: Item, max_distance=2):
         )
         for lost_item in potential_items:
             lost_item.matches.add(target_item)
-            lost_item.save()
-
-            updated_matches = lost_item.matches.all()
-            match_data = generate_match_data(updated_matches)
-            send_match_notification.delay(
-                to_email=lost_item.user.email,
-                item_name=lost_item.name,
-                matches=match_data,
+
+            notify_new_matches(lost_item, [target_item])
+
+
+def find_and_notify_matches_bulk(target_items, max_distance=2):
+    """
+    Versão em lote de find_and_notify_matches, usada após importações.
+
+    Busca os candidatos uma única vez por (status, categoria, local), grava todas as
+    arestas com um único bulk_create e envia uma notificação por item perdido afetado,
+    só com os matches que ainda não tinham sido enviados.
+    """
+    groups = defaultdict(list)
+    for item in target_items:
+        groups[(item.status, item.category_id, item.location_id)].append(item)
+
+    edges = set()
+    for (status, category_id, location_id), items in groups.items():
+        candidates = list(
+            Item.objects.filter(candidate_filter(status, category_id, location_id, None)).only(
+                "id", "status", "barcode", "found_lost_date", "text_tokens"
             )
+        )
+        for item in items:
+            for candidate in rank_candidates(
+                item,
+                [
+                    candidate
+                    for candidate in candidates
+                    if hamming_distance(item.barcode, candidate.barcode) <= max_distance
+                ],
+            ):
+                if status == "lost":
+                    edges.add((item.id, candidate.id))
+                else:
+                    edges.add((candidate.id, item.id))
+
+    if not edges:
+        return
+
+    Match = Item.matches.through
+    Match.objects.bulk_create(
+        [Match(from_item_id=lost_id, to_item_id=found_id) for lost_id, found_id in edges],
+        ignore_conflicts=True,
+    )
+    # bulk_create não dispara m2m_changed.
+    item_matches_cache.invalidate()
+
+    found_ids_by_lost = defaultdict(set)
+    for lost_id, found_id in edges:
+        found_ids_by_lost[lost_id].add(found_id)
+    lost_items = Item.objects.filter(
+        id__in=found_ids_by_lost, user__isnull=False
+    ).select_related("user")
+    for lost_item in lost_items:
+        notify_new_matches(
+            lost_item, lost_item.matches.filter(id__in=found_ids_by_lost[lost_item.id])
+        )
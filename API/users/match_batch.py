@@ -0,0 +1,175 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from .cache import item_matches_cache
+from .match import hamming_distance
+from .models import Item
+from .scoring import rank_candidates
+
+# Só dígitos ASCII: ``encode_barcodes`` assume um byte por dígito.
+BARCODE_PATTERN = re.compile(r"[0-9]{8}")
+BARCODE_SEGMENTS = 4
+# Teto de células (perdidos x achados) da matriz de distâncias calculada de uma vez.
+MAX_MATRIX_CELLS = 4_000_000
+
+
+def encode_barcodes(barcodes):
+    """
+    Converte barcodes ``"CCLLCCMM"`` em uma matriz ``(n, 4)`` de uint8, um inteiro
+    (0-99) por segmento de 2 dígitos.
+    """
+    if not barcodes:
+        return np.empty((0, BARCODE_SEGMENTS), dtype=np.uint8)
+    digits = np.frombuffer("".join(barcodes).encode(), dtype=np.uint8) - ord("0")
+    digits = digits.reshape(len(barcodes), BARCODE_SEGMENTS, 2)
+    return (digits[:, :, 0] * 10 + digits[:, :, 1]).astype(np.uint8)
+
+
+def distance_matrix(lost_codes, found_codes):
+    """
+    Hamming distance (em caracteres, como ``hamming_distance``) entre todas as
+    combinações de linhas, via broadcasting: resultado ``(len(lost), len(found))``.
+    """
+    lost = lost_codes[:, None, :]
+    found = found_codes[None, :, :]
+    tens = (lost // 10) != (found // 10)
+    units = (lost % 10) != (found % 10)
+    return (tens.sum(axis=2, dtype=np.uint8) + units.sum(axis=2, dtype=np.uint8)).astype(
+        np.uint8
+    )
+
+
+def split_by_barcode_format(rows):
+    regular, irregular = [], []
+    for row in rows:
+        (regular if BARCODE_PATTERN.fullmatch(row[1]) else irregular).append(row)
+    return regular, irregular
+
+
+def block_edges(lost, found, max_distance):
+    """Arestas ``(lost_id, found_id)`` de um bloco (mesma categoria e local)."""
+    regular_lost, irregular_lost = split_by_barcode_format(lost)
+    regular_found, irregular_found = split_by_barcode_format(found)
+
+    edges = []
+    if regular_lost and regular_found:
+        found_ids = np.array([item_id for item_id, _ in regular_found])
+        found_codes = encode_barcodes([barcode for _, barcode in regular_found])
+        # Fatias de linhas limitam a memória da matriz de distâncias em blocos grandes.
+        rows_per_slice = max(1, MAX_MATRIX_CELLS // len(regular_found))
+        for start in range(0, len(regular_lost), rows_per_slice):
+            lost_slice = regular_lost[start : start + rows_per_slice]
+            lost_ids = np.array([item_id for item_id, _ in lost_slice])
+            lost_codes = encode_barcodes([barcode for _, barcode in lost_slice])
+            rows, cols = np.nonzero(distance_matrix(lost_codes, found_codes) <= max_distance)
+            edges.extend(zip(lost_ids[rows].tolist(), found_ids[cols].tolist()))
+
+    # Barcodes fora do padrão (taxonomia sem código) seguem pela função original.
+    irregular_pairs = [(row, other) for row in irregular_lost for other in found] + [
+        (row, other) for row in regular_lost for other in irregular_found
+    ]
+    edges.extend(
+        (lost_id, found_id)
+        for (lost_id, lost_barcode), (found_id, found_barcode) in irregular_pairs
+        if hamming_distance(lost_barcode, found_barcode) <= max_distance
+    )
+    return edges
+
+
+def item_blocks():
+    """Agrupa todos os itens por (categoria, local) em listas de perdidos e achados."""
+    blocks = defaultdict(lambda: {"lost": [], "found": []})
+    rows = Item.objects.values_list(
+        "id", "status", "category_id", "location_id", "barcode"
+    ).iterator(chunk_size=5000)
+    for item_id, status, category_id, location_id, barcode in rows:
+        blocks[(category_id, location_id)][status].append((item_id, barcode))
+    return blocks
+
+
+def compute_all_edges(max_distance=2, blocks=None):
+    blocks = item_blocks() if blocks is None else blocks
+    edges = set()
+    for block in blocks.values():
+        edges.update(block_edges(block["lost"], block["found"], max_distance))
+    return edges
+
+
+def compute_all_edges_python(max_distance=2, blocks=None):
+    """Mesmo resultado de compute_all_edges, par a par com ``hamming_distance``."""
+    blocks = item_blocks() if blocks is None else blocks
+    return {
+        (lost_id, found_id)
+        for block in blocks.values()
+        for lost_id, lost_barcode in block["lost"]
+        for found_id, found_barcode in block["found"]
+        if hamming_distance(lost_barcode, found_barcode) <= max_distance
+    }
+
+
+def score_edges(edges, chunk_size=2000):
+    """
+    Mantém só as arestas que o matching online aceitaria: o kernel filtra o barcode e
+    ``rank_candidates`` aplica a pontuação mínima e a janela de datas.
+    """
+    found_ids_by_lost = defaultdict(list)
+    for lost_id, found_id in edges:
+        found_ids_by_lost[lost_id].append(found_id)
+    fields = ("id", "status", "barcode", "found_lost_date", "text_tokens")
+
+    scored = set()
+    lost_ids = list(found_ids_by_lost)
+    for start in range(0, len(lost_ids), chunk_size):
+        chunk = lost_ids[start : start + chunk_size]
+        found_ids = {found_id for lost_id in chunk for found_id in found_ids_by_lost[lost_id]}
+        found_items = Item.objects.only(*fields).in_bulk(found_ids)
+        for lost_item in Item.objects.only(*fields).filter(id__in=chunk):
+            candidates = [
+                found_items[found_id] for found_id in found_ids_by_lost[lost_item.id]
+            ]
+            scored.update(
+                (lost_item.id, found_item.id)
+                for found_item in rank_candidates(lost_item, candidates)
+            )
+    return scored
+
+
+def sync_match_edges(edges, blocks):
+    """
+    Deixa ``Item.matches`` igual a ``edges`` dentro de cada bloco (mesma categoria e
+    local); retorna (adicionadas, removidas). Arestas entre blocos diferentes vêm dos
+    vizinhos de texto do matching online, que o kernel não avalia, e são mantidas.
+    """
+    block_of = {
+        item_id: key
+        for key, block in blocks.items()
+        for item_id, _ in [*block["lost"], *block["found"]]
+    }
+    Match = Item.matches.through
+    existing = {
+        (lost_id, found_id): match_id
+        for match_id, lost_id, found_id in Match.objects.values_list(
+            "id", "from_item_id", "to_item_id"
+        ).iterator(chunk_size=5000)
+    }
+    to_add = edges - existing.keys()
+    to_remove = [
+        match_id
+        for (lost_id, found_id), match_id in existing.items()
+        if (lost_id, found_id) not in edges
+        and block_of.get(lost_id) is not None
+        and block_of.get(lost_id) == block_of.get(found_id)
+    ]
+
+    Match.objects.bulk_create(
+        [Match(from_item_id=lost_id, to_item_id=found_id) for lost_id, found_id in to_add],
+        batch_size=5000,
+        ignore_conflicts=True,
+    )
+    for start in range(0, len(to_remove), 5000):
+        Match.objects.filter(id__in=to_remove[start : start + 5000]).delete()
+    if to_add or to_remove:
+        item_matches_cache.invalidate()
+    return len(to_add), len(to_remove)
@@ -0,0 +1,46 @@
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (segundos) do histograma de latência cadastro -> e-mail de match.
+MATCH_LATENCY_BUCKETS = (1, 5, 15, 30, 60, 300, 900, 3600)
+MATCH_LATENCY_KEY = "metrics:match_latency:{}"
+
+
+def increment(key, delta=1):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def observe_match_latency(seconds):
+    """
+    Registra quanto tempo passou entre o cadastro do item que gerou o match e o
+    enfileiramento do e-mail. Contadores cumulativos no cache, como um histograma do
+    Prometheus, compartilhados entre web e workers.
+    """
+    logger.info("match_notification_latency_seconds=%.3f", seconds)
+    increment(MATCH_LATENCY_KEY.format("count"))
+    increment(MATCH_LATENCY_KEY.format("sum_ms"), round(seconds * 1000))
+    for bucket in MATCH_LATENCY_BUCKETS:
+        if seconds <= bucket:
+            increment(MATCH_LATENCY_KEY.format(f"le_{bucket}"))
+
+
+def match_latency_summary():
+    keys = ["count", "sum_ms", *[f"le_{bucket}" for bucket in MATCH_LATENCY_BUCKETS]]
+    values = cache.get_many([MATCH_LATENCY_KEY.format(key) for key in keys])
+    count = values.get(MATCH_LATENCY_KEY.format("count"), 0)
+    sum_ms = values.get(MATCH_LATENCY_KEY.format("sum_ms"), 0)
+    return {
+        "count": count,
+        "mean_seconds": sum_ms / 1000 / count if count else None,
+        "buckets": {
+            bucket: values.get(MATCH_LATENCY_KEY.format(f"le_{bucket}"), 0)
+            for bucket in MATCH_LATENCY_BUCKETS
+        },
+    }
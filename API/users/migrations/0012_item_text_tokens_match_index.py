@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-19 16:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+from users.scoring import item_tokens
+
+
+def populate_text_tokens(apps, schema_editor):
+    Item = apps.get_model("users", "Item")
+    batch = []
+    for item in Item.objects.only("id", "name", "description").iterator(chunk_size=2000):
+        item.text_tokens = item_tokens(item.name, item.description)
+        batch.append(item)
+        if len(batch) >= 2000:
+            Item.objects.bulk_update(batch, ["text_tokens"])
+            batch.clear()
+    if batch:
+        Item.objects.bulk_update(batch, ["text_tokens"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_squashed_0011_populate_initial_data"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="item",
+            name="text_tokens",
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(populate_text_tokens, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["status", "category", "location", "found_lost_date"],
+                name="item_match_candidates_idx",
+            ),
+        ),
+    ]
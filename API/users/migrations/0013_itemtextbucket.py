@@ -0,0 +1,61 @@
+# Generated by Django 5.1.4 on 2026-10-19 16:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from users.text_index import band_buckets
+
+
+def index_existing_items(apps, schema_editor):
+    Item = apps.get_model("users", "Item")
+    ItemTextBucket = apps.get_model("users", "ItemTextBucket")
+    rows = []
+    for item_id, tokens in Item.objects.values_list("id", "text_tokens").iterator(
+        chunk_size=2000
+    ):
+        rows.extend(
+            ItemTextBucket(item_id=item_id, band=band, bucket=bucket)
+            for band, bucket in band_buckets(tokens)
+        )
+        if len(rows) >= 5000:
+            ItemTextBucket.objects.bulk_create(rows)
+            rows.clear()
+    if rows:
+        ItemTextBucket.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0012_item_text_tokens_match_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemTextBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("band", models.PositiveSmallIntegerField()),
+                ("bucket", models.BigIntegerField()),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="text_buckets",
+                        to="users.item",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["band", "bucket"], name="item_text_bucket_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(index_existing_items, migrations.RunPython.noop),
+    ]
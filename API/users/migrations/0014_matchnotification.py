@@ -0,0 +1,66 @@
+# Generated by Django 5.1.4 on 2026-10-19 16:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def mark_existing_matches_as_notified(apps, schema_editor):
+    """Matches gravados antes do registro já foram enviados por e-mail."""
+    Item = apps.get_model("users", "Item")
+    MatchNotification = apps.get_model("users", "MatchNotification")
+    rows = []
+    for lost_id, found_id in Item.matches.through.objects.values_list(
+        "from_item_id", "to_item_id"
+    ).iterator(chunk_size=5000):
+        rows.append(MatchNotification(lost_item_id=lost_id, found_item_id=found_id))
+        if len(rows) >= 5000:
+            MatchNotification.objects.bulk_create(rows, ignore_conflicts=True)
+            rows.clear()
+    if rows:
+        MatchNotification.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0013_itemtextbucket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchNotification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("sent_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "found_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="users.item",
+                    ),
+                ),
+                (
+                    "lost_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="match_notifications",
+                        to="users.item",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("lost_item", "found_item"), name="unique_match_notification"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(mark_existing_matches_as_notified, migrations.RunPython.noop),
+    ]
@@ -56,18 +56,35 @@ class Item(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="lost")
     found_lost_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Atualizado a cada save e quando imagens são adicionadas ou removidas (ver
+    # users.signals); base do ETag/Last-Modified e do filtro ``?modified_since=``.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     barcode = models.CharField(max_length=10, editable=False, blank=True)
+    # Palavras normalizadas de nome e descrição, usadas na pontuação de matches.
+    text_tokens = models.JSONField(default=list, editable=False, blank=True)
     matches = models.ManyToManyField(
         "self", symmetrical=False, blank=True, related_name="matched_with"
     )
 
+    class Meta:
+        indexes = [
+            # Filtro de candidatos do matching: status oposto, mesma categoria e local,
+            # dentro da janela de datas.
+            models.Index(
+                fields=["status", "category", "location", "found_lost_date"],
+                name="item_match_candidates_idx",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
-        category_id = self.category.category_id if self.category else "00"
-        location_id = self.location.location_id if self.location else "00"
-        color_id = self.color.color_id if self.color else "00"
-        brand_id = self.brand.brand_id if self.brand else "00"
-        self.barcode = f"{category_id}{location_id}{color_id}{brand_id}"
+        from .scoring import item_tokens
+        from .taxonomy import taxonomy_registry
+
+        self.barcode = taxonomy_registry.barcode(
+            self.category_id, self.location_id, self.color_id, self.brand_id
+        )
+        self.text_tokens = item_tokens(self.name, self.description)
         super().save(*args, **kwargs)
 
     def delete_with_related_chats(self):
@@ -80,6 +97,34 @@ class Item(models.Model):
         return f"{self.name} ({self.location})"
 
 
+class ItemTextBucket(models.Model):
+    """Balde LSH (MinHash) de nome/descrição de um item; ver ``users.text_index``."""
+
+    item = models.ForeignKey(Item, related_name="text_buckets", on_delete=models.CASCADE)
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["band", "bucket"], name="item_text_bucket_idx")]
+
+
+class MatchNotification(models.Model):
+    """Registro de match já enviado por e-mail ao dono do item perdido."""
+
+    lost_item = models.ForeignKey(
+        Item, related_name="match_notifications", on_delete=models.CASCADE
+    )
+    found_item = models.ForeignKey(Item, related_name="+", on_delete=models.CASCADE)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lost_item", "found_item"], name="unique_match_notification"
+            )
+        ]
+
+
 class ItemImage(models.Model):
     item = models.ForeignKey(Item, related_name="images", on_delete=models.CASCADE)
     image_url = models.URLField()
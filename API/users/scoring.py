@@ -0,0 +1,118 @@
+import math
+import re
+import unicodedata
+from datetime import timedelta
+
+# Pesos de cada segmento do barcode (categoria, local, cor, marca).
+SEGMENT_WEIGHTS = (0.3, 0.2, 0.3, 0.2)
+# Peso de cada sinal na pontuação final.
+SIGNAL_WEIGHTS = {"barcode": 0.5, "date": 0.25, "text": 0.25}
+# Pontuação usada quando o sinal não pode ser calculado (data ou texto ausente).
+NEUTRAL_SCORE = 0.5
+MIN_MATCH_SCORE = 0.5
+
+# Um item achado antes de ser perdido não é match; ``DATE_SLACK`` tolera datas
+# aproximadas e ``DATE_WINDOW`` limita quanto tempo depois ele pode ter sido achado.
+DATE_SLACK = timedelta(days=1)
+DATE_WINDOW = timedelta(days=60)
+DATE_HALF_LIFE_DAYS = 7
+
+UNKNOWN_SEGMENT = "00"
+
+STOPWORDS = {
+    "a", "as", "o", "os", "um", "uma", "de", "da", "das", "do", "dos", "e", "em", "na",
+    "nas", "no", "nos", "com", "sem", "para", "por", "que", "meu", "minha", "cor",
+    "perdi", "perdido", "perdida", "encontrei", "encontrado", "encontrada", "achei",
+    "achado", "achada",
+}  # fmt: skip
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text):
+    """Minúsculas e sem acentos: ``"Carteira Marrom"`` e ``"carteira marrom"`` se igualam."""
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    return {
+        token
+        for token in TOKEN_PATTERN.findall(normalize_text(text))
+        if len(token) > 1 and token not in STOPWORDS
+    }
+
+
+def item_tokens(name, description):
+    """Conjunto de palavras de nome e descrição, guardado em ``Item.text_tokens``."""
+    return sorted(tokenize(f"{name} {description}"))
+
+
+def jaccard(tokens_a, tokens_b):
+    if not tokens_a or not tokens_b:
+        return None
+    tokens_a, tokens_b = set(tokens_a), set(tokens_b)
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+def barcode_score(barcode_a, barcode_b):
+    """Soma ponderada dos segmentos iguais; segmento desconhecido ("00") vale metade."""
+    score = 0.0
+    for index, weight in enumerate(SEGMENT_WEIGHTS):
+        segment_a = barcode_a[index * 2 : index * 2 + 2]
+        segment_b = barcode_b[index * 2 : index * 2 + 2]
+        if UNKNOWN_SEGMENT in (segment_a, segment_b):
+            score += weight * NEUTRAL_SCORE
+        elif segment_a == segment_b:
+            score += weight
+    return score
+
+
+def in_date_window(lost_date, found_date):
+    """Mesma janela de ``users.match.date_window_filter``; sem data, não há como excluir."""
+    if lost_date is None or found_date is None:
+        return True
+    return lost_date - DATE_SLACK <= found_date <= lost_date + DATE_WINDOW
+
+
+def date_score(lost_date, found_date):
+    """1 quando achado logo após a perda, decaindo com meia-vida de alguns dias."""
+    if lost_date is None or found_date is None:
+        return None
+    if not in_date_window(lost_date, found_date):
+        return 0.0
+    days = max(0.0, (found_date - lost_date).total_seconds() / 86400)
+    return math.pow(0.5, days / DATE_HALF_LIFE_DAYS)
+
+
+def match_score(lost_item, found_item):
+    """Pontuação de 0 a 1 combinando barcode, proximidade de datas e texto."""
+    signals = {
+        "barcode": barcode_score(lost_item.barcode, found_item.barcode),
+        "date": date_score(lost_item.found_lost_date, found_item.found_lost_date),
+        "text": jaccard(lost_item.text_tokens, found_item.text_tokens),
+    }
+    return sum(
+        SIGNAL_WEIGHTS[name] * (NEUTRAL_SCORE if value is None else value)
+        for name, value in signals.items()
+    )
+
+
+def rank_candidates(target_item, candidates, min_score=MIN_MATCH_SCORE):
+    """
+    Candidatos com pontuação mínima, do mais provável para o menos provável. Pares fora
+    da janela de datas nunca são match, mesmo com barcode e texto idênticos, então
+    quem não filtra a janela na consulta (matching em lote) tem o mesmo resultado.
+    """
+    scored = []
+    for candidate in candidates:
+        if target_item.status == "lost":
+            lost_item, found_item = target_item, candidate
+        else:
+            lost_item, found_item = candidate, target_item
+        if not in_date_window(lost_item.found_lost_date, found_item.found_lost_date):
+            continue
+        score = match_score(lost_item, found_item)
+        if score >= min_score:
+            scored.append((score, candidate))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [candidate for _, candidate in scored]
@@ -1,7 +1,115 @@
+from django.db import transaction
 from rest_framework import serializers
 
 from .models import Brand, Category, Color, Item, ItemImage, Location
 from .tasks import remove_images_from_item, upload_images_to_cloudinary
+from .taxonomy import taxonomy_registry
+
+# Campos de ``?expand=``: o ID vira o objeto (taxonomias vêm do taxonomy_registry).
+EXPANDABLE_ITEM_FIELDS = ("category", "location", "color", "brand", "user")
+# Colunas de Item lidas por cada campo de saída de ItemSerializer.
+ITEM_FIELD_COLUMNS = {
+    "id": ("id",),
+    "barcode": ("barcode",),
+    "name": ("name",),
+    "user_id": ("user_id",),
+    "user": ("user_id",),
+    "description": ("description",),
+    "category": ("category_id",),
+    "category_name": ("category_id",),
+    "location": ("location_id",),
+    "location_name": ("location_id",),
+    "color": ("color_id",),
+    "color_name": ("color_id",),
+    "brand": ("brand_id",),
+    "brand_name": ("brand_id",),
+    "status": ("status",),
+    "found_lost_date": ("found_lost_date",),
+    "created_at": ("created_at",),
+    "updated_at": ("updated_at",),
+}
+IMAGE_FIELDS = ("image_urls", "image_ids")
+READABLE_ITEM_FIELDS = (ITEM_FIELD_COLUMNS.keys() - {"user"}) | set(IMAGE_FIELDS)
+
+
+def serialize_public_user(user):
+    """Dados públicos de um usuário, com a foto vinda do perfil (se existir)."""
+    profile = getattr(user, "profile", None)
+    return {
+        "id": user.id,
+        "first_name": user.first_name,
+        "email": user.email,
+        "foto": profile.profile_picture if profile else None,
+    }
+
+
+def query_param_set(request, name):
+    if request is None:
+        return set()
+    params = getattr(request, "query_params", request.GET)
+    return {value.strip() for value in params.get(name, "").split(",") if value.strip()}
+
+
+def item_fieldset(request):
+    """
+    ``(campos, expandidos)`` pedidos em ``?fields=``, ``?omit=`` e ``?expand=``.
+    ``campos`` é None quando a resposta deve ter todos os campos. Só vale para leituras:
+    em escritas a resposta é sempre completa.
+    """
+    if request is None or request.method not in ("GET", "HEAD"):
+        return None, set()
+
+    expand = query_param_set(request, "expand") & set(EXPANDABLE_ITEM_FIELDS)
+    fields = query_param_set(request, "fields")
+    omit = query_param_set(request, "omit")
+    if not fields and not omit:
+        return None, expand
+
+    selected = (fields or READABLE_ITEM_FIELDS) - omit
+    # Campos expandidos entram mesmo sem constar em ``?fields=``.
+    return (selected & READABLE_ITEM_FIELDS) | expand, expand
+
+
+def optimize_item_queryset(queryset, request):
+    """Lê só as colunas e relações usadas pelos campos pedidos na requisição."""
+    fields, expand = item_fieldset(request)
+    if fields is None:
+        columns = None
+        prefetch_images = True
+    else:
+        columns = {"id"}
+        for field in fields:
+            columns.update(ITEM_FIELD_COLUMNS.get(field, ()))
+        prefetch_images = bool(fields & set(IMAGE_FIELDS))
+
+    if columns is not None:
+        queryset = queryset.only(*columns)
+    if prefetch_images:
+        queryset = queryset.prefetch_related("images")
+    if "user" in expand:
+        queryset = queryset.select_related("user__profile")
+    return queryset
+
+
+class ExpandedTaxonomyField(serializers.Field):
+    """Categoria/local/cor/marca como ``{"id", "name", "<tipo>_id"}``, sem consulta."""
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        super().__init__(source=f"{kind}_id", read_only=True, **kwargs)
+
+    def to_representation(self, value):
+        return taxonomy_registry.get(self.kind, value)
+
+
+class PublicUserField(serializers.Field):
+    """Usuário do item com os dados públicos de ``serialize_public_user``."""
+
+    def __init__(self, **kwargs):
+        super().__init__(read_only=True, **kwargs)
+
+    def to_representation(self, value):
+        return serialize_public_user(value)
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -46,7 +154,8 @@ class ItemSerializer(serializers.ModelSerializer):
     )
     image_urls = serializers.SerializerMethodField(read_only=True)
     image_ids = serializers.SerializerMethodField(read_only=True)
-    user_id = serializers.IntegerField(source="user.id", read_only=True)
+    # ``user_id`` (a coluna) e não ``user.id``: não carrega o usuário de cada item.
+    user_id = serializers.IntegerField(read_only=True)
     barcode = serializers.CharField(read_only=True)
     category_name = serializers.SerializerMethodField()
     location_name = serializers.SerializerMethodField()
@@ -75,12 +184,28 @@ class ItemSerializer(serializers.ModelSerializer):
             "status",
             "found_lost_date",
             "created_at",
+            "updated_at",
             "images",
             "remove_images",
             "image_urls",
             "image_ids",
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ``?fields=``/``?omit=`` removem campos da resposta e ``?expand=`` troca IDs
+        # pelos objetos; ver optimize_item_queryset para a consulta correspondente.
+        fields, expand = item_fieldset(self.context.get("request"))
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields and not self.fields[name].write_only:
+                    self.fields.pop(name)
+        for name in expand:
+            if name == "user":
+                self.fields["user"] = PublicUserField()
+            else:
+                self.fields[name] = ExpandedTaxonomyField(name)
+
     def validate_images(self, value):
         for image in value:
             if not hasattr(image, "file"):
@@ -101,7 +226,8 @@ class ItemSerializer(serializers.ModelSerializer):
         item = super().create(validated_data)
 
         if images:
-            upload_images_to_cloudinary.delay(item.id, [image.file.read() for image in images])
+            contents = [image.file.read() for image in images]
+            transaction.on_commit(lambda: upload_images_to_cloudinary.delay(item.id, contents))
 
         return item
 
@@ -119,23 +245,24 @@ class ItemSerializer(serializers.ModelSerializer):
             )
 
         if images:
-            upload_images_to_cloudinary.delay(
-                instance.id, [image.file.read() for image in images]
+            contents = [image.file.read() for image in images]
+            transaction.on_commit(
+                lambda: upload_images_to_cloudinary.delay(instance.id, contents)
             )
 
         return super().update(instance, validated_data)
 
     def get_category_name(self, obj):
-        return obj.category.name if obj.category else None
+        return taxonomy_registry.name("category", obj.category_id)
 
     def get_location_name(self, obj):
-        return obj.location.name if obj.location else None
+        return taxonomy_registry.name("location", obj.location_id)
 
     def get_color_name(self, obj):
-        return obj.color.name if obj.color else None
+        return taxonomy_registry.name("color", obj.color_id)
 
     def get_brand_name(self, obj):
-        return obj.brand.name if obj.brand else None
+        return taxonomy_registry.name("brand", obj.brand_id)
 
     def get_image_urls(self, obj):
         return [image.image_url for image in obj.images.all()]
@@ -1,12 +1,30 @@
+from functools import partial
+
 import cloudinary.uploader
 from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from django.utils.timezone import is_naive, make_aware
+from django.utils.timezone import is_naive, make_aware, now
 
-from .models import ItemImage, UserProfile
+from .authentication import user_cache
+from .cache import item_list_cache, item_matches_cache, public_user_cache
+from .models import Brand, Category, Color, Item, ItemImage, Location, UserProfile
 from .tasks import send_welcome_email
+from .taxonomy import taxonomy_registry
+from .text_index import index_items
+
+# As invalidações de cache rodam em transaction.on_commit: invalidando antes do commit,
+# outro processo poderia ler (e guardar em cache) os dados antigos até a transação
+# terminar. Fora de uma transação, on_commit executa na hora.
+
+# Campos gravados a cada login, que não aparecem nos dados públicos do usuário.
+LOGIN_ONLY_FIELDS = {"last_login"}
+
+
+def is_login_only_save(update_fields):
+    return update_fields is not None and set(update_fields) <= LOGIN_ONLY_FIELDS
 
 
 @receiver(post_save, sender=User)
@@ -16,11 +34,29 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, "profile"):
+def save_user_profile(sender, instance, update_fields=None, **kwargs):
+    if hasattr(instance, "profile") and not is_login_only_save(update_fields):
         instance.profile.save()
 
 
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Descarta o usuário do cache de autenticação quando ele é alterado ou removido."""
+    # Depois do delete o pk da instância vira None: guarda o valor agora.
+    transaction.on_commit(partial(user_cache.invalidate_user, instance.pk))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_public_user_cache(sender, update_fields=None, **kwargs):
+    """Nome, e-mail ou foto alterados invalidam os dados públicos de usuários em cache."""
+    if not is_login_only_save(update_fields):
+        transaction.on_commit(public_user_cache.invalidate)
+
+
 @receiver(user_logged_in)
 def send_welcome_email_on_first_login(sender, request, user, **kwargs):
     if is_naive(user.date_joined):
@@ -50,3 +86,55 @@ def delete_image_from_cloudinary(sender, instance, **kwargs):
             cloudinary.uploader.destroy(public_id)
         except Exception as e:
             print(f"Erro ao remover a imagem do Cloudinary: {str(e)}")
+
+
+@receiver(post_save, sender=ItemImage)
+@receiver(post_delete, sender=ItemImage)
+def touch_item_on_image_change(sender, instance, **kwargs):
+    """Imagens fazem parte da representação do item: atualizam o ``updated_at``."""
+    # update() não dispara post_save do Item (nem reindexa o texto).
+    Item.objects.filter(pk=instance.item_id).update(updated_at=now())
+
+
+@receiver(post_save, sender=Item)
+def update_item_text_index(sender, instance, update_fields=None, **kwargs):
+    """Mantém os baldes LSH de nome/descrição atualizados a cada save do item."""
+    if update_fields is None or {"name", "description", "text_tokens"} & set(update_fields):
+        index_items([instance])
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+@receiver(post_save, sender=ItemImage)
+@receiver(post_delete, sender=ItemImage)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Color)
+@receiver(post_delete, sender=Color)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def invalidate_item_list_cache(sender, **kwargs):
+    """Qualquer escrita que altere a listagem de itens invalida as respostas em cache."""
+    transaction.on_commit(item_list_cache.invalidate)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Color)
+@receiver(post_delete, sender=Color)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def invalidate_taxonomy_registry(sender, **kwargs):
+    """Força a recarga do registro de taxonomias em todos os processos."""
+    transaction.on_commit(taxonomy_registry.invalidate)
+
+
+@receiver(m2m_changed, sender=Item.matches.through)
+def invalidate_item_matches_cache(sender, action, **kwargs):
+    """Arestas de match adicionadas ou removidas invalidam as listas de matches."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(item_matches_cache.invalidate)
@@ -3,14 +3,21 @@ from datetime import timedelta
 
 import cloudinary.uploader
 from celery import shared_task
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.utils.timezone import now
 
+from .cache import is_shared_cache
 from .models import Item, ItemImage, UserProfile
 
+# Enquanto a chave existir, já há um matching agendado para o item e novos pedidos
+# são descartados. O TTL só libera a chave se o worker nunca chegar a executar a task.
+MATCH_PENDING_KEY = "match:pending:{item_id}"
+MATCH_PENDING_TTL = 60 * 5
+
 
 @shared_task
 def send_match_notification(to_email, item_name, matches):
@@ -54,6 +61,8 @@ def find_and_notify_matches_task(target_item_id, max_distance=2):
     from .match import find_and_notify_matches
 
     """Task assíncrona para encontrar e notificar matches."""
+    # Liberada antes de ler o item: uma edição feita durante a execução agenda outra.
+    cache.delete(MATCH_PENDING_KEY.format(item_id=target_item_id))
     try:
         target_item = Item.objects.get(id=target_item_id)
     except Item.DoesNotExist:
@@ -62,6 +71,38 @@ def find_and_notify_matches_task(target_item_id, max_distance=2):
     find_and_notify_matches(target_item, max_distance)
 
 
+def schedule_item_matching(item_id):
+    """
+    Enfileira o matching do item, a menos que já exista um pendente para ele.
+
+    Deve ser chamada depois do commit (``transaction.on_commit``), para o worker
+    sempre encontrar o item gravado. Retorna True se a task foi enfileirada.
+
+    A coalescência exige um cache compartilhado (Redis): com o cache local de cada
+    processo, o worker nunca apagaria a chave gravada pela web e os pedidos seguintes
+    seriam descartados até o TTL. Nesse caso, todo pedido enfileira um matching.
+    """
+    coalesce = is_shared_cache()
+    key = MATCH_PENDING_KEY.format(item_id=item_id)
+    if coalesce and not cache.add(key, 1, MATCH_PENDING_TTL):
+        return False
+    try:
+        find_and_notify_matches_task.apply_async((item_id,))
+    except Exception:
+        if coalesce:
+            cache.delete(key)
+        raise
+    return True
+
+
+@shared_task
+def find_and_notify_matches_bulk_task(item_ids, max_distance=2):
+    """Task assíncrona para o matching em lote de itens importados."""
+    from .match import find_and_notify_matches_bulk
+
+    find_and_notify_matches_bulk(Item.objects.filter(id__in=item_ids), max_distance)
+
+
 @shared_task
 def upload_images_to_cloudinary(object_id, images, object_type="item"):
     """Realiza o upload das imagens para o Cloudinary e salva as URLs no banco."""
@@ -94,6 +135,11 @@ def upload_images_to_cloudinary(object_id, images, object_type="item"):
         except Exception as e:
             print(f"Erro ao fazer upload de imagem para o objeto {object_id}: {e}")
 
+    if object_type == "item":
+        # Refaz o matching com as fotos gravadas; o da criação do item já foi agendado
+        # pela view, e este é descartado enquanto aquele estiver pendente.
+        schedule_item_matching(obj.id)
+
 
 @shared_task
 def remove_images_from_item(image_ids):
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.apps import apps
+
+from .cache import taxonomy_cache
+
+# tipo -> (modelo, campo com o código usado no barcode, chave no snapshot)
+TAXONOMY_MODELS = {
+    "category": ("Category", "category_id", "categories"),
+    "location": ("Location", "location_id", "locations"),
+    "color": ("Color", "color_id", "colors"),
+    "brand": ("Brand", "brand_id", "brands"),
+}
+
+
+class TaxonomyRegistry:
+    """
+    Cópia em memória de Category, Location, Color e Brand.
+
+    As tabelas são carregadas uma vez por processo e recarregadas quando a versão
+    guardada no cache compartilhado muda (qualquer escrita em uma delas incrementa
+    a versão). A versão é consultada no máximo a cada ``check_interval`` segundos.
+    """
+
+    def __init__(self, check_interval=5):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+        self._checked_at = 0
+        self._snapshot = None
+
+    def _shared_version(self):
+        return taxonomy_cache.generation()
+
+    def _load(self):
+        data = {}
+        for kind, (model_name, code_field, _) in TAXONOMY_MODELS.items():
+            model = apps.get_model("users", model_name)
+            # Sempre do primário: a cópia vale até a próxima versão, e uma réplica
+            # atrasada fixaria as taxonomias anteriores à escrita.
+            rows = (
+                model.objects.using("default").order_by("id").values("id", "name", code_field)
+            )
+            data[kind] = {row["id"]: row for row in rows}
+        return data
+
+    def _get_data(self, force_reload=False):
+        now = time.monotonic()
+        with self._lock:
+            if self._data is not None and not force_reload:
+                if now - self._checked_at < self.check_interval:
+                    return self._data
+                self._checked_at = now
+                if self._shared_version() == self._version:
+                    return self._data
+
+            self._version = self._shared_version()
+            self._data = self._load()
+            self._checked_at = now
+            return self._data
+
+    def get(self, kind, pk):
+        """Retorna o registro ``{"id", "name", "<tipo>_id"}`` ou None."""
+        if pk is None:
+            return None
+        entry = self._get_data()[kind].get(pk)
+        if entry is None:
+            # Pode ter sido criado por outro processo depois da última recarga.
+            entry = self._get_data(force_reload=True)[kind].get(pk)
+        return entry
+
+    def all(self, kind):
+        return list(self._get_data()[kind].values())
+
+    def name(self, kind, pk):
+        entry = self.get(kind, pk)
+        return entry["name"] if entry else None
+
+    def code(self, kind, pk):
+        entry = self.get(kind, pk)
+        return entry[TAXONOMY_MODELS[kind][1]] if entry else "00"
+
+    def ids_matching_name(self, kind, text):
+        """IDs cujo nome contém ``text`` (sem diferenciar maiúsculas), como ``icontains``."""
+        text = text.casefold()
+        return [
+            pk
+            for pk, entry in self._get_data()[kind].items()
+            if text in entry["name"].casefold()
+        ]
+
+    def snapshot(self):
+        """
+        Todas as taxonomias de uma vez: ``(versão, listas, hash do conteúdo)``.
+
+        O hash depende só do conteúdo, então não muda se a versão for reiniciada sem
+        que nenhuma tabela tenha sido alterada.
+        """
+        data = self._get_data()
+        with self._lock:
+            if self._snapshot is None or self._snapshot[0] is not data:
+                lists = {
+                    key: list(data[kind].values())
+                    for kind, (_, _, key) in TAXONOMY_MODELS.items()
+                }
+                content = json.dumps(lists, sort_keys=True, ensure_ascii=False)
+                content_hash = hashlib.sha1(content.encode()).hexdigest()
+                self._snapshot = (data, self._version, lists, content_hash)
+            return self._snapshot[1:]
+
+    def barcode(self, category_id, location_id, color_id, brand_id):
+        return (
+            f"{self.code('category', category_id)}{self.code('location', location_id)}"
+            f"{self.code('color', color_id)}{self.code('brand', brand_id)}"
+        )
+
+    def reset(self):
+        """Esquece a cópia local sem alterar a versão compartilhada (usado nos testes)."""
+        with self._lock:
+            self._data = None
+            self._version = None
+            self._checked_at = 0
+            self._snapshot = None
+
+    def invalidate(self):
+        """Descarta a cópia local e avisa os demais processos incrementando a versão."""
+        with self._lock:
+            self._data = None
+        taxonomy_cache.invalidate()
+
+
+taxonomy_registry = TaxonomyRegistry()
@@ -1,20 +1,75 @@
+import functools
 import json
+import logging
 import os
 
 from django import template
 from django.conf import settings
+from django.utils.html import format_html, format_html_join
+
+logger = logging.getLogger(__name__)
 
 register = template.Library()
 
-# Ler o manifest ao carregar o arquivo (você pode melhorar, cachear, etc.)
 MANIFEST_PATH = os.path.join(
     settings.BASE_DIR, "AcheiUnB", "static", "dist", ".vite", "manifest.json"
 )
-with open(MANIFEST_PATH, "r") as f:
-    manifest = json.load(f)
+
+_reported_errors = set()
+
+
+@functools.lru_cache(maxsize=4)
+def read_manifest(path, mtime):
+    """Lê o manifest; o ``mtime`` entra só na chave do cache (um novo build é relido)."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_manifest():
+    """
+    Manifest do Vite, relido só quando o mtime do arquivo muda, sem reiniciar o servidor.
+    Sem build (arquivo ausente ou inválido), retorna ``{}`` e as tags ficam vazias em vez
+    de quebrar o carregamento da biblioteca.
+    """
+    path = MANIFEST_PATH
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    try:
+        if mtime is None:
+            # Sem mtime não há como revalidar: lê sem guardar.
+            manifest = read_manifest.__wrapped__(path, mtime)
+        else:
+            manifest = read_manifest(path, mtime)
+    except (OSError, ValueError) as exc:
+        if path not in _reported_errors:
+            _reported_errors.add(path)
+            logger.warning("Manifest do Vite indisponível em %s: %s", path, exc)
+        return {}
+
+    _reported_errors.discard(path)
+    return manifest
+
+
+def asset_url(file):
+    return f"{settings.STATIC_URL}dist/{file}"
+
+
+def imported_chunks(manifest, name, seen=None):
+    """Chunks importados (``imports``) por ``name``, transitivamente, na ordem do Vite."""
+    seen = set() if seen is None else seen
+    chunks = []
+    for imported in manifest.get(name, {}).get("imports", []):
+        if imported in seen or imported not in manifest:
+            continue
+        seen.add(imported)
+        chunks.extend(imported_chunks(manifest, imported, seen))
+        chunks.append(manifest[imported])
+    return chunks
 
 
-@register.simple_tag
 @register.simple_tag
 def vite_asset(entry_name="index.html", asset_type="js"):
     """
@@ -23,18 +78,47 @@ def vite_asset(entry_name="index.html", asset_type="js"):
        {% vite_asset 'index.html' 'js' %}
        {% vite_asset 'index.html' 'css' %}
     """
+    manifest = load_manifest()
     if entry_name not in manifest:
         return ""
     entry_data = manifest[entry_name]
 
     if asset_type == "js":
         # 'file' = js principal
-        return f"/static/dist/{entry_data.get('file', '')}"
+        return asset_url(entry_data.get("file", ""))
     elif asset_type == "css":
         css_files = entry_data.get("css", [])
         if css_files:
-            return f"/static/dist/{css_files[0]}"
+            return asset_url(css_files[0])
         else:
             return ""
     else:
         return ""
+
+
+@register.simple_tag
+def vite_preload(entry_name="index.html"):
+    """
+    Links de todos os CSS da entrada e ``modulepreload`` dos chunks que ela importa,
+    como no index.html gerado pelo Vite: o navegador busca tudo em paralelo, sem
+    esperar o JS principal para descobrir os imports. Use no ``<head>``:
+       {% vite_preload 'index.html' %}
+    """
+    manifest = load_manifest()
+    if entry_name not in manifest:
+        return ""
+
+    chunks = imported_chunks(manifest, entry_name)
+    css_files = []
+    for chunk in [*chunks, manifest[entry_name]]:
+        css_files.extend(file for file in chunk.get("css", []) if file not in css_files)
+
+    stylesheets = format_html_join(
+        "\n", '<link rel="stylesheet" href="{}"/>', ((asset_url(f),) for f in css_files)
+    )
+    preloads = format_html_join(
+        "\n",
+        '<link rel="modulepreload" href="{}"/>',
+        ((asset_url(chunk["file"]),) for chunk in chunks),
+    )
+    return format_html("{}\n{}", stylesheets, preloads)
@@ -0,0 +1,14 @@
+import pytest
+
+from users.taxonomy import taxonomy_registry
+
+
+@pytest.fixture(autouse=True)
+def _reset_taxonomy_registry():
+    """
+    O taxonomy_registry é global ao processo: sem isso, um teste veria as taxonomias
+    carregadas por outro (inclusive linhas desfeitas no rollback do TestCase).
+    """
+    taxonomy_registry.reset()
+    yield
+    taxonomy_registry.reset()
@@ -11,39 +11,39 @@ User = get_user_model()
 
 class APITestItemFilters(APITestCase):
     def setUp(self):
-
-        Category.objects.all().delete()
-        Color.objects.all().delete()
-        Location.objects.all().delete()
-        Item.objects.all().delete()
-
-        self.user = User.objects.create_user(username="testuser", password="password")
-
-        self.category1 = Category.objects.create(name="Acessórios", category_id="01")
-        self.category2 = Category.objects.create(name="Eletrônicos", category_id="02")
-
-        self.color1 = Color.objects.create(name="Preto", color_id="01")
-        self.color2 = Color.objects.create(name="Branco", color_id="02")
-
-        self.location1 = Location.objects.create(name="Biblioteca", location_id="01")
-        self.location2 = Location.objects.create(name="Sala de Aula", location_id="02")
-
-        self.item1 = Item.objects.create(
-            user=self.user,
-            name="Relógio",
-            category=self.category1,
-            color=self.color1,
-            location=self.location1,
-            status="found",
-        )
-        self.item2 = Item.objects.create(
-            user=self.user,
-            name="Celular",
-            category=self.category2,
-            color=self.color2,
-            location=self.location2,
-            status="lost",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.all().delete()
+            Color.objects.all().delete()
+            Location.objects.all().delete()
+            Item.objects.all().delete()
+
+            self.user = User.objects.create_user(username="testuser", password="password")
+
+            self.category1 = Category.objects.create(name="Acessórios", category_id="01")
+            self.category2 = Category.objects.create(name="Eletrônicos", category_id="02")
+
+            self.color1 = Color.objects.create(name="Preto", color_id="01")
+            self.color2 = Color.objects.create(name="Branco", color_id="02")
+
+            self.location1 = Location.objects.create(name="Biblioteca", location_id="01")
+            self.location2 = Location.objects.create(name="Sala de Aula", location_id="02")
+
+            self.item1 = Item.objects.create(
+                user=self.user,
+                name="Relógio",
+                category=self.category1,
+                color=self.color1,
+                location=self.location1,
+                status="found",
+            )
+            self.item2 = Item.objects.create(
+                user=self.user,
+                name="Celular",
+                category=self.category2,
+                color=self.color2,
+                location=self.location2,
+                status="lost",
+            )
 
     def test_filter_by_category_name(self):
         response = self.client.get("/api/items/?category_name=Acessórios")
@@ -2,11 +2,13 @@ from unittest.mock import patch
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import AccessToken
 
-from users.authentication import CookieJWTAuthentication
+from users.authentication import CookieJWTAuthentication, UserCache, user_cache
 
 User = get_user_model()
 
@@ -73,3 +75,70 @@ class CookieJWTAuthenticationTests(TestCase):
         ):
             with pytest.raises(AuthenticationFailed):
                 self.authenticator.authenticate(request)
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.factory = RequestFactory()
+        self.authenticator = CookieJWTAuthentication()
+        self.user = User.objects.create_user(
+            username="cacheuser", email="cache@example.com", password="testpass"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+
+    def authenticate(self):
+        request = self.factory.get("/")
+        request.COOKIES["access_token"] = self.token
+        return self.authenticator.authenticate(request)
+
+    def test_second_request_uses_cache(self):
+        self.authenticate()
+        with patch.object(CookieJWTAuthentication, "get_user") as mock_get_user:
+            user, _ = self.authenticate()
+        mock_get_user.assert_not_called()
+        assert user.pk == self.user.pk
+
+    def test_user_save_invalidates_cache(self):
+        self.authenticate()
+        self.user.first_name = "Atualizado"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        user, _ = self.authenticate()
+        assert user.first_name == "Atualizado"
+
+    def test_user_delete_invalidates_cache(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_expired_entry_is_dropped(self):
+        cache = UserCache(maxsize=10, ttl=60)
+        cache.set("token", self.user)
+        with patch("users.authentication.time.monotonic", return_value=10**9):
+            assert cache.get("token") is None
+
+    def test_cache_is_size_bounded(self):
+        cache = UserCache(maxsize=2, ttl=60)
+        for index in range(3):
+            cache.set(f"token-{index}", self.user)
+        assert cache.get("token-0") is None
+        assert cache.get("token-2").pk == self.user.pk
+
+    def test_invalidation_reaches_other_processes(self):
+        # Duas instâncias fazem o papel de dois workers com o mesmo cache compartilhado.
+        other_worker = UserCache(maxsize=10, ttl=60)
+        other_worker.set("token", self.user)
+        user_cache.invalidate_user(self.user.pk)
+        assert other_worker.get("token") is None
+
+    def test_item_list_saves_one_query_per_request(self):
+        self.client.cookies["access_token"] = self.token
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get("/api/items/")
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get("/api/items/")
+        assert response.status_code == 200
+        assert len(cold) - len(warm) == 1
@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from users.bulk_export import iter_export
+from users.models import Item, ItemImage
+
+User = get_user_model()
+
+
+class IterExportTests(TestCase):
+    def setUp(self):
+        self.lost = Item.objects.create(name="Celular", status="lost")
+        self.found = Item.objects.create(name="Celular preto", status="found")
+        self.lost.matches.add(self.found)
+        ItemImage.objects.create(item=self.found, image_url="http://example.com/a.jpg")
+
+    def test_items_csv(self):
+        content = "".join(iter_export("items", "csv"))
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert [row["name"] for row in rows] == ["Celular", "Celular preto"]
+        assert rows[0]["created_at"]
+
+    def test_matches_ndjson(self):
+        lines = "".join(iter_export("matches", "ndjson")).splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"lost_item_id": self.lost.id, "found_item_id": self.found.id}
+        ]
+
+    def test_output_is_chunked(self):
+        chunks = list(iter_export("items", "ndjson", chunk_size=1))
+        assert len(chunks) == 2
+
+    def test_csv_header_comes_first(self):
+        chunks = iter_export("images", "csv")
+        assert next(chunks).strip() == "id,item_id,image_url"
+
+    def test_management_command(self):
+        out = io.StringIO()
+        call_command("export_items", "images", "--format", "ndjson", stdout=out)
+        assert json.loads(out.getvalue())["image_url"] == "http://example.com/a.jpg"
+
+
+class ExportViewTests(APITestCase):
+    def setUp(self):
+        Item.objects.create(name="Celular", status="lost")
+
+    def test_requires_admin(self):
+        user = User.objects.create_user("user", "user@example.com", "pwd")
+        self.client.force_authenticate(user=user)
+        assert self.client.get("/api/export/items.csv").status_code == 403
+
+    def test_streams_export(self):
+        admin = User.objects.create_user("admin", "admin@example.com", "pwd", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get("/api/export/items.ndjson")
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert json.loads(lines[0])["name"] == "Celular"
+
+    def test_unknown_dataset(self):
+        admin = User.objects.create_user("admin", "admin@example.com", "pwd", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        assert self.client.get("/api/export/users.csv").status_code == 404
@@ -0,0 +1,140 @@
+import io
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from users.bulk_import import import_items, iter_rows
+from users.match import find_and_notify_matches_bulk
+from users.models import Category, Item, Location
+
+User = get_user_model()
+
+
+def csv_bytes(rows):
+    header = "name,description,status,category,location,color,brand,found_lost_date\n"
+    return (header + "\n".join(rows) + "\n").encode()
+
+
+@patch("users.bulk_import.find_and_notify_matches_bulk_task.delay")
+class ImportItemsTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = Category.objects.create(name="Garrafas", category_id="94")
+            self.location = Location.objects.create(name="Restaurante", location_id="94")
+
+    def test_csv_import_creates_items_with_barcode(self, mock_match):
+        data = csv_bytes(
+            [
+                "Garrafa azul,Garrafa térmica,found,garrafas,RESTAURANTE,,,2025-01-10",
+                "Garrafa verde,,lost,Garrafas,Restaurante,,,2025-01-11T10:30:00",
+            ]
+        )
+        report = import_items(iter_rows(io.BytesIO(data), "csv"), batch_size=1)
+
+        assert report.created == 2
+        assert report.error_count == 0
+        items = Item.objects.filter(name__startswith="Garrafa").order_by("name")
+        assert [item.barcode for item in items] == ["94940000", "94940000"]
+        assert items[0].found_lost_date.day == 10
+        mock_match.assert_called_once_with(report.item_ids)
+
+    def test_invalid_rows_are_reported_and_skipped(self, mock_match):
+        data = csv_bytes(
+            [
+                ",sem nome,found,,,,,",
+                "Garrafa,,perdido,,,,,",
+                "Garrafa,,found,Inexistente,,,,",
+                "Garrafa,,found,,,,,ontem",
+                "Garrafa válida,,found,,,,,",
+            ]
+        )
+        report = import_items(iter_rows(io.BytesIO(data), "csv"))
+
+        assert report.created == 1
+        assert [error["row"] for error in report.errors] == [1, 2, 3, 4]
+
+    def test_jsonl_malformed_line_only_fails_that_row(self, mock_match):
+        lines = [json.dumps({"name": "Garrafa"}), "{quebrado", json.dumps({"name": "Copo"})]
+        data = "\n".join(lines).encode()
+        report = import_items(iter_rows(io.BytesIO(data), "jsonl"))
+
+        assert report.created == 2
+        assert report.errors[0]["row"] == 2
+
+    def test_no_valid_rows_does_not_schedule_matching(self, mock_match):
+        report = import_items(iter_rows(io.BytesIO(b"[]"), "json"))
+        assert report.created == 0
+        mock_match.assert_not_called()
+
+    def test_management_command_reports_throughput(self, mock_match):
+        with tempfile.NamedTemporaryFile(suffix=".csv") as f:
+            f.write(csv_bytes(["Garrafa,,found,,,,,"]))
+            f.flush()
+            out = io.StringIO()
+            call_command("import_items", f.name, stdout=out)
+
+        assert "1 de 1 linhas importadas" in out.getvalue()
+        assert "linhas/s" in out.getvalue()
+
+
+@patch("users.bulk_import.find_and_notify_matches_bulk_task.delay")
+class ItemImportViewTests(APITestCase):
+    def test_requires_admin(self, mock_match):
+        user = User.objects.create_user("desk", "desk@example.com", "pwd")
+        self.client.force_authenticate(user=user)
+        response = self.client.post("/api/items/import/", {}, format="multipart")
+        assert response.status_code == 403
+
+    def test_upload_csv(self, mock_match):
+        admin = User.objects.create_user("admin", "admin@example.com", "pwd", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        upload = SimpleUploadedFile("itens.csv", csv_bytes(["Garrafa,,found,,,,,"]))
+        response = self.client.post("/api/items/import/", {"file": upload}, format="multipart")
+
+        assert response.status_code == 201
+        assert response.data["created"] == 1
+        assert Item.objects.get(name="Garrafa").user == admin
+
+    def test_unknown_format(self, mock_match):
+        admin = User.objects.create_user("admin", "admin@example.com", "pwd", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        upload = SimpleUploadedFile("itens.xlsx", b"...")
+        response = self.client.post("/api/items/import/", {"file": upload}, format="multipart")
+        assert response.status_code == 400
+
+
+class FindAndNotifyMatchesBulkTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner", "owner@example.com", "pwd")
+        self.category = Category.objects.create(name="Garrafas", category_id="94")
+        self.location = Location.objects.create(name="Restaurante", location_id="94")
+        self.lost = Item.objects.create(
+            name="Garrafa",
+            status="lost",
+            user=self.owner,
+            category=self.category,
+            location=self.location,
+        )
+
+    @patch("users.match.send_match_notification.delay")
+    def test_links_and_notifies_once_per_lost_item(self, mock_notify):
+        found = [
+            Item.objects.create(
+                name=f"Garrafa {index}",
+                status="found",
+                category=self.category,
+                location=self.location,
+            )
+            for index in range(3)
+        ]
+        find_and_notify_matches_bulk(found)
+
+        assert set(self.lost.matches.all()) == set(found)
+        mock_notify.assert_called_once()
+        assert len(mock_notify.call_args.kwargs["matches"]) == 3
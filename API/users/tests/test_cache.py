@@ -0,0 +1,109 @@
+import time
+from unittest.mock import Mock, patch
+
+from django.contrib.auth.models import User, update_last_login
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from users.cache import CacheNamespace
+
+
+class CacheNamespaceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.namespace = CacheNamespace("test", timeout=60, stale_timeout=60)
+
+    def test_value_is_computed_once(self):
+        compute = Mock(return_value={"a": 1})
+        key = self.namespace.key("x")
+        assert self.namespace.get_or_set(key, compute) == {"a": 1}
+        assert self.namespace.get_or_set(key, compute) == {"a": 1}
+        assert compute.call_count == 1
+        assert self.namespace.stats() == {"hits": 1, "misses": 1, "stale": 0, "refreshes": 0}
+
+    def test_invalidate_moves_last_modified_forward(self):
+        before = self.namespace.last_modified()
+        with patch("users.cache.time.time", return_value=time.time() + 5):
+            self.namespace.invalidate()
+        assert self.namespace.last_modified() > before
+
+    def test_invalidate_changes_keys(self):
+        key = self.namespace.key("x")
+        self.namespace.invalidate()
+        assert self.namespace.key("x") != key
+
+    def test_dependency_generation_is_part_of_key(self):
+        parent = CacheNamespace("parent")
+        child = CacheNamespace("child", depends_on=(parent,))
+        key = child.key("x")
+        parent.invalidate()
+        assert child.key("x") != key
+
+    def test_none_is_not_stored(self):
+        compute = Mock(return_value=None)
+        key = self.namespace.key("x")
+        self.namespace.get_or_set(key, compute)
+        self.namespace.get_or_set(key, compute)
+        assert compute.call_count == 2
+
+    @patch("users.cache.RECOMPUTE_WAIT", 0.2)
+    def test_waits_for_process_holding_the_lock(self):
+        key = self.namespace.key("x")
+        cache.add(f"{key}:lock", 1)
+
+        def sleep(seconds):
+            cache.set(key, (time.time() + 60, "do outro processo"))
+
+        compute = Mock(return_value="local")
+        with patch("users.cache.time.sleep", side_effect=sleep):
+            assert self.namespace.get_or_set(key, compute) == "do outro processo"
+        compute.assert_not_called()
+
+    @patch("users.cache.RECOMPUTE_WAIT", 0)
+    def test_computes_when_lock_holder_does_not_finish(self):
+        key = self.namespace.key("x")
+        cache.add(f"{key}:lock", 1)
+        assert self.namespace.get_or_set(key, lambda: "local") == "local"
+
+    def test_stale_value_served_while_another_process_recomputes(self):
+        key = self.namespace.key("x")
+        cache.set(key, (time.time() - 1, "antigo"))
+        cache.add(f"{key}:lock", 1)
+
+        compute = Mock(return_value="novo")
+        assert self.namespace.get_or_set(key, compute) == "antigo"
+        compute.assert_not_called()
+
+        cache.delete(f"{key}:lock")
+        assert self.namespace.get_or_set(key, compute) == "novo"
+        # Servida vencida uma vez; a segunda chamada recalculou, não foi um acerto.
+        assert self.namespace.stats() == {"hits": 0, "misses": 0, "stale": 1, "refreshes": 1}
+
+
+class PublicUserCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("publico", "publico@example.com", "pwd")
+
+    def test_detail_cached_until_user_changes(self):
+        url = f"/api/users/{self.user.id}/"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            assert self.client.get(url).json()["first_name"] == ""
+
+        self.user.first_name = "Maria"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        assert self.client.get(url).json()["first_name"] == "Maria"
+
+    def test_login_does_not_invalidate(self):
+        url = f"/api/users/{self.user.id}/"
+        self.client.get(url)
+        update_last_login(None, self.user)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_missing_user_is_not_cached(self):
+        assert self.client.get("/api/users/999999/").status_code == 404
+        assert self.client.get("/api/users/999999/").status_code == 404
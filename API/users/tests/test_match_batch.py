@@ -0,0 +1,111 @@
+import io
+import random
+from datetime import timedelta
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from users.match import hamming_distance
+from users.match_batch import block_edges, compute_all_edges, distance_matrix, encode_barcodes
+from users.models import Category, Color, Item, Location
+
+
+class DistanceKernelTests(TestCase):
+    def test_encode_barcodes(self):
+        codes = encode_barcodes(["01020304", "99000010"])
+        assert codes.dtype == np.uint8
+        assert codes.tolist() == [[1, 2, 3, 4], [99, 0, 0, 10]]
+
+    def test_distance_matrix_matches_hamming_distance(self):
+        rng = random.Random(42)
+        lost = ["".join(rng.choice("0123") for _ in range(8)) for _ in range(40)]
+        found = ["".join(rng.choice("0123") for _ in range(8)) for _ in range(30)]
+        matrix = distance_matrix(encode_barcodes(lost), encode_barcodes(found))
+        expected = [[hamming_distance(a, b) for b in found] for a in lost]
+        assert matrix.tolist() == expected
+
+    def test_irregular_barcodes_use_python_fallback(self):
+        lost = [(1, "0101"), (2, "01010101")]
+        found = [(3, "0101"), (4, "01010102"), (5, "02020202")]
+        expected = {
+            (lost_id, found_id)
+            for lost_id, lost_barcode in lost
+            for found_id, found_barcode in found
+            if hamming_distance(lost_barcode, found_barcode) <= 2
+        }
+        assert set(block_edges(lost, found, max_distance=2)) == expected
+
+    def test_non_ascii_digits_use_python_fallback(self):
+        lost = [(1, "١٢٣٤٥٦٧٨"), (2, "0101010\n")]
+        found = [(3, "١٢٣٤٥٦٧٩"), (4, "01010101")]
+        expected = {
+            (lost_id, found_id)
+            for lost_id, lost_barcode in lost
+            for found_id, found_barcode in found
+            if hamming_distance(lost_barcode, found_barcode) <= 2
+        }
+        assert expected == {(1, 3), (2, 4)}
+        assert set(block_edges(lost, found, max_distance=2)) == expected
+
+
+class RematchAllTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = Category.objects.create(name="Mochilas", category_id="95")
+            self.location = Location.objects.create(name="ICC Norte", location_id="95")
+            self.black = Color.objects.create(name="Preto fosco", color_id="95")
+            self.lost = Item.objects.create(
+                name="Mochila",
+                status="lost",
+                category=self.category,
+                location=self.location,
+                found_lost_date=timezone.now(),
+            )
+            self.found = Item.objects.create(
+                name="Mochila preta",
+                status="found",
+                category=self.category,
+                location=self.location,
+                color=self.black,
+            )
+            self.elsewhere = Item.objects.create(name="Mochila", status="found")
+
+    def test_compute_all_edges(self):
+        assert compute_all_edges(max_distance=2) == {(self.lost.id, self.found.id)}
+        assert compute_all_edges(max_distance=1) == set()
+
+    def test_command_syncs_edges(self):
+        stale = Item.objects.create(
+            name="Garrafa azul",
+            status="found",
+            category=self.category,
+            location=self.location,
+            found_lost_date=timezone.now() - timedelta(days=365),
+        )
+        self.lost.matches.add(stale)
+        out = io.StringIO()
+        call_command("rematch_all", stdout=out)
+        assert list(self.lost.matches.all()) == [self.found]
+        assert "1 matches adicionados, 1 removidos" in out.getvalue()
+
+    def test_command_keeps_edges_outside_blocks(self):
+        # Vizinho de texto do matching online (outro local): o kernel não avalia o par.
+        self.lost.matches.add(self.elsewhere)
+        call_command("rematch_all", stdout=io.StringIO())
+        assert set(self.lost.matches.all()) == {self.found, self.elsewhere}
+
+    def test_command_respects_date_window(self):
+        self.found.found_lost_date = timezone.now() - timedelta(days=365)
+        self.found.save()
+        out = io.StringIO()
+        call_command("rematch_all", stdout=out)
+        assert not self.lost.matches.exists()
+        assert "0 matches adicionados, 0 removidos" in out.getvalue()
+
+    def test_benchmark_does_not_write(self):
+        out = io.StringIO()
+        call_command("rematch_all", "--benchmark", stdout=out)
+        assert "resultados idênticos: True" in out.getvalue()
+        assert not self.lost.matches.exists()
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.test import TestCase
+from django.utils.timezone import now
+
+from users.match import find_and_notify_matches_bulk, get_potential_matches
+from users.models import Category, Item, Location
+from users.scoring import (
+    MIN_MATCH_SCORE,
+    barcode_score,
+    date_score,
+    item_tokens,
+    jaccard,
+    match_score,
+    rank_candidates,
+)
+
+
+class ScoringFunctionTests(TestCase):
+    def test_item_tokens_normalizes_and_drops_stopwords(self):
+        tokens = item_tokens("Carteira Perdida", "Carteira de COURO marrom, sem cartões")
+        assert tokens == ["carteira", "cartoes", "couro", "marrom"]
+
+    def test_jaccard_is_neutral_without_text(self):
+        assert jaccard([], ["carteira"]) is None
+        assert jaccard(["carteira", "couro"], ["carteira"]) == 0.5
+
+    def test_barcode_score_weights_segments(self):
+        assert barcode_score("01020304", "01020304") == pytest.approx(1.0)
+        # Só a marca difere.
+        assert barcode_score("01020304", "01020399") == pytest.approx(0.8)
+        # Cor desconhecida em um dos lados vale metade do peso da cor.
+        assert barcode_score("01020004", "01020304") == pytest.approx(0.85)
+
+    def test_date_score_window(self):
+        lost = now()
+        assert date_score(lost, None) is None
+        assert date_score(lost, lost) == 1.0
+        assert date_score(lost, lost + timedelta(days=7)) == pytest.approx(0.5)
+        # Achado antes de ser perdido, ou muito depois, não conta.
+        assert date_score(lost, lost - timedelta(days=30)) == 0.0
+        assert date_score(lost, lost + timedelta(days=365)) == 0.0
+
+    def test_rank_candidates_orders_by_score(self):
+        today = now()
+        lost = Item(
+            status="lost",
+            barcode="01020304",
+            found_lost_date=today,
+            text_tokens=item_tokens("Garrafa azul", "adesivo da UnB"),
+        )
+        close = Item(
+            status="found",
+            barcode="01020304",
+            found_lost_date=today + timedelta(days=1),
+            text_tokens=item_tokens("Garrafa", "azul com adesivo"),
+        )
+        weak = Item(
+            status="found",
+            barcode="01020399",
+            found_lost_date=today + timedelta(days=50),
+            text_tokens=item_tokens("Caderno", "capa vermelha"),
+        )
+        assert match_score(lost, close) > match_score(lost, weak)
+        assert match_score(lost, weak) < MIN_MATCH_SCORE
+        assert rank_candidates(lost, [weak, close]) == [close]
+
+
+class PrunedMatchingTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Categoria Score", category_id="96")
+        self.location = Location.objects.create(name="Local Score", location_id="96")
+        self.today = now()
+
+    def create_item(self, status, name, days=0, description=""):
+        return Item.objects.create(
+            status=status,
+            name=name,
+            description=description,
+            category=self.category,
+            location=self.location,
+            found_lost_date=self.today + timedelta(days=days),
+        )
+
+    def test_save_stores_text_tokens(self):
+        item = self.create_item("lost", "Fone de ouvido", description="Fone JBL preto")
+        assert item.text_tokens == ["fone", "jbl", "ouvido", "preto"]
+
+    def test_candidates_outside_date_window_are_pruned(self):
+        lost = self.create_item("lost", "Carteira")
+        recent = self.create_item("found", "Carteira", days=2)
+        self.create_item("found", "Carteira", days=-365)
+        self.create_item("found", "Carteira", days=365)
+
+        assert get_potential_matches(lost, "found", 2) == [recent]
+
+    def test_matches_ordered_by_score(self):
+        lost = self.create_item("lost", "Guarda-chuva preto", description="cabo de madeira")
+        later = self.create_item("found", "Guarda-chuva", days=20)
+        best = self.create_item("found", "Guarda-chuva preto", days=1, description="madeira")
+
+        assert get_potential_matches(lost, "found", 2) == [best, later]
+
+    @patch("users.match.send_match_notification.delay")
+    def test_bulk_matching_uses_scoring(self, mock_notify):
+        lost = self.create_item("lost", "Mochila azul", description="mochila com bolso")
+        match = self.create_item("found", "Mochila azul", days=1)
+        # Mesmo barcode, mas achada um ano depois e sem palavras em comum.
+        self.create_item("found", "Calculadora", days=365)
+
+        find_and_notify_matches_bulk([lost])
+
+        assert list(lost.matches.all()) == [match]
+
+    @patch("users.match.send_match_notification.delay")
+    def test_bulk_and_single_agree_outside_date_window(self, mock_notify):
+        # Barcode e texto idênticos: só a janela de datas impede o match.
+        lost = self.create_item("lost", "Carteira marrom", description="couro")
+        self.create_item("found", "Carteira marrom", days=-365, description="couro")
+        self.create_item("found", "Carteira marrom", days=365, description="couro")
+        recent = self.create_item("found", "Carteira marrom", days=3, description="couro")
+
+        single = get_potential_matches(lost, "found", 2)
+        find_and_notify_matches_bulk([lost])
+
+        assert single == [recent]
+        assert list(lost.matches.all()) == single
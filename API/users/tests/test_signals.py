@@ -4,7 +4,9 @@ from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in
 from django.test import TestCase
 
+from users.cache import item_list_cache, taxonomy_cache
 from users.models import (
+    Category,
     Item,
     ItemImage,
     UserProfile,
@@ -64,3 +66,19 @@ class CloudinarySignalTests(TestCase):
         image.delete()
 
         mock_cloudinary_destroy.assert_called_once_with("sample")
+
+
+class CacheInvalidationSignalTests(TestCase):
+    def test_invalidations_wait_for_commit(self):
+        list_version = item_list_cache.version()
+        taxonomy_version = taxonomy_cache.version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Categoria sinal", category_id="98")
+            Item.objects.create(name="Garrafa", status="lost")
+            # Outro processo lendo agora ainda veria os dados antigos: nada invalidado.
+            assert item_list_cache.version() == list_version
+            assert taxonomy_cache.version() == taxonomy_version
+
+        assert item_list_cache.version() != list_version
+        assert taxonomy_cache.version() != taxonomy_version
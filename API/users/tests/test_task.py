@@ -2,18 +2,34 @@ import io
 from datetime import timedelta
 from unittest.mock import patch
 
+import pytest
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 from django.utils.timezone import now
 
 from chat.models import ChatRoom
+from users import tasks
 from users.match import (
     find_and_notify_matches,
     generate_match_data,
     get_potential_matches,
     hamming_distance,
+    notify_new_matches,
+)
+from users.metrics import match_latency_summary
+from users.models import (
+    Brand,
+    Category,
+    Color,
+    Item,
+    ItemImage,
+    Location,
+    MatchNotification,
+    UserProfile,
 )
-from users.models import Brand, Category, Color, Item, ItemImage, Location, UserProfile
 from users.tasks import (
     delete_old_items_and_chats,
     find_and_notify_matches_task,
@@ -104,20 +120,25 @@ class UploadImagesToCloudinaryTests(TestCase):
             username="testuser", email="test@example.com", password="testpass"
         )
         self.item = Item.objects.create(name="Item Test", user=self.user)
+        # A chave de matching pendente fica no cache e os IDs se repetem entre testes.
+        cache.clear()
 
         if not UserProfile.objects.filter(user=self.user).exists():
             self.user_profile = UserProfile.objects.create(user=self.user)
         else:
             self.user_profile = UserProfile.objects.get(user=self.user)
 
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
     @patch("users.tasks.cloudinary.uploader.upload")
-    def test_upload_images_to_cloudinary_item_success(self, mock_upload):
+    def test_upload_images_to_cloudinary_item_success(self, mock_upload, mock_match):
         mock_upload.return_value = {"secure_url": "http://dummy.com/image.jpg"}
         images = [io.BytesIO(b"dummy image data")]
         upload_images_to_cloudinary(self.item.id, images, object_type="item")
         assert ItemImage.objects.filter(
             item=self.item, image_url="http://dummy.com/image.jpg"
         ).exists()
+        # O matching do item roda depois que as imagens estão gravadas.
+        mock_match.assert_called_once_with((self.item.id,))
 
     @patch("users.tasks.cloudinary.uploader.upload")
     def test_upload_images_to_cloudinary_user_success(self, mock_upload):
@@ -132,9 +153,10 @@ class UploadImagesToCloudinaryTests(TestCase):
         result = upload_images_to_cloudinary(1, images, object_type="unknown")
         assert result is None
 
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
     @patch("users.tasks.cloudinary.uploader.upload", side_effect=Exception("Upload error"))
     @patch("builtins.print")
-    def test_upload_images_to_cloudinary_exception(self, mock_print, mock_upload):
+    def test_upload_images_to_cloudinary_exception(self, mock_print, mock_upload, mock_match):
         images = [io.BytesIO(b"dummy")]
         upload_images_to_cloudinary(self.item.id, images, object_type="item")
         mock_print.assert_called()
@@ -291,6 +313,19 @@ class MatchTestCase(TestCase):
         assert kwargs["item_name"] == self.item_lost.name
         assert kwargs["matches"]
 
+    @patch("users.tasks.send_match_notification.delay")
+    def test_matching_does_not_touch_items(self, mock_send_match_notification):
+        lost_updated_at = self.item_lost.updated_at
+        found_updated_at = self.item_found.updated_at
+        find_and_notify_matches(self.item_lost, max_distance=2)
+        find_and_notify_matches(self.item_found, max_distance=2)
+
+        self.item_lost.refresh_from_db()
+        self.item_found.refresh_from_db()
+        assert self.item_found in self.item_lost.matches.all()
+        assert self.item_lost.updated_at == lost_updated_at
+        assert self.item_found.updated_at == found_updated_at
+
     @patch("users.tasks.send_match_notification.delay")
     def test_no_matches(self, mock_send_match_notification):
         find_and_notify_matches(self.item_irrelevante, max_distance=2)
@@ -300,6 +335,29 @@ class MatchTestCase(TestCase):
 
         mock_send_match_notification.assert_not_called()
 
+    @patch("users.tasks.send_match_notification.delay")
+    def test_same_match_is_notified_only_once(self, mock_send_match_notification):
+        find_and_notify_matches(self.item_lost, max_distance=2)
+        find_and_notify_matches(self.item_lost, max_distance=2)
+        find_and_notify_matches(self.item_found, max_distance=2)
+        mock_send_match_notification.assert_called_once()
+
+        another_found = Item.objects.create(
+            user=self.user2,
+            name="Notebook preto",
+            category=self.category1,
+            location=self.location1,
+            color=self.color1,
+            brand=self.brand1,
+            status="found",
+        )
+        find_and_notify_matches(another_found, max_distance=2)
+
+        assert mock_send_match_notification.call_count == 2
+        _, kwargs = mock_send_match_notification.call_args
+        assert [match["id"] for match in kwargs["matches"]] == [another_found.id]
+        assert MatchNotification.objects.filter(lost_item=self.item_lost).count() == 2
+
 
 User = get_user_model()
 
@@ -384,3 +442,57 @@ class CleanOldItemsTest(TestCase):
         assert Item.objects.filter(id=self.recent_item.id).exists()
 
         assert ChatRoom.objects.filter(id=self.chat_recent.id).exists()
+
+
+class CeleryRoutingTests(TestCase):
+    def route(self, task_name):
+        from AcheiUnB.celery import app
+
+        return app.amqp.router.route({}, task_name, (), {})
+
+    def test_tasks_are_routed_to_dedicated_queues(self):
+        assert self.route("users.tasks.send_match_notification")["queue"].name == (
+            "notifications"
+        )
+        assert self.route("users.tasks.find_and_notify_matches_task")["queue"].name == (
+            "matching"
+        )
+        assert self.route("users.tasks.upload_images_to_cloudinary")["queue"].name == "media"
+
+    def test_load_test_tasks_only_with_setting(self):
+        assert not hasattr(tasks, "latency_probe")
+        assert settings.CELERY_IMPORTS == []
+        with pytest.raises(CommandError, match="LOAD_TEST_TASKS"):
+            call_command("celery_load_test", stdout=io.StringIO())
+
+    def test_notifications_have_highest_priority(self):
+        assert self.route("users.tasks.send_match_notification")["priority"] == 0
+
+    def test_only_idempotent_tasks_ack_late(self):
+        assert find_and_notify_matches_task.acks_late
+        assert find_and_notify_matches_task.time_limit == 90
+        assert not upload_images_to_cloudinary.acks_late
+        assert not send_match_notification.acks_late
+
+
+class MatchLatencyMetricTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("latencia", "latencia@example.com", "pwd")
+        self.lost = Item.objects.create(name="Garrafa azul", status="lost", user=self.user)
+        self.found = Item.objects.create(name="Garrafa azul", status="found")
+
+    @patch("users.tasks.send_match_notification.delay")
+    def test_notification_records_latency_since_last_item_created(self, mock_notify):
+        Item.objects.filter(id=self.found.id).update(created_at=now() - timedelta(seconds=20))
+        self.found.refresh_from_db()
+        Item.objects.filter(id=self.lost.id).update(created_at=now() - timedelta(seconds=10))
+        self.lost.refresh_from_db()
+
+        notify_new_matches(self.lost, [self.found])
+
+        summary = match_latency_summary()
+        assert summary["count"] == 1
+        assert 10 <= summary["mean_seconds"] < 15
+        assert summary["buckets"][5] == 0
+        assert summary["buckets"][15] == 1
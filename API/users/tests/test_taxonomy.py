@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from users.cache import taxonomy_cache
+from users.models import Brand, Category, Color, Item, Location
+from users.serializers import ItemSerializer
+from users.taxonomy import TaxonomyRegistry, taxonomy_registry
+
+
+class TaxonomyRegistryTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = Category.objects.create(name="Chaveiros", category_id="91")
+            self.location = Location.objects.create(name="Ceubinho", location_id="91")
+            self.color = Color.objects.create(name="Furta-cor", color_id="91")
+            self.brand = Brand.objects.create(name="Genérica", brand_id="91")
+
+    def test_item_save_does_not_query_taxonomies(self):
+        taxonomy_registry.all("category")
+        item = Item(
+            name="Chave",
+            category=self.category,
+            location=self.location,
+            color=self.color,
+            brand=self.brand,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            item.save()
+        assert item.barcode == "91919191"
+        taxonomy_tables = ("users_category", "users_location", "users_color", "users_brand")
+        assert not [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+            and any(table in query["sql"] for table in taxonomy_tables)
+        ]
+
+    def test_missing_taxonomies_use_default_code(self):
+        item = Item.objects.create(name="Sem dados")
+        assert item.barcode == "00000000"
+
+    def test_write_invalidates_registry(self):
+        assert taxonomy_registry.name("category", self.category.id) == "Chaveiros"
+        self.category.name = "Chaveiros de metal"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save()
+        assert taxonomy_registry.name("category", self.category.id) == "Chaveiros de metal"
+
+    def test_reloads_when_shared_version_changes(self):
+        registry = TaxonomyRegistry(check_interval=0)
+        assert registry.name("brand", self.brand.id) == "Genérica"
+        Brand.objects.filter(id=self.brand.id).update(name="Outra marca")
+        taxonomy_cache.invalidate()
+        assert registry.name("brand", self.brand.id) == "Outra marca"
+
+    def test_serializer_names_come_from_registry(self):
+        item = Item.objects.create(name="Chave", category=self.category, color=self.color)
+        taxonomy_registry.all("category")
+        with patch.object(Category, "__str__", side_effect=AssertionError):
+            data = ItemSerializer(Item.objects.get(id=item.id)).data
+        assert data["category_name"] == "Chaveiros"
+        assert data["color_name"] == "Furta-cor"
+        assert data["brand_name"] is None
+
+    def test_ids_matching_name_is_case_insensitive(self):
+        assert self.category.id in taxonomy_registry.ids_matching_name("category", "chave")
+
+
+class TaxonomyListViewTests(APITestCase):
+    def test_list_is_served_from_registry(self):
+        expected = list(Location.objects.order_by("id").values("id", "name", "location_id"))
+        taxonomy_registry.all("location")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/locations/")
+        assert response.status_code == 200
+        assert response.data == expected
+
+    def test_item_filter_by_taxonomy_name(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(name="Guarda-chuvas", category_id="92")
+        Item.objects.create(name="Guarda-chuva", category=category, status="lost")
+        Item.objects.create(name="Celular", status="lost")
+        response = self.client.get("/api/items/?category_name=guarda")
+        assert [item["name"] for item in response.data["results"]] == ["Guarda-chuva"]
+
+
+class TaxonomyEndpointTests(APITestCase):
+    def test_returns_all_taxonomies(self):
+        response = self.client.get("/api/taxonomy/")
+        assert response.status_code == 200
+        assert set(response.data) == {"version", "categories", "locations", "colors", "brands"}
+        assert len(response.data["categories"]) == Category.objects.count()
+        assert "max-age=21600" in response["Cache-Control"]
+        assert "public" in response["Cache-Control"]
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get("/api/taxonomy/")["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/taxonomy/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_etag_and_version_change_after_write(self):
+        before = self.client.get("/api/taxonomy/version/").data
+        with self.captureOnCommitCallbacks(execute=True):
+            Color.objects.create(name="Vinho", color_id="93")
+        after = self.client.get("/api/taxonomy/version/").data
+        assert before["version"] != after["version"]
+        assert before["etag"] != after["etag"]
+        assert self.client.get("/api/taxonomy/")["ETag"] == after["etag"]
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from users.bulk_import import import_items
+from users.match import get_potential_matches
+from users.models import Category, Item, ItemTextBucket, Location
+from users.text_index import (
+    NUM_BANDS,
+    band_buckets,
+    minhash_signature,
+    possible_duplicates,
+    text_neighbours,
+)
+from users.throttling import get_bucket_store
+
+
+class MinHashTests(TestCase):
+    def test_signature_is_deterministic(self):
+        tokens = ["carteira", "couro", "marrom"]
+        assert minhash_signature(tokens) == minhash_signature(list(reversed(tokens)))
+        assert len(band_buckets(tokens)) == NUM_BANDS
+
+    def test_empty_text_has_no_buckets(self):
+        assert minhash_signature([]) is None
+        assert band_buckets([]) == []
+
+
+class TextIndexTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Categoria LSH", category_id="97")
+        self.location = Location.objects.create(name="Local LSH", location_id="97")
+        self.other_location = Location.objects.create(name="Outro LSH", location_id="98")
+
+    def create_item(self, name, description, status="found", location=None):
+        return Item.objects.create(
+            name=name,
+            description=description,
+            status=status,
+            category=self.category,
+            location=location or self.location,
+        )
+
+    def test_save_indexes_and_reindexes_item(self):
+        item = self.create_item("Garrafa", "garrafa térmica azul")
+        buckets = set(item.text_buckets.values_list("band", "bucket"))
+        assert buckets == set(band_buckets(item.text_tokens))
+
+        item.description = "garrafa de vidro transparente"
+        item.save()
+        assert set(item.text_buckets.values_list("band", "bucket")) == set(
+            band_buckets(item.text_tokens)
+        )
+        assert ItemTextBucket.objects.filter(item=item).count() == NUM_BANDS
+
+    def test_neighbours_only_reads_items_sharing_buckets(self):
+        item = self.create_item("Mochila", "mochila preta Nike com chaveiro de gato")
+        similar = self.create_item("Mochila", "mochila preta Nike com chaveiro")
+        self.create_item("Calculadora", "calculadora científica Casio")
+
+        assert text_neighbours(item) == [similar]
+
+    def test_possible_duplicates_of_found_item(self):
+        first = self.create_item("Fone JBL", "fone de ouvido JBL branco no estojo")
+        duplicate = self.create_item("Fone JBL", "fone de ouvido JBL branco, estojo")
+        self.create_item("Fone JBL", "fone de ouvido JBL branco no estojo", status="lost")
+
+        assert possible_duplicates(duplicate) == [first]
+
+    def test_matching_includes_similar_text_from_other_location(self):
+        lost = self.create_item(
+            "Guarda-chuva", "guarda-chuva xadrez vermelho cabo de madeira", status="lost"
+        )
+        found = self.create_item(
+            "Guarda-chuva",
+            "guarda-chuva xadrez vermelho, cabo de madeira",
+            location=self.other_location,
+        )
+        self.create_item("Caneta", "caneta azul", location=self.other_location)
+
+        assert get_potential_matches(lost, "found", 2) == [found]
+
+    @patch("users.bulk_import.find_and_notify_matches_bulk_task.delay")
+    def test_bulk_import_indexes_items(self, mock_match):
+        report = import_items([{"name": "Caderno", "description": "caderno de cálculo"}])
+        item = Item.objects.get(id=report.item_ids[0])
+        assert item.text_buckets.count() == NUM_BANDS
+
+
+@patch("users.tasks.find_and_notify_matches_task.apply_async")
+class CreateItemDuplicateFlagTests(APITestCase):
+    def setUp(self):
+        # O balde de throttling é por usuário e os IDs se repetem entre testes.
+        self.addCleanup(get_bucket_store.cache_clear)
+
+    def test_create_response_flags_duplicates(self, mock_match):
+        user = User.objects.create_user("lsh", "lsh@example.com", "pwd")
+        self.client.force_authenticate(user=user)
+        payload = {
+            "name": "Carteira",
+            "description": "carteira de couro marrom",
+            "status": "found",
+        }
+
+        first = self.client.post("/api/items/", payload)
+        second = self.client.post("/api/items/", payload)
+
+        assert first.data["possible_duplicates"] == []
+        assert second.data["possible_duplicates"] == [first.data["id"]]
@@ -0,0 +1,98 @@
+from unittest.mock import MagicMock, patch
+
+import redis
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.models import Item, Location
+from users.throttling import LocalBucketStore, RedisBucketStore
+
+User = get_user_model()
+
+
+class LocalBucketStoreTests(TestCase):
+    def setUp(self):
+        self.store = LocalBucketStore(capacity=10, refill_rate=1)
+
+    def test_consumes_until_empty(self):
+        assert self.store.consume("key", 6, now=0) == (True, 0)
+        allowed, wait = self.store.consume("key", 6, now=0)
+        assert not allowed
+        assert wait == 2
+
+    def test_refills_over_time(self):
+        self.store.consume("key", 10, now=0)
+        allowed, _ = self.store.consume("key", 5, now=5)
+        assert allowed
+
+    def test_buckets_are_independent(self):
+        self.store.consume("a", 10, now=0)
+        allowed, _ = self.store.consume("b", 10, now=0)
+        assert allowed
+
+    def test_number_of_buckets_is_bounded(self):
+        store = LocalBucketStore(capacity=10, refill_rate=1, max_buckets=3)
+        store.consume("ativo", 10, now=0)
+        for index in range(100):
+            store.consume(f"ip:{index}", 1, now=0)
+            store.consume("ativo", 0, now=0)
+        assert len(store._buckets) == 3
+        # O balde em uso continua vazio: o limite não é zerado pela varredura.
+        allowed, _ = store.consume("ativo", 1, now=0)
+        assert not allowed
+
+
+class RedisBucketStoreTests(TestCase):
+    @patch("users.throttling.redis.Redis.from_url")
+    def test_falls_back_to_memory_when_redis_fails(self, mock_from_url):
+        client = MagicMock()
+        client.register_script.return_value = MagicMock(
+            side_effect=redis.ConnectionError("offline")
+        )
+        mock_from_url.return_value = client
+
+        store = RedisBucketStore("redis://localhost:6379/0", capacity=10, refill_rate=1)
+        assert store.consume("key", 1, now=0) == (True, 0)
+
+
+class TokenBucketThrottleViewTests(APITestCase):
+    def setUp(self):
+        store = LocalBucketStore(capacity=10, refill_rate=1)
+        patcher = patch("users.throttling.get_bucket_store", return_value=store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user("throttle", "throttle@example.com", "pwd")
+        self.client.force_authenticate(user=self.user)
+        self.location = Location.objects.first()
+        self.item = Item.objects.create(name="Celular", status="lost")
+
+    def test_plain_listing_is_not_throttled(self):
+        for _ in range(15):
+            response = self.client.get("/api/items/")
+            assert response.status_code == status.HTTP_200_OK
+
+    def test_search_is_throttled(self):
+        for _ in range(10):
+            assert self.client.get("/api/items/?search=Celular").status_code == 200
+        response = self.client.get("/api/items/?search=Celular")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert "Retry-After" in response
+
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
+    def test_create_costs_more_than_search(self, mock_task):
+        data = {"name": "Notebook", "status": "lost", "location": self.location.id}
+        for _ in range(2):
+            assert self.client.post("/api/items/", data, format="json").status_code == 201
+        response = self.client.post("/api/items/", data, format="json")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert Item.objects.filter(name="Notebook").count() == 2
+
+    def test_buckets_are_per_user(self):
+        for _ in range(10):
+            self.client.get("/api/items/?search=Celular")
+        other = User.objects.create_user("other", "other@example.com", "pwd")
+        self.client.force_authenticate(user=other)
+        assert self.client.get("/api/items/?search=Celular").status_code == 200
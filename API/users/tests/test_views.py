@@ -1,13 +1,21 @@
 import json
+import time
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
+from users.cache import item_list_cache
 from users.models import Brand, Category, Color, Item, ItemImage, Location
+from users.tasks import MATCH_PENDING_KEY
+from users.throttling import get_bucket_store
 from users.views import (
     MyItemsFoundView,
     MyItemsLostView,
@@ -35,7 +43,39 @@ class UserListViewTests(TestCase):
         response = self.client.get("/api/users/")
         assert response.status_code == 200
         data = json.loads(response.content.decode())
-        assert len(data) == 2
+        assert data["count"] == 2
+        assert len(data["results"]) == 2
+
+    def test_list_users_paginated(self):
+        response = self.client.get("/api/users/?page_size=1")
+        assert response.status_code == 200
+        data = json.loads(response.content.decode())
+        assert len(data["results"]) == 1
+        assert "page=2" in data["next"]
+        assert data["previous"] is None
+
+    def test_list_users_invalid_page(self):
+        response = self.client.get("/api/users/?page=99")
+        assert response.status_code == 404
+
+    def test_export_ndjson_requires_staff(self):
+        response = self.client.get("/api/users/?export=ndjson")
+        assert response.status_code in (401, 403)
+
+        self.client.cookies["access_token"] = str(AccessToken.for_user(self.user1))
+        response = self.client.get("/api/users/?export=ndjson")
+        assert response.status_code == 403
+
+    @patch("users.signals.send_welcome_email.delay")
+    def test_export_ndjson_streams_all_users(self, mock_welcome_email):
+        admin = User.objects.create(username="admin", email="admin@example.com", is_staff=True)
+        self.client.cookies["access_token"] = str(AccessToken.for_user(admin))
+        response = self.client.get("/api/users/?export=ndjson")
+        assert response.status_code == 200
+        assert response.streaming
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[0])["id"] == self.user1.id
 
     def test_get_single_user(self):
         response = self.client.get(f"/api/users/{self.user1.id}/")
@@ -47,6 +87,22 @@ class UserListViewTests(TestCase):
         response = self.client.get("/api/users/99999/")
         assert response.status_code == 404
 
+    def test_batch_users_by_ids(self):
+        response = self.client.get(f"/api/users/?ids={self.user1.id},{self.user2.id}")
+        assert response.status_code == 200
+        data = json.loads(response.content.decode())
+        assert {user["id"] for user in data} == {self.user1.id, self.user2.id}
+        assert "max-age" in response["Cache-Control"]
+
+    def test_batch_users_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/users/?ids={self.user1.id},{self.user2.id}")
+        assert response.status_code == 200
+
+    def test_batch_users_invalid_ids(self):
+        response = self.client.get("/api/users/?ids=1,abc")
+        assert response.status_code == 400
+
 
 # =====================================================
 # TESTES PARA ItemViewSet (rota: /api/items/)
@@ -62,6 +118,10 @@ class ItemViewSetTests(APITestCase):
 
     def setUp(self):
         self.clean_up()
+        # A chave de matching pendente e os baldes de throttling sobrevivem entre testes,
+        # e os IDs se repetem.
+        cache.clear()
+        self.addCleanup(get_bucket_store.cache_clear)
 
         self.user = User.objects.create_user(
             username="testauth", email="test@auth.com", password="123"
@@ -114,7 +174,7 @@ class ItemViewSetTests(APITestCase):
         assert "total_found" in response.data
         assert "total_lost" in response.data
 
-    @patch("users.views.find_and_notify_matches_task.apply_async")
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
     def test_create_item_calls_schedule_match_task(self, mock_task):
         data = {
             "name": "Notebook",
@@ -125,17 +185,302 @@ class ItemViewSetTests(APITestCase):
             "brand": self.brand.id,
             "status": "lost",
         }
-        response = self.client.post("/api/items/", data, format="json")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post("/api/items/", data, format="json")
+            # Nada é enfileirado antes do commit.
+            mock_task.assert_not_called()
         assert response.status_code == 201
-        mock_task.assert_called_once()
+        # Invalidação da listagem em cache e agendamento do matching.
+        assert callbacks[0] == item_list_cache.invalidate
+        assert len(callbacks) == 2
+        mock_task.assert_called_once_with((response.data["id"],))
+
+    @patch("users.serializers.upload_images_to_cloudinary.delay")
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
+    def test_create_item_with_images_schedules_matching(self, mock_task, mock_upload):
+        image = SimpleUploadedFile("foto.jpg", b"imagem", content_type="image/jpeg")
+        data = {"name": "Notebook", "status": "lost", "images": [image]}
+        with patch("rest_framework.fields.ImageField.to_internal_value", lambda self, v: v):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post("/api/items/", data, format="multipart")
 
-    @patch("users.views.find_and_notify_matches_task.apply_async")
+        assert response.status_code == 201
+        mock_upload.assert_called_once()
+        # Não depende do upload terminar: uma falha no Cloudinary não deixa o item sem
+        # matching.
+        mock_task.assert_called_once_with((response.data["id"],))
+
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
     def test_update_item_calls_schedule_match_task(self, mock_task):
         data = {"name": "Celular atualizado", "status": "lost"}
-        response = self.client.patch(f"/api/items/{self.item_lost.id}/", data, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f"/api/items/{self.item_lost.id}/", data, format="json"
+            )
         assert response.status_code == 200
         mock_task.assert_called_once()
 
+    @patch("users.tasks.is_shared_cache", return_value=True)
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
+    def test_repeated_updates_schedule_one_match_task(self, mock_task, mock_shared):
+        url = f"/api/items/{self.item_lost.id}/"
+        with self.captureOnCommitCallbacks(execute=True):
+            for name in ("Celular azul", "Celular azul claro", "Celular azul escuro"):
+                self.client.patch(url, {"name": name}, format="json")
+        mock_task.assert_called_once()
+
+        # Ao começar, a task libera a chave e a próxima edição agenda de novo.
+        cache.delete(MATCH_PENDING_KEY.format(item_id=self.item_lost.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"name": "Celular"}, format="json")
+        assert mock_task.call_count == 2
+
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
+    def test_local_cache_does_not_coalesce(self, mock_task):
+        # Com o LocMemCache (sem REDIS_URL) o worker não vê a chave da web.
+        url = f"/api/items/{self.item_lost.id}/"
+        with self.captureOnCommitCallbacks(execute=True):
+            for name in ("Celular azul", "Celular azul claro"):
+                self.client.patch(url, {"name": name}, format="json")
+        assert mock_task.call_count == 2
+        assert cache.get(MATCH_PENDING_KEY.format(item_id=self.item_lost.id)) is None
+
+    @patch("users.tasks.find_and_notify_matches_task.apply_async")
+    def test_update_without_match_fields_does_not_schedule(self, mock_task):
+        data = {"name": self.item_lost.name, "description": "Celular perdido na biblioteca"}
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.patch(
+                f"/api/items/{self.item_lost.id}/", data, format="json"
+            )
+        assert response.status_code == 200
+        assert callbacks == [item_list_cache.invalidate]
+        mock_task.assert_not_called()
+
+
+# =====================================================
+# TESTES PARA o cache da listagem anônima de itens
+# =====================================================
+class AnonymousItemListCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.item = Item.objects.create(name="Celular", status="found")
+
+    def test_repeat_request_is_served_from_cache(self):
+        first = self.client.get("/api/items/found/?page=1")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/items/found/?page=1")
+        assert second.status_code == 200
+        assert second.data == first.data
+        assert second["ETag"] == first["ETag"]
+
+    def test_query_params_are_normalized(self):
+        first = self.client.get("/api/items/?status=found&ordering=created_at")
+        second = self.client.get("/api/items/?ordering=created_at&status=found&search=")
+        assert first["ETag"] == second["ETag"]
+
+    def test_item_write_invalidates_cache(self):
+        first = self.client.get("/api/items/found/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Item.objects.create(name="Notebook", status="found")
+        second = self.client.get("/api/items/found/")
+        assert first["ETag"] != second["ETag"]
+        assert len(second.data["results"]) == 2
+
+    def test_image_write_invalidates_cache(self):
+        first = self.client.get("/api/items/found/")
+        with self.captureOnCommitCallbacks(execute=True):
+            ItemImage.objects.create(item=self.item, image_url="http://example.com/a.jpg")
+        second = self.client.get("/api/items/found/")
+        assert first["ETag"] != second["ETag"]
+        assert second.data["results"][0]["image_urls"] == ["http://example.com/a.jpg"]
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get("/api/items/found/")["ETag"]
+        response = self.client.get("/api/items/found/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not response.content
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = User.objects.create_user("cached", "cached@example.com", "pwd")
+        etag = self.client.get("/api/items/found/")["ETag"]
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/items/found/")
+        assert response.status_code == 200
+        assert queries.captured_queries
+        assert response["ETag"] == etag
+
+    def test_if_modified_since_returns_304_until_next_write(self):
+        last_modified = self.client.get("/api/items/found/")["Last-Modified"]
+        response = self.client.get("/api/items/found/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        with patch("users.cache.time.time", return_value=time.time() + 5):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.item.delete()
+        response = self.client.get("/api/items/found/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200
+        assert response.data["results"] == []
+
+
+# =====================================================
+# TESTES PARA ETag/Last-Modified no detalhe e ?modified_since=
+# =====================================================
+class ItemConditionalRequestTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.item = Item.objects.create(name="Garrafa", status="lost")
+        self.url = f"/api/items/{self.item.id}/"
+
+    def test_detail_has_validators(self):
+        response = self.client.get(self.url)
+        assert response.status_code == 200
+        assert response.data["updated_at"]
+        assert response["ETag"]
+        assert response["Last-Modified"]
+
+    def test_if_none_match_returns_304_with_one_query(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f"W/{etag}")
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    def test_etag_depends_on_fieldset(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(f"{self.url}?fields=id,name", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_save_changes_validators(self):
+        first = self.client.get(self.url)
+        Item.objects.filter(pk=self.item.pk).update(updated_at=self.item.created_at)
+        self.item.refresh_from_db()
+        self.item.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == 200
+        assert response["ETag"] != first["ETag"]
+
+    def test_image_changes_touch_item(self):
+        Item.objects.filter(pk=self.item.pk).update(updated_at=self.item.created_at)
+        image = ItemImage.objects.create(item=self.item, image_url="http://example.com/g.jpg")
+        self.item.refresh_from_db()
+        assert self.item.updated_at > self.item.created_at
+
+        touched_at = self.item.updated_at
+        image.delete()
+        self.item.refresh_from_db()
+        assert self.item.updated_at > touched_at
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2001 00:00:00 GMT"
+        )
+        assert response.status_code == 200
+
+    def test_missing_item_returns_404(self):
+        assert self.client.get("/api/items/999999/").status_code == 404
+
+    def test_modified_since_filter(self):
+        old = Item.objects.create(name="Antigo", status="lost")
+        Item.objects.filter(pk=old.pk).update(updated_at="2020-01-01T00:00:00Z")
+        response = self.client.get("/api/items/?modified_since=2024-01-01T00:00:00Z")
+        assert [item["id"] for item in response.data["results"]] == [self.item.id]
+
+
+# =====================================================
+# TESTES PARA ?fields=, ?omit= e ?expand= na listagem de itens
+# =====================================================
+class ItemFieldsetTests(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cache.clear()
+            self.owner = User.objects.create_user("dono", "dono@example.com", "pwd")
+            self.owner.first_name = "Ana"
+            self.owner.save()
+            self.category = Category.objects.create(name="Categoria campos", category_id="95")
+            for index in range(3):
+                item = Item.objects.create(
+                    name=f"Mochila {index}",
+                    description="mochila azul",
+                    status="found",
+                    category=self.category,
+                    user=self.owner,
+                )
+                ItemImage.objects.create(
+                    item=item, image_url=f"http://example.com/{index}.jpg"
+                )
+
+    def items_query(self, queries):
+        return next(
+            query["sql"]
+            for query in queries
+            if 'FROM "users_item"' in query["sql"] and "LIMIT" in query["sql"]
+        )
+
+    def test_fields_limits_payload_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/items/?fields=id,name,location_name")
+
+        assert set(response.data["results"][0]) == {"id", "name", "location_name"}
+        sql = self.items_query(queries.captured_queries)
+        assert '"description"' not in sql
+        assert not any("users_itemimage" in query["sql"] for query in queries.captured_queries)
+
+    def test_image_fields_prefetch_images(self):
+        response = self.client.get("/api/items/?fields=id,image_urls")
+        assert response.data["results"][0]["image_urls"][0].startswith("http://example.com/")
+
+    def test_omit_removes_fields(self):
+        response = self.client.get("/api/items/?omit=image_ids,barcode,description")
+        result = response.data["results"][0]
+        assert "image_ids" not in result
+        assert "barcode" not in result
+        assert "name" in result
+        assert "image_urls" in result
+
+    def test_expand_taxonomy_and_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/items/?fields=id&expand=category,user")
+
+        result = response.data["results"][0]
+        assert result["category"] == {
+            "id": self.category.id,
+            "name": "Categoria campos",
+            "category_id": "95",
+        }
+        assert result["user"]["first_name"] == "Ana"
+        # Usuário e perfil vêm no mesmo SELECT dos itens, não uma consulta por item.
+        assert not any(
+            'FROM "auth_user"' in query["sql"] for query in queries.captured_queries
+        )
+
+    def test_user_save_only_invalidates_expanded_lists(self):
+        plain = self.client.get("/api/items/?fields=id")
+        expanded = self.client.get("/api/items/?fields=id&expand=user")
+
+        # O login pela Microsoft regrava o usuário inteiro (update_or_create).
+        self.owner.first_name = "Bia"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.save()
+
+        with self.assertNumQueries(0):
+            again = self.client.get("/api/items/?fields=id", HTTP_IF_NONE_MATCH=plain["ETag"])
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        response = self.client.get("/api/items/?fields=id&expand=user")
+        assert response["ETag"] != expanded["ETag"]
+        assert response.data["results"][0]["user"]["first_name"] == "Bia"
+
+    def test_writes_return_every_field(self):
+        self.client.force_authenticate(user=self.owner)
+        with patch("users.tasks.find_and_notify_matches_task.apply_async"):
+            response = self.client.post("/api/items/?fields=id", {"name": "Caneta"})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert "description" in response.data
+
 
 # =====================================================
 # TESTES PARA MyItemsLostView e MyItemsFoundView
@@ -210,6 +555,69 @@ class MyItemsViewTests(APITestCase):
             assert response.status_code == 401
 
 
+# =====================================================
+# TESTES PARA MatchItemViewSet (rota: /api/items/<item_id>/matches/)
+# =====================================================
+class MatchItemViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user("dono", "dono@example.com", "pwd")
+        self.other = User.objects.create_user("outro", "outro@example.com", "pwd")
+        self.lost = Item.objects.create(name="Carteira", status="lost", user=self.owner)
+        self.found = [
+            Item.objects.create(name=f"Carteira {i}", status="found", user=self.other)
+            for i in range(3)
+        ]
+        ItemImage.objects.create(item=self.found[0], image_url="https://example.com/a.jpg")
+        self.lost.matches.add(*self.found)
+        self.client.force_authenticate(user=self.owner)
+
+    def test_lists_stored_matches_without_recomputing(self):
+        with patch("users.match.get_potential_matches") as mock_matching:
+            response = self.client.get(f"/api/items/{self.lost.id}/matches/")
+
+        mock_matching.assert_not_called()
+        assert response.status_code == 200
+        assert response.data["count"] == 3
+        assert {item["id"] for item in response.data["results"]} == {
+            item.id for item in self.found
+        }
+        image_urls = [item["image_urls"] for item in response.data["results"]]
+        assert ["https://example.com/a.jpg"] in image_urls
+
+    def test_found_item_lists_lost_items_that_matched_it(self):
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(f"/api/items/{self.found[0].id}/matches/")
+        assert [item["id"] for item in response.data["results"]] == [self.lost.id]
+
+    @patch("rest_framework.pagination.PageNumberPagination.page_size", 2)
+    def test_paginated(self):
+        first = self.client.get(f"/api/items/{self.lost.id}/matches/")
+        second = self.client.get(f"/api/items/{self.lost.id}/matches/?page=2")
+
+        assert len(first.data["results"]) == 2
+        assert "page=2" in first.data["next"]
+        assert len(second.data["results"]) == 1
+        assert second.data["next"] is None
+
+    def test_only_owner_can_see_matches(self):
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(f"/api/items/{self.lost.id}/matches/")
+        assert response.status_code == 404
+
+    def test_cached_until_matches_change(self):
+        url = f"/api/items/{self.lost.id}/matches/"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            # A chave inclui o usuário, então só o dono chega a preencher o cache.
+            response = self.client.get(url)
+        assert response.data["count"] == 3
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lost.matches.remove(self.found[0])
+        assert self.client.get(url).data["count"] == 2
+
+
 # =====================================================
 # TESTES PARA ItemImageViewSet (rota: /api/items/<item_id>/images/)
 # =====================================================
@@ -1,11 +1,12 @@
 import json
 import os
+import tempfile
 from unittest.mock import mock_open, patch
 
 from django.conf import settings
 from django.test import TestCase
 
-from users.templatetags.vite_tags import vite_asset
+from users.templatetags.vite_tags import vite_asset, vite_preload
 
 
 class ViteAssetTagTests(TestCase):
@@ -136,3 +137,62 @@ class ViteAssetTagTests(TestCase):
     def test_vite_asset_invalid_type(self, mock_manifest):
         result = vite_asset("index.html", "invalid")
         assert result == ""
+
+
+class ViteManifestLoaderTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "manifest.json")
+        patcher = patch("users.templatetags.vite_tags.MANIFEST_PATH", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_manifest(self, manifest, mtime):
+        with open(self.path, "w") as file:
+            json.dump(manifest, file)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_missing_manifest_renders_nothing(self):
+        assert vite_asset("index.html", "js") == ""
+        assert vite_preload("index.html") == ""
+
+    def test_manifest_is_reloaded_when_mtime_changes(self):
+        self.write_manifest({"index.html": {"file": "js/index-AAAAAAAA.js"}}, 1_000)
+        assert vite_asset("index.html", "js") == "/static/dist/js/index-AAAAAAAA.js"
+
+        with patch("builtins.open", side_effect=AssertionError("releu o manifest")):
+            assert vite_asset("index.html", "js") == "/static/dist/js/index-AAAAAAAA.js"
+
+        self.write_manifest({"index.html": {"file": "js/index-BBBBBBBB.js"}}, 2_000)
+        assert vite_asset("index.html", "js") == "/static/dist/js/index-BBBBBBBB.js"
+
+    def test_preload_includes_transitive_imports_and_all_css(self):
+        self.write_manifest(
+            {
+                "index.html": {
+                    "file": "js/index.js",
+                    "css": ["assets/index.css"],
+                    "imports": ["_vendor.js", "_ui.js"],
+                    "dynamicImports": ["src/pages/Chat.vue"],
+                },
+                "_vendor.js": {"file": "js/vendor.js"},
+                "_ui.js": {
+                    "file": "js/ui.js",
+                    "css": ["assets/ui.css", "assets/index.css"],
+                    "imports": ["_vendor.js", "_icons.js"],
+                },
+                "_icons.js": {"file": "js/icons.js", "css": ["assets/icons.css"]},
+                "src/pages/Chat.vue": {"file": "js/chat.js", "css": ["assets/chat.css"]},
+            },
+            1_000,
+        )
+        html = vite_preload("index.html")
+        assert html.split("\n") == [
+            '<link rel="stylesheet" href="/static/dist/assets/icons.css"/>',
+            '<link rel="stylesheet" href="/static/dist/assets/ui.css"/>',
+            '<link rel="stylesheet" href="/static/dist/assets/index.css"/>',
+            '<link rel="modulepreload" href="/static/dist/js/vendor.js"/>',
+            '<link rel="modulepreload" href="/static/dist/js/icons.js"/>',
+            '<link rel="modulepreload" href="/static/dist/js/ui.js"/>',
+        ]
@@ -0,0 +1,112 @@
+import hashlib
+import random
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Item, ItemTextBucket
+from .scoring import jaccard
+
+# 16 bandas de 2 linhas: pares com Jaccard ~0,25 já têm ~65% de chance de
+# dividir um balde, e com 0,5 passam de 98%.
+NUM_BANDS = 16
+ROWS_PER_BAND = 2
+NUM_PERMUTATIONS = NUM_BANDS * ROWS_PER_BAND
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# Sementes fixas: as assinaturas precisam ser iguais em todos os processos.
+_rng = random.Random(20241)
+PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+DUPLICATE_MIN_SIMILARITY = 0.8
+
+
+def stable_hash(value, digest_size=4):
+    """Hash estável entre processos (``hash()`` do Python é aleatorizado)."""
+    digest = hashlib.blake2b(value.encode(), digest_size=digest_size).digest()
+    return int.from_bytes(digest, "big", signed=digest_size == 8)
+
+
+def minhash_signature(tokens):
+    """Assinatura MinHash: para cada permutação, o menor hash entre as palavras."""
+    if not tokens:
+        return None
+    hashes = [stable_hash(token) for token in tokens]
+    return [
+        min(((a * value + b) % MERSENNE_PRIME) & MAX_HASH for value in hashes)
+        for a, b in PERMUTATIONS
+    ]
+
+
+def band_buckets(tokens):
+    """``[(banda, balde)]``: itens que dividem algum balde são candidatos a vizinhos."""
+    signature = minhash_signature(tokens)
+    if signature is None:
+        return []
+    return [
+        (
+            band,
+            stable_hash(
+                ",".join(
+                    map(str, signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND])
+                ),
+                digest_size=8,
+            ),
+        )
+        for band in range(NUM_BANDS)
+    ]
+
+
+def index_items(items):
+    """Regrava os baldes dos itens; chamado a cada save e após importações em lote."""
+    items = list(items)
+    rows = [
+        ItemTextBucket(item_id=item.id, band=band, bucket=bucket)
+        for item in items
+        for band, bucket in band_buckets(item.text_tokens)
+    ]
+    with transaction.atomic():
+        ItemTextBucket.objects.filter(item_id__in=[item.id for item in items]).delete()
+        ItemTextBucket.objects.bulk_create(rows, batch_size=5000)
+
+
+def text_neighbours(item, *conditions, min_similarity=0.3, limit=20, **filters):
+    """
+    Itens com nome/descrição parecidos com os de ``item``, do mais ao menos parecido.
+
+    Só os itens que dividem algum balde com ``item`` são lidos do banco (consulta pelo
+    índice ``(band, bucket)``), e a similaridade é conferida com o Jaccard exato das
+    palavras. ``conditions`` e ``filters`` restringem os candidatos, como em
+    ``Item.objects.filter`` (ex.: ``status="found"``).
+    """
+    buckets = band_buckets(item.text_tokens)
+    if not buckets:
+        return []
+
+    query = Q()
+    for band, bucket in buckets:
+        query |= Q(band=band, bucket=bucket)
+    candidate_ids = (
+        ItemTextBucket.objects.filter(query).exclude(item_id=item.id).values("item_id")
+    )
+
+    scored = []
+    for candidate in Item.objects.filter(*conditions, id__in=candidate_ids, **filters):
+        similarity = jaccard(item.text_tokens, candidate.text_tokens) or 0.0
+        if similarity >= min_similarity:
+            scored.append((similarity, candidate))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [candidate for _, candidate in scored[:limit]]
+
+
+def possible_duplicates(item, min_similarity=DUPLICATE_MIN_SIMILARITY):
+    """Itens achados da mesma categoria com descrição quase igual (cadastro repetido)."""
+    if item.status != "found":
+        return []
+    return text_neighbours(
+        item, min_similarity=min_similarity, status="found", category_id=item.category_id
+    )
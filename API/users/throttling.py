@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# Consome ``cost`` fichas do balde de forma atômica no Redis.
+# Retorna {permitido (0/1), segundos de espera até haver fichas suficientes}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    wait = (cost - tokens) / refill_rate
+end
+
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / refill_rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+
+class LocalBucketStore:
+    """
+    Baldes em memória do processo. Usado em testes e quando o Redis não está configurado
+    ou cai. Um balde por usuário ou IP: para um scan não esgotar a memória, guarda no
+    máximo ``max_buckets`` (LRU). O balde descartado é o usado há mais tempo, que
+    provavelmente já se encheu de novo (equivale a não existir).
+    """
+
+    def __init__(self, capacity, refill_rate, max_buckets=10_000):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, cost, now):
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + max(0, now - updated_at) * self.refill_rate)
+
+            allowed = tokens >= cost
+            self._buckets[key] = (tokens - cost if allowed else tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+            if allowed:
+                return True, 0
+            return False, (cost - tokens) / self.refill_rate
+
+
+class RedisBucketStore:
+    """Baldes compartilhados entre todos os workers, guardados no Redis."""
+
+    def __init__(self, url, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.client = redis.Redis.from_url(url, socket_timeout=0.1)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.fallback = LocalBucketStore(capacity, refill_rate)
+
+    def consume(self, key, cost, now):
+        try:
+            allowed, wait = self.script(
+                keys=[key], args=[self.capacity, self.refill_rate, cost, now]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Redis indisponível para rate limiting, usando memória local: {e}")
+            return self.fallback.consume(key, cost, now)
+        return bool(int(allowed)), float(wait)
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store():
+    config = settings.TOKEN_BUCKET_THROTTLE
+    if config.get("REDIS_URL"):
+        return RedisBucketStore(config["REDIS_URL"], config["CAPACITY"], config["REFILL_RATE"])
+    return LocalBucketStore(config["CAPACITY"], config["REFILL_RATE"])
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Rate limiting por usuário (ou IP, se anônimo) com token bucket.
+
+    Cada view declara ``throttle_costs``, um dicionário ``{action: custo}``; a chave
+    especial ``"search"`` é somada quando a requisição usa ``?search=``. Ações fora
+    do dicionário não consomem fichas. Sem fichas suficientes a requisição é
+    recusada na hora com 429, em vez de ocupar um worker.
+    """
+
+    cache_format = "throttle:bucket:{scope}:{ident}"
+
+    def __init__(self):
+        self.wait_time = None
+
+    def get_cost(self, request, view):
+        costs = getattr(view, "throttle_costs", {})
+        action = getattr(view, "action", None) or request.method.lower()
+        cost = costs.get(action, 0)
+        if request.query_params.get("search"):
+            cost += costs.get("search", 0)
+        return cost
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        scope = getattr(view, "throttle_scope", None) or "api"
+        return self.cache_format.format(scope=scope, ident=ident)
+
+    def allow_request(self, request, view):
+        cost = self.get_cost(request, view)
+        if cost <= 0:
+            return True
+
+        allowed, self.wait_time = get_bucket_store().consume(
+            self.get_cache_key(request, view), cost, time.time()
+        )
+        return allowed
+
+    def wait(self):
+        return self.wait_time
@@ -5,11 +5,16 @@ from .views import (
     BrandViewSet,
     CategoryViewSet,
     ColorViewSet,
+    ExportView,
     ItemImageViewSet,
+    ItemImportView,
     ItemViewSet,
     LocationViewSet,
+    MatchItemViewSet,
     MyItemsFoundView,
     MyItemsLostView,
+    TaxonomyVersionView,
+    TaxonomyView,
     TestUserView,
     UserDetailView,
     UserListView,
@@ -27,14 +32,17 @@ router.register(r"items/(?P<item_id>[^/.]+)/images", ItemImageViewSet, basename=
 urlpatterns = [
     path("items/found/", ItemViewSet.as_view({"get": "list"}), name="found-items"),
     path("items/lost/", ItemViewSet.as_view({"get": "list"}), name="lost-items"),
+    path("items/import/", ItemImportView.as_view(), name="item-import"),
+    path("items/<int:item_id>/matches/", MatchItemViewSet.as_view(), name="item-matches"),
+    path("export/<str:dataset>.<str:file_format>", ExportView.as_view(), name="export"),
     path("items/lost/my-items/", MyItemsLostView.as_view(), name="my-lost-items"),
     path("items/found/my-items/", MyItemsFoundView.as_view(), name="my-found-items"),
+    path("taxonomy/", TaxonomyView.as_view(), name="taxonomy"),
+    path("taxonomy/version/", TaxonomyVersionView.as_view(), name="taxonomy-version"),
     path("", include(router.urls)),
     path("auth/validate/", UserValidateView.as_view(), name="useer-detail"),
     path("auth/user/", UserDetailView.as_view(), name="useer-detail"),
     path("test-user/", TestUserView.as_view(), name="test_user"),
     path("users/", UserListView.as_view(), name="user-list"),
     path("users/<int:user_id>/", UserListView.as_view(), name="user-detail"),
-    # Implementação futura sobre matchs path("items/<int:item_id>/matches/",
-    # MatchItemViewSet.as_view(), name="item-matches"),
 ]
@@ -1,28 +1,56 @@
+import hashlib
+import json
 import logging
 import os
 from datetime import datetime
+from functools import partial
 
 import cloudinary
 import cloudinary.uploader
 import requests
 from django.contrib.auth import get_user_model, login
-from django.http import HttpResponseRedirect, JsonResponse
+from django.core.paginator import InvalidPage, Paginator
+from django.db import transaction
+from django.http import HttpResponseRedirect, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import patch_cache_control
 from django.views import View
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from msal import ConfidentialClientApplication
-from rest_framework import status
+from rest_framework import generics, status
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import (
+    AllowAny,
+    IsAdminUser,
+    IsAuthenticated,
+    IsAuthenticatedOrReadOnly,
+)
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .bulk_export import CONTENT_TYPES, EXPORT_DATASETS, EXPORT_FORMATS, iter_export
+from .bulk_import import IMPORT_FORMATS, detect_format, import_items, iter_rows
+from .cache import (
+    cached_response,
+    etag_matches,
+    is_anonymous,
+    is_not_modified,
+    item_list_cache,
+    item_matches_cache,
+    public_user_cache,
+    request_digest,
+    set_validators,
+    taxonomy_cache,
+)
 from .filters import ItemFilter
+from .match import match_fields
 from .models import Brand, Category, Color, Item, ItemImage, Location, UserProfile
 from .serializers import (
     BrandSerializer,
@@ -31,17 +59,43 @@ from .serializers import (
     ItemImageSerializer,
     ItemSerializer,
     LocationSerializer,
+    item_fieldset,
+    optimize_item_queryset,
+    serialize_public_user,
 )
-from .tasks import find_and_notify_matches_task, upload_images_to_cloudinary
+from .tasks import schedule_item_matching, upload_images_to_cloudinary
+from .taxonomy import taxonomy_registry
+from .text_index import possible_duplicates
+from .throttling import TokenBucketThrottle
+
+MAX_BATCH_USER_IDS = 100
+USER_CACHE_MAX_AGE = 300
+USER_PAGE_SIZE = 27
+USER_MAX_PAGE_SIZE = 100
+USER_EXPORT_CHUNK_SIZE = 2000
+TAXONOMY_CACHE_MAX_AGE = 60 * 60 * 6
+TAXONOMY_STALE_WHILE_REVALIDATE = 60 * 60 * 24
 
 
 class UserListView(View):
     """
     Endpoint para listar todos os usuários e obter um usuário pelo ID.
+    A listagem é paginada (``?page=`` e ``?page_size=``). Aceita também ``?ids=1,2,3``
+    para buscar vários usuários em uma única consulta e ``?export=ndjson`` (apenas
+    administradores, via ``UserExportView``) para exportar os usuários em streaming.
+    Usuário e páginas da listagem ficam no cache compartilhado até algum usuário mudar.
     """
 
     @swagger_auto_schema(
         operation_description="Retorna um usuário pelo ID",
+        manual_parameters=[
+            openapi.Parameter(
+                "ids",
+                openapi.IN_QUERY,
+                description="Lista de IDs separados por vírgula (ex.: 1,2,3)",
+                type=openapi.TYPE_STRING,
+            )
+        ],
         responses={
             200: openapi.Response(
                 "Usuário encontrado",
@@ -67,30 +121,99 @@ class UserListView(View):
     )
     def get(self, request, user_id=None):
         if user_id:
-            user = get_object_or_404(User, id=user_id)
-            profile = getattr(user, "profile", None)
-            profile_picture = profile.profile_picture if profile else None
-
-            user_data = {
-                "id": user.id,
-                "first_name": user.first_name,
-                "email": user.email,
-                "foto": profile_picture,
-            }
-            return JsonResponse(user_data, status=200)
+            user_data = public_user_cache.get_or_set(
+                public_user_cache.key("detail", user_id),
+                lambda: serialize_public_user(
+                    get_object_or_404(User.objects.select_related("profile"), id=user_id)
+                ),
+            )
+            response = JsonResponse(user_data, status=200)
+            patch_cache_control(response, private=True, max_age=USER_CACHE_MAX_AGE)
+            return response
 
-        users = User.objects.all()
-        users_data = [
-            {
-                "id": user.id,
-                "first_name": user.first_name,
-                "email": user.email,
-                "foto": getattr(user.profile, "profile_picture", None),
-            }
-            for user in users
-        ]
+        if request.GET.get("ids") is not None:
+            return self.batch_lookup(request)
+
+        if request.GET.get("export") == "ndjson":
+            return UserExportView.as_view()(request)
+
+        try:
+            page_size = min(
+                int(request.GET.get("page_size", USER_PAGE_SIZE)), USER_MAX_PAGE_SIZE
+            )
+            page_number = int(request.GET.get("page", 1))
+            users_data = public_user_cache.get_or_set(
+                public_user_cache.key("list", request_digest(request)),
+                partial(self.list_page, request, page_number, max(page_size, 1)),
+            )
+        except (ValueError, InvalidPage):
+            return JsonResponse({"error": "Página inválida."}, status=404)
+
+        return JsonResponse(users_data, status=200)
+
+    def list_page(self, request, page_number, page_size):
+        users = User.objects.select_related("profile").order_by("id")
+        page = Paginator(users, page_size).page(page_number)
+        url = request.build_absolute_uri()
+        return {
+            "count": page.paginator.count,
+            "next": (
+                replace_query_param(url, "page", page.next_page_number())
+                if page.has_next()
+                else None
+            ),
+            "previous": (
+                replace_query_param(url, "page", page.previous_page_number())
+                if page.has_previous()
+                else None
+            ),
+            "results": [serialize_public_user(user) for user in page.object_list],
+        }
+
+    def batch_lookup(self, request):
+        """Resolve vários usuários (``?ids=1,2,3``) e suas fotos em uma única consulta."""
+        try:
+            user_ids = {int(value) for value in request.GET["ids"].split(",") if value.strip()}
+        except ValueError:
+            return JsonResponse({"error": "Parâmetro 'ids' inválido."}, status=400)
+
+        if len(user_ids) > MAX_BATCH_USER_IDS:
+            return JsonResponse(
+                {"error": f"Informe no máximo {MAX_BATCH_USER_IDS} IDs por requisição."},
+                status=400,
+            )
+
+        users = User.objects.filter(id__in=user_ids).select_related("profile")
+        response = JsonResponse(
+            [serialize_public_user(user) for user in users], safe=False, status=200
+        )
+        patch_cache_control(response, private=True, max_age=USER_CACHE_MAX_AGE)
+        return response
+
+
+class UserExportView(APIView):
+    """
+    Exporta os usuários em NDJSON (uma linha por usuário) com memória constante.
+    Atendida por ``/api/users/?export=ndjson``; passa pela autenticação da API (cookie
+    JWT) para que ``IsAdminUser`` enxergue o usuário da requisição.
+    """
 
-        return JsonResponse(users_data, safe=False, status=200)
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        rows = (
+            User.objects.order_by("id")
+            .values_list("id", "first_name", "email", "profile__profile_picture")
+            .iterator(chunk_size=USER_EXPORT_CHUNK_SIZE)
+        )
+        lines = (
+            json.dumps({"id": id, "first_name": first_name, "email": email, "foto": foto})
+            + "\n"
+            for id, first_name, email, foto in rows
+        )
+        response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="users.ndjson"'
+        return response
 
 
 CLIENT_ID = os.getenv("MICROSOFT_CLIENT_ID")
@@ -114,6 +237,33 @@ class LostItemPagination(PageNumberPagination):
     page_size = 27
 
 
+ITEM_FIELDSET_PARAMETERS = [
+    openapi.Parameter(
+        "fields",
+        openapi.IN_QUERY,
+        description="Campos da resposta, separados por vírgula (ex.: id,name,image_urls)",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        "omit",
+        openapi.IN_QUERY,
+        description="Campos a remover da resposta, separados por vírgula",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        "expand",
+        openapi.IN_QUERY,
+        description="Troca IDs por objetos: category, location, color, brand, user",
+        type=openapi.TYPE_STRING,
+    ),
+]
+
+
+def expanded_user_namespaces(request):
+    """Com ``?expand=user`` a resposta embute dados públicos de usuários."""
+    return [public_user_cache] if "user" in item_fieldset(request)[1] else []
+
+
 class ItemViewSet(ModelViewSet):
     serializer_class = ItemSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -121,42 +271,90 @@ class ItemViewSet(ModelViewSet):
     filterset_class = ItemFilter
     search_fields = ["name", "description", "category__name", "location__name"]
 
-    ordering_fields = ["created_at", "found_lost_date"]
+    ordering_fields = ["created_at", "found_lost_date", "updated_at"]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_costs = {"search": 1, "create": 5, "update": 2, "partial_update": 2}
 
+    # A resposta depende só da rota e dos parâmetros: na navegação anônima ela é guardada
+    # em cache até a próxima escrita em itens/imagens (nova geração). Todos recebem
+    # ETag/Last-Modified e 304 quando já têm a versão atual.
     @swagger_auto_schema(
         operation_description="Retorna a lista de itens cadastrados no sistema.",
+        manual_parameters=ITEM_FIELDSET_PARAMETERS,
         responses={200: openapi.Response("Lista de itens", ItemSerializer(many=True))},
     )
+    @cached_response(item_list_cache, condition=is_anonymous, vary_on=expanded_user_namespaces)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
     @swagger_auto_schema(
-        operation_description="Cria um novo item.",
+        operation_description="Cria um novo item. A resposta inclui "
+        + "``possible_duplicates``: IDs de itens achados com descrição quase igual.",
         request_body=ItemSerializer,
         responses={201: openapi.Response("Item criado com sucesso", ItemSerializer)},
     )
     def create(self, request, *args, **kwargs):
-        return super().create(request, *args, **kwargs)
+        response = super().create(request, *args, **kwargs)
+        # Itens achados com descrição quase igual a outro já cadastrado são sinalizados
+        # para quem cadastrou (provável registro repetido do mesmo objeto).
+        if response.status_code == status.HTTP_201_CREATED:
+            response.data["possible_duplicates"] = [
+                item.id for item in possible_duplicates(self.created_item)
+            ]
+        return response
 
-    def get_queryset(self):
+    @swagger_auto_schema(
+        operation_description="Retorna um item. Responde 304 a ``If-None-Match`` ou "
+        + "``If-Modified-Since`` quando o item não mudou.",
+        manual_parameters=ITEM_FIELDSET_PARAMETERS,
+        responses={200: ItemSerializer, 304: "Item não modificado"},
+    )
+    def retrieve(self, request, *args, **kwargs):
+        # Só o updated_at é lido antes de decidir: um 304 custa uma consulta.
+        queryset = self.filter_queryset(self.item_base_queryset())
+        updated_at = generics.get_object_or_404(
+            queryset.values_list("updated_at", flat=True), pk=kwargs["pk"]
+        )
+        etag, last_modified = self.item_validators(request, kwargs["pk"], updated_at)
+        if is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().retrieve(request, *args, **kwargs)
+        set_validators(response, etag, last_modified)
+        patch_cache_control(response, max_age=0)
+        return response
 
-        self.request.query_params.get("status", None)
+    def item_validators(self, request, pk, updated_at):
+        """
+        ETag e Last-Modified de um item: o ``updated_at``, os parâmetros e as gerações
+        das taxonomias (nomes) e, com ``?expand=user``, dos dados públicos do dono.
+        """
+        namespaces = [taxonomy_cache, *expanded_user_namespaces(request)]
+        raw = ":".join(
+            [
+                str(pk),
+                updated_at.isoformat(),
+                request_digest(request),
+                *(namespace.version() for namespace in namespaces),
+            ]
+        )
+        etag = f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+        last_modified = max(
+            [updated_at, *(namespace.last_modified() for namespace in namespaces)]
+        )
+        return etag, last_modified
+
+    def item_base_queryset(self):
         if "found" in self.request.path:
-            return (
-                Item.objects.filter(status="found")
-                .select_related("category", "location", "color", "brand")
-                .prefetch_related("images")
-            )
-        elif "lost" in self.request.path:
-            return (
-                Item.objects.filter(status="lost")
-                .select_related("category", "location", "color", "brand")
-                .prefetch_related("images")
-            )
+            return Item.objects.filter(status="found")
+        if "lost" in self.request.path:
+            return Item.objects.filter(status="lost")
+        return Item.objects.all()
 
-        return Item.objects.select_related(
-            "category", "location", "color", "brand"
-        ).prefetch_related("images")
+    def get_queryset(self):
+        # Os nomes de categoria/local/cor/marca vêm do taxonomy_registry, sem JOIN.
+        # Colunas e prefetch de imagens dependem de ?fields=/?omit=/?expand=.
+        return optimize_item_queryset(self.item_base_queryset(), self.request)
 
     def get_paginated_response(self, data):
         total_found = Item.objects.filter(status="found").count()
@@ -171,46 +369,132 @@ class ItemViewSet(ModelViewSet):
         return paginated_response
 
     def schedule_match_task(self, item):
-        find_and_notify_matches_task.apply_async((item.id,), countdown=10)
+        # Depois do commit, para o worker sempre encontrar o item gravado. Várias edições
+        # seguidas geram um único matching (ver schedule_item_matching).
+        transaction.on_commit(partial(schedule_item_matching, item.id))
 
     def perform_create(self, serializer):
         item = serializer.save(
             user=self.request.user if self.request.user.is_authenticated else None
         )
+        self.created_item = item
+        # Sempre agendado aqui, mesmo com imagens: se o upload falhar ou o worker cair,
+        # o item não fica sem matching. O upload_images_to_cloudinary pede outro ao
+        # terminar, descartado enquanto este ainda estiver pendente.
         self.schedule_match_task(item)
 
     def perform_update(self, serializer):
+        before = match_fields(serializer.instance)
         item = serializer.save(
             user=self.request.user if self.request.user.is_authenticated else None
         )
-        self.schedule_match_task(item)
+        # Edições que não mudam barcode, status, data ou texto não alteram os matches.
+        if match_fields(item) != before:
+            self.schedule_match_task(item)
+
+
+class ItemImportView(APIView):
+    """
+    Importação em lote de itens para os balcões de achados e perdidos.
+
+    Recebe um arquivo CSV, JSON ou JSON Lines no campo ``file``.
+    """
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(
+        operation_description="Importa itens em lote a partir de um arquivo CSV, JSON ou "
+        + "JSON Lines.",
+        manual_parameters=[
+            openapi.Parameter(
+                "file",
+                openapi.IN_FORM,
+                description="Arquivo com colunas name, description, status, category, "
+                + "location, color, brand e found_lost_date",
+                type=openapi.TYPE_FILE,
+                required=True,
+            )
+        ],
+        responses={201: "Relatório da importação", 400: "Arquivo inválido"},
+    )
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get("format") or detect_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"Formato não suportado. Use: {', '.join(IMPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        report = import_items(iter_rows(upload, file_format), user=request.user)
+        return Response(
+            report.as_dict(),
+            status=status.HTTP_201_CREATED if report.created else status.HTTP_400_BAD_REQUEST,
+        )
+
 
+class ExportView(APIView):
+    """Exportação administrativa de itens, imagens ou matches em CSV ou NDJSON (streaming)."""
 
-""" Estrutura de match para implementação futura
-Match de itens caso o usuário queira ver os possíveis matches pelo site:
+    permission_classes = [IsAdminUser]
 
- class MatchItemViewSet(APIView):
-     permission_classes = [IsAuthenticated]
+    @swagger_auto_schema(
+        operation_description="Exporta 'items', 'images' ou 'matches' em CSV ou NDJSON.",
+        responses={200: "Arquivo em streaming", 404: "Conjunto ou formato inválido"},
+    )
+    def get(self, request, dataset, file_format):
+        if dataset not in EXPORT_DATASETS or file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": "Conjunto ou formato de exportação inválido."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        response = StreamingHttpResponse(
+            iter_export(dataset, file_format), content_type=CONTENT_TYPES[file_format]
+        )
+        response["Content-Disposition"] = f'attachment; filename="{dataset}.{file_format}"'
+        return response
+
+
+class MatchItemViewSet(APIView):
+    """
+    Possíveis matches de um item do usuário, lidos de ``Item.matches`` (gravados pelo
+    matching assíncrono). Não recalcula matches nem envia notificações.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Retorna, paginados, os possíveis matches já encontrados "
+        + "para um item do usuário autenticado.",
+        manual_parameters=ITEM_FIELDSET_PARAMETERS,
+        responses={
+            200: openapi.Response("Lista de matches", ItemSerializer(many=True)),
+            404: "Item não encontrado",
+        },
+    )
+    @cached_response(item_matches_cache, private=True, vary_on=expanded_user_namespaces)
+    def get(self, request, item_id):
+        try:
+            target_item = Item.objects.get(id=item_id, user=request.user)
+        except Item.DoesNotExist:
+            return Response({"error": "Item não encontrado."}, status=404)
 
-     def get(self, request, item_id):
-          retorna possiveis matches
-         try:
-             target_item = Item.objects.get(id=item_id, user=request.user)
-         except Item.DoesNotExist:
-             return Response({"error": "Item não encontrado."}, status=404)
+        # As arestas vão do item perdido para o achado.
+        if target_item.status == "lost":
+            matches = target_item.matches.all()
+        else:
+            matches = target_item.matched_with.all()
+        matches = optimize_item_queryset(matches, request).order_by("-created_at", "-id")
 
-         matches = find_and_notify_matches(target_item)
-         data = [
-             {
-                 "id": match.id,
-                 "barcode": match.barcode,
-                 "status": match.status,
-                 "name": match.name,
-                 "description": match.description,
-             }
-             for match in matches
-         ]
-         return Response(data, status=200)"""
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(matches, request, view=self)
+        serializer = ItemSerializer(page, many=True, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class MyItemsLostView(APIView):
@@ -252,21 +536,81 @@ class MyItemsFoundView(APIView):
         return Response(serializer.data)
 
 
-class CategoryViewSet(ModelViewSet):
+class TaxonomyListMixin:
+    """Responde a listagem a partir do taxonomy_registry, sem consultar o banco."""
+
+    taxonomy_kind = None
+
+    def list(self, request, *args, **kwargs):
+        return Response(taxonomy_registry.all(self.taxonomy_kind))
+
+
+class TaxonomyView(APIView):
+    """
+    Categorias, locais, cores e marcas em uma única resposta, para os formulários.
+
+    Pode ficar horas em cache no navegador/CDN; ``/api/taxonomy/version/`` permite
+    conferir de forma barata se houve alteração.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        operation_description="Retorna todas as taxonomias (categorias, locais, cores e "
+        + "marcas) com a versão atual.",
+        responses={200: "Taxonomias", 304: "Não modificado"},
+    )
+    def get(self, request):
+        version, lists, content_hash = taxonomy_registry.snapshot()
+        etag = f'"{content_hash}"'
+
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({"version": version, **lists})
+
+        response["ETag"] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=TAXONOMY_CACHE_MAX_AGE,
+            stale_while_revalidate=TAXONOMY_STALE_WHILE_REVALIDATE,
+        )
+        return response
+
+
+class TaxonomyVersionView(APIView):
+    """Versão e hash atuais das taxonomias, para o cliente decidir se precisa recarregar."""
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        version, _, content_hash = taxonomy_registry.snapshot()
+        response = Response({"version": version, "etag": f'"{content_hash}"'})
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+class CategoryViewSet(TaxonomyListMixin, ModelViewSet):
+    taxonomy_kind = "category"
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = None
 
 
-class LocationViewSet(ModelViewSet):
+class LocationViewSet(TaxonomyListMixin, ModelViewSet):
+    taxonomy_kind = "location"
     queryset = Location.objects.all()
     serializer_class = LocationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = None
 
 
-class ColorViewSet(ModelViewSet):
+class ColorViewSet(TaxonomyListMixin, ModelViewSet):
+    taxonomy_kind = "color"
     queryset = Color.objects.all()
     serializer_class = ColorSerializer
 
@@ -279,7 +623,8 @@ class ColorViewSet(ModelViewSet):
     pagination_class = None
 
 
-class BrandViewSet(ModelViewSet):
+class BrandViewSet(TaxonomyListMixin, ModelViewSet):
+    taxonomy_kind = "brand"
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -288,6 +633,8 @@ class BrandViewSet(ModelViewSet):
 
 class ItemImageViewSet(ModelViewSet):
     serializer_class = ItemImageSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_costs = {"create": 5}
 
     def get_queryset(self):
         item_id = self.kwargs.get("item_id")